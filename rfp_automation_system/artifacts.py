@@ -0,0 +1,270 @@
+"""Debug artifacts for Orchestrator runs (step payloads and the proposal).
+
+RFP_ARTIFACT_MODE selects where they go:
+
+* "off"    - nothing is written.
+* "shared" - (default) the original layout: step1_sales.json ..
+             step4_master.json and final_proposal.md in OUTPUT_DIR, written
+             synchronously and overwritten by every run.
+* "dirs"   - one directory per run under outputs/runs/, keeping the newest
+             KEEP_RUNS of them (gunicorn.conf.py picks this mode).
+* "jsonl"  - one compact JSON line per run appended to outputs/artifacts.jsonl,
+             optionally gzip/zstd compressed (RFP_ARTIFACT_COMPRESSION). The
+             zstandard package is imported when a zstd log is opened.
+
+"dirs" and "jsonl" are written by a background thread that drains the queue
+in batches, so a request never waits on disk. When the queue is full the
+artifact is dropped (and counted) rather than blocking the request.
+"""
+import atexit
+import datetime
+import gzip
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+
+import metrics
+import records
+
+# --- Artifact Settings ---
+ARTIFACT_MODE = os.environ.get("RFP_ARTIFACT_MODE", "shared")
+ARTIFACT_COMPRESSION = os.environ.get("RFP_ARTIFACT_COMPRESSION", "none")   # none | gzip | zstd
+OUTPUT_DIR = os.path.join("outputs", "test_run")
+RUNS_DIR = os.path.join("outputs", "runs")
+KEEP_RUNS = int(os.environ.get("RFP_ARTIFACT_KEEP_RUNS", "200"))   # run directories kept in "dirs" mode (0: all)
+LOG_FILE = os.path.join("outputs", "artifacts.jsonl")
+QUEUE_SIZE = 1000            # runs waiting for the writer before new ones are dropped
+BATCH_SIZE = 64              # runs written per batch (one compressed frame in jsonl mode)
+EXIT_FLUSH_SECONDS = 5       # how long interpreter exit waits for pending artifacts
+
+STEP_FILES = (
+    ("sales", "step1_sales.json"),
+    ("technical", "step2_technical.json"),
+    ("pricing", "step3_pricing.json"),
+    ("master", "step4_master.json"),
+)
+
+
+def new_run(input_text, steps, run_id=None):
+    """Builds the artifact record for one run; steps maps sales/technical/pricing/master to payloads."""
+    now = datetime.datetime.now()
+    if run_id is None:
+        run_id = uuid.uuid4().hex[:12]
+    return {"run_id": str(run_id), "timestamp": now.isoformat(timespec="seconds"), "input": input_text, "steps": steps}
+
+
+class SharedDirectoryStore:
+    """Legacy layout: the latest run's files in one directory."""
+
+    def __init__(self, directory=OUTPUT_DIR):
+        self.directory = directory
+
+    def write_batch(self, runs):
+        os.makedirs(self.directory, exist_ok=True)
+        for run in runs:
+            _write_files(self.directory, run)
+
+
+class RunDirectoryStore:
+    """One directory per run, named <timestamp>-<run id>; only the newest `keep` are kept."""
+
+    def __init__(self, root=RUNS_DIR, keep=KEEP_RUNS):
+        self.root = root
+        self.keep = keep
+
+    def write_batch(self, runs):
+        for run in runs:
+            stamp = run["timestamp"].replace(":", "").replace("-", "").replace("T", "-")
+            directory = os.path.join(self.root, f"{stamp}-{run['run_id']}")
+            os.makedirs(directory, exist_ok=True)
+            _write_files(directory, run)
+        if self.keep:
+            self._prune()
+
+    def _prune(self):
+        # Names start with the timestamp, so they sort oldest first
+        names = sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+        for name in names[:max(len(names) - self.keep, 0)]:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+
+class JsonLinesStore:
+    """Append-only log, one JSON object per run.
+
+    Each batch is appended as its own gzip member / zstd frame; both formats
+    read concatenated members back as one stream (gzip.open, zstd -d).
+    """
+
+    def __init__(self, path=LOG_FILE, compression=ARTIFACT_COMPRESSION):
+        self._zstd = None
+        if compression == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                print("[Artifacts] zstandard is not installed, using gzip")
+                compression = "gzip"
+            else:
+                self._zstd = zstandard.ZstdCompressor()   # used by the writer thread only
+        self.compression = compression
+        self.path = path + {"gzip": ".gz", "zstd": ".zst"}.get(compression, "")
+
+    def write_batch(self, runs):
+        data = b"".join(
+            records.dumps({"run_id": run["run_id"], "timestamp": run["timestamp"], "input": run["input"], **run["steps"]})
+            + b"\n"
+            for run in runs
+        )
+        if self.compression == "gzip":
+            data = gzip.compress(data, compresslevel=6)
+        elif self.compression == "zstd":
+            data = self._zstd.compress(data)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+
+def _write_files(directory, run):
+    for step, filename in STEP_FILES:
+        with open(os.path.join(directory, filename), 'wb') as f:
+            f.write(records.dumps(run["steps"][step], indent=True))
+    document = run["steps"]["master"]["final_response"]["final_document_text"]
+    with open(os.path.join(directory, "final_proposal.md"), 'w', encoding='utf-8') as f:
+        f.write(document)
+
+
+class NullSink:
+    def submit(self, run):
+        return True
+
+    def flush(self, timeout=None):
+        return True
+
+    def close(self, timeout=None):
+        pass
+
+
+class InlineSink(NullSink):
+    """Writes on the caller's thread (used for the legacy "shared" mode)."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def submit(self, run):
+        try:
+            self.store.write_batch([run])
+        except OSError as e:
+            print(f"[Artifacts] Write failed: {e}")
+            return False
+        return True
+
+
+class BackgroundSink(NullSink):
+    """Hands runs to a daemon writer thread; submit() never blocks."""
+
+    def __init__(self, store, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE):
+        self.store = store
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._work, name="rfp-artifacts", daemon=True)
+        self._thread.start()
+
+    def submit(self, run):
+        try:
+            self._queue.put_nowait(run)
+        except queue.Full:
+            self.dropped += 1
+            metrics.inc("rfp_artifacts_dropped_total")
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                print(f"[Artifacts] Writer queue full, {self.dropped} run(s) dropped")
+            return False
+        return True
+
+    def _work(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            runs = [run for run in batch if run is not None]
+            try:
+                if runs:
+                    with metrics.stage("artifact_write"):
+                        self.store.write_batch(runs)
+                    self.written += len(runs)
+            except Exception as e:
+                print(f"[Artifacts] Write failed for {len(runs)} run(s): {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(runs) < len(batch):
+                return  # close() sentinel
+
+    def flush(self, timeout=None):
+        """Waits until everything submitted so far is written; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout=None):
+        if self._thread.is_alive():
+            self.flush(timeout)
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+
+def create_sink(mode=None):
+    mode = ARTIFACT_MODE if mode is None else mode
+    if mode == "off":
+        return NullSink()
+    if mode == "shared":
+        return InlineSink(SharedDirectoryStore())
+    if mode == "dirs":
+        return BackgroundSink(RunDirectoryStore())
+    if mode == "jsonl":
+        return BackgroundSink(JsonLinesStore())
+    raise ValueError(f"Unknown artifact mode: {mode}")
+
+
+_sink = None
+_sink_pid = None
+_sink_lock = threading.Lock()
+
+
+def get_sink():
+    """Returns the process-wide sink (recreated after a fork, whose copy has no writer thread)."""
+    global _sink, _sink_pid
+    if _sink is None or _sink_pid != os.getpid():
+        with _sink_lock:
+            if _sink is None or _sink_pid != os.getpid():
+                _sink, _sink_pid = create_sink(), os.getpid()
+    return _sink
+
+
+def set_sink(sink):
+    """Replaces the process-wide sink (e.g. a CLI option); the old one is flushed and closed."""
+    global _sink, _sink_pid
+    with _sink_lock:
+        old, _sink, _sink_pid = _sink, sink, os.getpid()
+    if old is not None and old is not sink:
+        old.close(EXIT_FLUSH_SECONDS)
+
+
+def record_run(input_text, steps, run_id=None):
+    return get_sink().submit(new_run(input_text, steps, run_id))
+
+
+@atexit.register
+def _flush_at_exit():
+    if _sink is not None and _sink_pid == os.getpid():
+        _sink.close(EXIT_FLUSH_SECONDS)
@@ -0,0 +1,237 @@
+"""Tender attachments (PDF/DOCX requirement schedules) for the SalesAgent.
+
+Links on a tender page whose path ends in .pdf or .docx are downloaded on a
+shared thread pool (DOWNLOAD_WORKERS across all requests), through the same
+session and page cache as tender pages, each capped at MAX_BYTES and
+DOWNLOAD_SECONDS. Parsing is CPU-bound, so document_text.extract_text runs
+in a process pool (EXTRACT_WORKERS) and request threads are not starved of
+the GIL. Extracted text is cached on disk under the SHA-256 of the file, so
+an unchanged schedule, or one linked from several tenders, is parsed once.
+The parser only checks its deadline between text parts, so a call that hangs
+inside pypdf or iterparse is stopped from here: after EXTRACT_SECONDS plus a
+margin the pool's workers are killed (each reports its PID when it starts)
+and the next file starts a new pool. A pool is also retired, letting its
+running files finish, after EXTRACT_TASKS_PER_POOL files.
+The process pool and the parser are imported when the first file needs
+extracting.
+"""
+import hashlib
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from contextlib import closing
+from urllib.parse import unquote, urljoin, urlsplit
+
+import http_client
+import metrics
+
+# --- Attachment Settings ---
+ENABLED = os.environ.get("RFP_ATTACHMENTS", "1") == "1"
+ATTACHMENT_TYPES = {".pdf": "pdf", ".docx": "docx"}
+MAX_ATTACHMENTS = 10                 # per tender page, in link order
+MAX_BYTES = int(os.environ.get("RFP_ATTACHMENT_MAX_BYTES", str(20 * 1024 * 1024)))
+DOWNLOAD_SECONDS = 30                # per file, first byte to last
+EXTRACT_SECONDS = 30                 # per file, in the worker process
+DOWNLOAD_WORKERS = 4
+EXTRACT_WORKERS = min(4, os.cpu_count() or 1)
+EXTRACT_TASKS_PER_POOL = 200         # files parsed before the pool is replaced by fresh workers
+TEXT_CACHE_DIR = os.path.join("cache", "attachments")
+
+
+class AttachmentError(Exception):
+    pass
+
+
+def attachment_type(url):
+    """"pdf", "docx" or None, from the extension of the URL path."""
+    path = urlsplit(url).path.lower()
+    for extension, kind in ATTACHMENT_TYPES.items():
+        if path.endswith(extension):
+            return kind
+    return None
+
+
+class LinkCollector:
+    """Keeps the attachment links among the hrefs it is called with (at most MAX_ATTACHMENTS)."""
+
+    def __init__(self, base_url, limit=MAX_ATTACHMENTS):
+        self.base_url = base_url
+        self.limit = limit
+        self.urls = []
+
+    def __call__(self, href):
+        if len(self.urls) >= self.limit or not href:
+            return
+        url = urljoin(self.base_url, href.strip()).split("#", 1)[0]
+        if url.startswith("http") and attachment_type(url) and url not in self.urls:
+            self.urls.append(url)
+
+
+_pools = (None, None, None)    # (pid, download pool, extraction pool)
+_pools_lock = threading.Lock()
+
+
+def _download_pool():
+    global _pools
+    if _pools[0] != os.getpid():
+        with _pools_lock:
+            if _pools[0] != os.getpid():
+                # Pools inherited across a fork have no threads or processes behind them
+                pool = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix="rfp-attachment")
+                _pools = (os.getpid(), pool, None)
+    return _pools[1]
+
+
+def _report_pid(started):
+    # Process pool initializer: tells the parent which PIDs to kill on a timeout
+    started.put(os.getpid())
+
+
+class _ExtractionPool:
+    """A spawn-context process pool that knows its worker PIDs."""
+
+    def __init__(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Started on first use from a threaded server, so spawn rather than fork
+        context = multiprocessing.get_context("spawn")
+        self._started = context.SimpleQueue()
+        self.executor = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, mp_context=context,
+                                            initializer=_report_pid, initargs=(self._started,))
+        self.submitted = 0
+        self._pids = set()
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        return self.executor.submit(fn, *args)
+
+    def pids(self):
+        while not self._started.empty():
+            self._pids.add(self._started.get())
+        return set(self._pids)
+
+    def retire(self):
+        self.executor.shutdown(wait=False)
+
+    def kill(self):
+        for pid in self.pids():
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass   # already gone
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_pool():
+    global _pools
+    _download_pool()
+    pool = _pools[2]
+    if pool is None or pool.submitted >= EXTRACT_TASKS_PER_POOL:
+        with _pools_lock:
+            pool = _pools[2]
+            if pool is None or pool.submitted >= EXTRACT_TASKS_PER_POOL:
+                if pool is not None:
+                    pool.retire()   # bounds how long any worker lives; running files finish
+                pool = _ExtractionPool()
+                _pools = (_pools[0], _pools[1], pool)
+    return pool
+
+
+def _discard_extract_pool(pool):
+    # A worker is stuck past its own deadline: kill the pool so it can't hold a
+    # worker forever. Files still parsing on it fail with BrokenProcessPool.
+    global _pools
+    with _pools_lock:
+        if _pools[2] is not pool:
+            return   # another timeout already replaced it
+        _pools = (_pools[0], _pools[1], None)
+    pool.kill()
+    print("[Attachments] Extraction pool discarded after a timeout")
+
+
+def _download(url):
+    page = http_client.PageStream(url, max_bytes=MAX_BYTES, timeout=min(10, DOWNLOAD_SECONDS), verify=False)
+    deadline = time.monotonic() + DOWNLOAD_SECONDS
+    chunks = []
+    with closing(iter(page)) as stream:
+        for chunk in stream:
+            chunks.append(chunk)
+            if time.monotonic() > deadline:
+                raise AttachmentError(f"download took longer than {DOWNLOAD_SECONDS}s")
+    if page.truncated:
+        raise AttachmentError(f"larger than {MAX_BYTES} bytes")
+    return b"".join(chunks)
+
+
+def _text_path(digest):
+    return os.path.join(TEXT_CACHE_DIR, digest + ".txt")
+
+
+def cached_text(digest):
+    try:
+        with open(_text_path(digest), "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def store_text(digest, text):
+    os.makedirs(TEXT_CACHE_DIR, exist_ok=True)
+    path = _text_path(digest)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _ingest(url):
+    # Runs on the download pool; returns (document, text or None)
+    kind = attachment_type(url)
+    document = {"url": url, "name": unquote(os.path.basename(urlsplit(url).path)), "type": kind}
+    try:
+        content = _download(url)
+        digest = hashlib.sha256(content).hexdigest()
+        document.update({"bytes": len(content), "sha256": digest})
+
+        text = cached_text(digest)
+        document["cached"] = text is not None
+        if text is None:
+            import document_text
+
+            pool = _extract_pool()
+            future = pool.submit(document_text.extract_text, content, kind, EXTRACT_SECONDS)
+            # The worker stops itself at EXTRACT_SECONDS; the margin covers pickling and start-up
+            try:
+                text = future.result(timeout=EXTRACT_SECONDS + 10)
+            except FutureTimeout:
+                _discard_extract_pool(pool)
+                raise
+            store_text(digest, text)
+        document["characters"] = len(text)
+        metrics.inc("rfp_attachments_total", label="cached" if document["cached"] else "extracted")
+        return document, text
+    except FutureTimeout:
+        document["error"] = f"text extraction took longer than {EXTRACT_SECONDS}s"
+    except Exception as e:
+        document["error"] = str(e) or type(e).__name__
+    print(f"[Attachments] {url}: {document['error']}")
+    metrics.inc("rfp_attachments_total", label="failed")
+    return document, None
+
+
+def ingest(urls):
+    """Downloads and extracts urls concurrently; returns [(document, text or None)] in url order.
+
+    A document is {url, name, type, bytes, sha256, cached, characters} or,
+    when it could not be read, {url, name, type, error}.
+    """
+    if not urls:
+        return []
+    pool = _download_pool()
+    with metrics.stage("attachments"):
+        futures = [pool.submit(_ingest, url) for url in urls]
+        return [future.result() for future in futures]
@@ -0,0 +1,108 @@
+"""Benchmark: PDF/DOCX attachment ingestion through the process pool.
+
+Serves --docs large schedules from a local stub server, ingests them through
+the process pool and, for comparison, extracts the same files one by one in
+the calling thread. A ticker thread measures how long request threads are
+kept waiting for the GIL in each case. The fixture checks (per-file errors,
+text cache, streaming mode) are in tests/test_attachments.py.
+
+Usage: python benchmarks/bench_attachments.py [--docs 8] [--rows 40000]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import attachments  # noqa: E402
+import corpus  # noqa: E402
+import document_text  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TICK_SECONDS = 0.001
+
+
+class Ticker:
+    """Sleeps TICK_SECONDS in a loop and records the longest overshoot (time spent waiting for the GIL)."""
+
+    def __init__(self):
+        self.worst = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            time.sleep(TICK_SECONDS)
+            self.worst = max(self.worst, time.perf_counter() - start - TICK_SECONDS)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=40000, help="schedule lines per document")
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix="rfp-bench-attachments-")
+    cwd = os.getcwd()
+    os.chdir(workdir)   # page and text caches start empty
+    attachments.MAX_BYTES = 8 * 1024 * 1024
+    try:
+        with StubServer() as server:
+            files = []
+            for n in range(args.docs):
+                lines = corpus.schedule_lines(args.rows, rng)
+                if n % 2:
+                    files.append((server.add(f"/bulk/{n}.docx", corpus.docx_document(lines), DOCX), "docx"))
+                else:
+                    files.append((server.add(f"/bulk/{n}.pdf", corpus.pdf_document(lines), PDF), "pdf"))
+            urls = [url for url, _ in files]
+            contents = [attachments._download(url) for url in urls]
+
+            # Serial baseline: every file parsed in this process, one after another
+            with Ticker() as serial_ticker:
+                start = time.perf_counter()
+                for content, (_, kind) in zip(contents, files):
+                    document_text.extract_text(content, kind)
+                serial_s = time.perf_counter() - start
+
+            attachments.ingest(urls[:1])   # starts the worker processes
+            shutil.rmtree(attachments.TEXT_CACHE_DIR, ignore_errors=True)
+            with Ticker() as pool_ticker:
+                start = time.perf_counter()
+                attachments.ingest(urls)
+                pool_s = time.perf_counter() - start
+            start = time.perf_counter()
+            attachments.ingest(urls)
+            cached_s = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    total_mb = sum(len(content) for content in contents) / 1e6
+    print(f"{os.cpu_count()} CPU(s), {args.docs} documents, {total_mb:.1f} MB")
+    print(f"{'mode':>14} {'seconds':>8} {'worst GIL wait ms':>18}")
+    print(f"{'in-thread':>14} {serial_s:>8.2f} {serial_ticker.worst * 1000:>18.1f}")
+    print(f"{'process pool':>14} {pool_s:>8.2f} {pool_ticker.worst * 1000:>18.1f}")
+    print(f"{'text cache':>14} {cached_s:>8.2f} {'-':>18}")
+
+
+if __name__ == "__main__":
+    main()
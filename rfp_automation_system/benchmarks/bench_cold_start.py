@@ -0,0 +1,116 @@
+"""Benchmark: cold start of the CLI, the agents and the HTTP API.
+
+Imports cli, rfp_system and server in fresh interpreters under
+`python -X importtime` (best of --repeat; self-reported import time, not
+interpreter start-up), each in an empty working directory.
+
+Then boots a database twice: the first initialize_db creates it, and the
+second finds it up to date. For comparison, the original schema migration is
+run again on the same database, which is what every boot used to do.
+
+tests/test_cold_start.py checks the import budgets, that imports load none of
+the HEAVY_MODULES and write no files, and that an up-to-date boot runs no DDL.
+
+Usage: python benchmarks/bench_cold_start.py [--repeat 5]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+import database  # noqa: E402
+
+MODULES = ("cli", "rfp_system", "server")
+# Only needed once a page is fetched, parsed or priced, or a zstd artifact log is opened
+HEAVY_MODULES = ("requests", "bs4", "numpy", "urllib3", "multiprocessing", "concurrent.futures.process", "document_text",
+                 "zstandard")
+
+
+def import_once(module, workdir):
+    """(milliseconds, heavy modules loaded) for one import of module in a new interpreter."""
+    probe = f"import sys, json; import {module}; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    env = dict(os.environ, PYTHONPATH=PACKAGE_DIR, PYTHONDONTWRITEBYTECODE="1")
+    done = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], cwd=workdir, env=env,
+                          capture_output=True, text=True, check=True)
+    for line in done.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2] == " " + module:
+            return int(fields[1]) / 1000, json.loads(done.stdout.strip().splitlines()[-1])
+    raise RuntimeError(f"no importtime line for {module}")
+
+
+def time_imports(repeat):
+    print(f"{'module':>12} {'import ms':>10}")
+    for module in MODULES:
+        workdir = tempfile.mkdtemp(prefix="rfp-bench-cold-")
+        try:
+            best = min(import_once(module, workdir)[0] for _ in range(repeat))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        print(f"{module:>12} {best:>10.1f}")
+
+
+def traced_boot(boot=database.initialize_db):
+    """(seconds, statements run) for one boot (initialize_db by default)."""
+    statements = []
+    connect = database.get_db_connection
+
+    def traced_connection():
+        conn = connect()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    database.get_db_connection = traced_connection
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            boot()
+        return time.perf_counter() - start, statements
+    finally:
+        database.get_db_connection = connect
+
+
+def legacy_boot():
+    # What every boot did before schema versioning: the whole original migration
+    with contextlib.closing(database.get_db_connection()) as conn:
+        database.MIGRATIONS[0](conn)
+        conn.commit()
+
+
+def time_boot():
+    workdir = tempfile.mkdtemp(prefix="rfp-bench-cold-")
+    try:
+        database.DB_FILE = os.path.join(workdir, "cold.db")
+        create_s, _ = traced_boot()
+        boot_s, statements = traced_boot()
+        legacy_s, legacy_statements = traced_boot(legacy_boot)
+    finally:
+        database.close_pool()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'boot':>12} {'ms':>10} {'statements':>10}")
+    print(f"{'new db':>12} {create_s * 1000:>10.1f} {'-':>10}")
+    print(f"{'re-migrate':>12} {legacy_s * 1000:>10.1f} {len(legacy_statements):>10}")
+    print(f"{'up to date':>12} {boot_s * 1000:>10.1f} {len(statements):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    time_imports(args.repeat)
+    time_boot()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark: keyword/quantity extraction over large synthetic tender documents.
+
+Times the original per-keyword scan against KeywordExtractor.
+tests/test_extraction.py checks that both produce identical items.
+
+Usage: python benchmarks/bench_extraction.py [--sizes 0.1,1,5] [--keywords 7,500,2000]
+"""
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import KeywordExtractor  # noqa: E402
+
+BASE_KEYWORDS = ["Laptop", "Server", "Cable", "Software", "Office 365", "Switch", "Router"]
+FILLER = ("the", "supply", "of", "units", "tender", "delivery", "within", "days", "and", "for",
+          "department", "schedule", "item", "qty", "nos", "warranty", "years", "installation")
+
+
+def make_keywords(count, rng):
+    keywords = list(BASE_KEYWORDS)
+    while len(keywords) < count:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+        keywords.append(word.capitalize() + rng.choice(["", " Pro", " Kit", " Module"]))
+    return keywords[:count]
+
+
+def make_document(size_mb, keywords, rng):
+    target = int(size_mb * 1024 * 1024)
+    parts = []
+    length = 0
+    while length < target:
+        roll = rng.random()
+        if roll < 0.03:
+            token = rng.choice(keywords)
+            token = token.upper() if rng.random() < 0.2 else token
+        elif roll < 0.12:
+            token = str(rng.randint(1, 500))
+        elif roll < 0.13:
+            token = "\n"
+        else:
+            token = rng.choice(FILLER)
+        parts.append(token)
+        length += len(token) + 1
+    return " ".join(parts)
+
+
+def legacy_extract(text_content, known_keywords):
+    # The original SalesAgent loop, kept here as the reference
+    items = []
+    for keyword in known_keywords:
+        if keyword.lower() in text_content.lower():
+            qty = 1
+            qty_match = re.search(rf'{keyword}.{{0,20}}?(\d+)', text_content, re.IGNORECASE)
+            if not qty_match:
+                qty_match = re.search(rf'(\d+).{{0,20}}?{keyword}', text_content, re.IGNORECASE)
+            if qty_match:
+                qty = int(qty_match.group(1))
+            items.append({"name": keyword, "quantity": qty, "description": f"Detected {keyword} in text"})
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="0.1,1,5", help="document sizes in MB")
+    parser.add_argument("--keywords", default="7,500,2000")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    print(f"{'doc MB':>7} {'keywords':>9} {'compile ms':>11} {'single-pass ms':>15} {'legacy ms':>10} {'speedup':>8}")
+    for size in [float(s) for s in args.sizes.split(",")]:
+        for count in [int(k) for k in args.keywords.split(",")]:
+            rng = random.Random(args.seed)
+            keywords = make_keywords(count, rng)
+            text = make_document(size, keywords, rng)
+
+            start = time.perf_counter()
+            extractor = KeywordExtractor(keywords)
+            compile_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            extractor.extract(text)
+            fast_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            legacy_extract(text, keywords)
+            legacy_ms = (time.perf_counter() - start) * 1000
+
+            print(f"{size:>7} {count:>9} {compile_ms:>11.1f} {fast_ms:>15.1f} {legacy_ms:>10.1f} {legacy_ms / fast_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark: paging and searching a large rfp_requests history.
+
+Fills a fresh database with --rows requests (many sharing a timestamp, to
+exercise the id tie-break), walks every page of list_rfp_requests and checks
+the rows match one full ORDER BY scan, then compares page latency against
+OFFSET paging at increasing depth and times full-text searches.
+
+Usage: python benchmarks/bench_history.py [--rows 100000] [--page 50]
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+
+AUTHORITIES = ["Public Works Department", "Metro Rail Corporation", "Municipal Corporation", "State Electricity Board",
+               "Indian Railways", "Port Trust", "University Grants Commission", "Health Department"]
+ITEMS = ["laptops", "servers", "network switches", "routers", "fibre cable", "office licences", "printers"]
+STATUSES = ["Pending"] * 6 + ["Approved"] * 3 + ["Declined"]
+
+
+def fill(rows, rng):
+    start = datetime.datetime(2021, 1, 1)
+    with database.db_transaction() as conn:
+        conn.executemany('''
+            INSERT INTO rfp_requests (timestamp, input_text, title, authority, status, job_state)
+            VALUES (?, ?, ?, ?, ?, 'done')
+        ''', (
+            ((start + datetime.timedelta(minutes=i // 3)).strftime("%Y-%m-%d %H:%M:%S"),
+             f"https://tenders.example.gov/notice/{i}",
+             f"Supply of {rng.choice(ITEMS)} and {rng.choice(ITEMS)} - lot {i}",
+             rng.choice(AUTHORITIES),
+             rng.choice(STATUSES))
+            for i in range(rows)
+        ))
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def offset_page(offset, limit):
+    with database.db_connection() as conn:
+        return conn.execute('''
+            SELECT id, timestamp, status, job_state, title, authority, substr(input_text, 1, 200)
+            FROM rfp_requests ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?
+        ''', (limit, offset)).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=8)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="rfp-bench-history-")
+    try:
+        database.DB_FILE = os.path.join(workdir, "history.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            database.initialize_db()
+        _, fill_ms = timed(fill, args.rows, random.Random(args.seed))
+        print(f"[Benchmark] Inserted {args.rows} rows (with FTS triggers) in {fill_ms / 1000:.1f}s")
+
+        # Walk every page and check against one full scan
+        with database.db_connection() as conn:
+            expected = [row[0] for row in conn.execute('SELECT id FROM rfp_requests ORDER BY timestamp DESC, id DESC')]
+        seen, cursor, page_times = [], None, []
+        while True:
+            (items, cursor), ms = timed(database.list_rfp_requests, limit=args.page, cursor=cursor)
+            page_times.append(ms)
+            seen.extend(item["id"] for item in items)
+            if cursor is None:
+                break
+        if seen != expected:
+            print("[Benchmark] Keyset pages do not match the full ordering")
+            sys.exit(1)
+        page_times.sort()
+        print(f"[Benchmark] {len(page_times)} keyset pages: p50 {page_times[len(page_times) // 2]:.2f} ms, "
+              f"max {page_times[-1]:.2f} ms")
+
+        print(f"{'depth':>8} {'keyset ms':>10} {'offset ms':>10}")
+        for fraction in (0, 0.5, 0.99):
+            depth = int(len(expected) * fraction) // args.page * args.page
+            if depth:
+                anchor = expected[depth - 1]
+                with database.db_connection() as conn:
+                    timestamp = conn.execute('SELECT timestamp FROM rfp_requests WHERE id = ?', (anchor,)).fetchone()[0]
+                cursor = database.encode_cursor(timestamp, anchor)
+            else:
+                cursor = None
+            (items, _), keyset_ms = timed(database.list_rfp_requests, limit=args.page, cursor=cursor)
+            rows, offset_ms = timed(offset_page, depth, args.page)
+            if [item["id"] for item in items] != [row[0] for row in rows]:
+                print(f"[Benchmark] MISMATCH at depth {depth}")
+                sys.exit(1)
+            print(f"{depth:>8} {keyset_ms:>10.2f} {offset_ms:>10.2f}")
+
+        print(f"{'search':>28} {'hits on page':>13} {'ms':>8}")
+        for query in ("metro", "fibre cable", "railways", "lic*", "Approved servers", "nonexistentword"):
+            (items, _), ms = timed(database.list_rfp_requests, query=query, limit=args.page)
+            print(f"{query:>28} {len(items):>13} {ms:>8.2f}")
+        (items, _), ms = timed(database.list_rfp_requests, status="Approved", date_from="2021-01-10",
+                               date_to="2021-01-12", limit=args.page)
+        print(f"{'status + date range':>28} {len(items):>13} {ms:>8.2f}")
+    finally:
+        database.close_pool()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark: loading a large supplier catalog.
+
+Writes --rows products as CSV, then loads them into a fresh database twice:
+once through add_product (one transaction per SKU, as the single-product
+endpoint does, with the live matching index patched after each one) and once
+through catalog_import.import_products (including its index rebuild). Checks both
+end with the same inventory and that re-importing the file updates in place.
+
+Usage: python benchmarks/bench_import.py [--rows 200000] [--loop-rows 20000]
+"""
+import argparse
+import contextlib
+import csv
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog_import  # noqa: E402
+import database  # noqa: E402
+import matching  # noqa: E402
+
+WORDS = ["Laptop", "Server", "Cable", "Software", "Switch", "Router", "Printer", "Monitor", "Firewall", "Storage"]
+
+
+def write_catalog(path, rows, rng):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["sku", "name", "category", "base_cost", "description"])
+        for i in range(rows):
+            word = rng.choice(WORDS)
+            writer.writerow([f"SUP-{i:07d}", f"{word} Model {i}", "Hardware", round(rng.uniform(10, 90000), 2),
+                             f"{word} from supplier feed"])
+
+
+def fresh_db(path):
+    database.DB_FILE = path
+    with contextlib.redirect_stdout(io.StringIO()):
+        database.initialize_db()
+
+
+def inventory_rows():
+    with database.db_connection() as conn:
+        return conn.execute("SELECT sku, name, category, base_cost, description FROM inventory ORDER BY sku").fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--loop-rows", type=int, default=20000, help="rows loaded through add_product (extrapolated)")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="rfp-bench-import-")
+    cwd = os.getcwd()
+    os.chdir(workdir)   # no data/ here, so initialize_db starts with an empty catalog
+    try:
+        path = os.path.join(workdir, "catalog.csv")
+        write_catalog(path, args.rows, random.Random(args.seed))
+
+        fresh_db(os.path.join(workdir, "loop.db"))
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = [row for _, row in zip(range(args.loop_rows), csv.DictReader(f))]
+        matching.get_index()   # a running server already has one
+        start = time.perf_counter()
+        for row in rows:
+            database.add_product(catalog_import.validate(row)[0])
+        loop_s = (time.perf_counter() - start) * args.rows / len(rows)
+        expected = inventory_rows()
+
+        fresh_db(os.path.join(workdir, "bulk.db"))
+        start = time.perf_counter()
+        with open(path, encoding="utf-8", newline="") as f, contextlib.redirect_stdout(io.StringIO()):
+            report = catalog_import.import_products(f, "csv")
+        bulk_s = time.perf_counter() - start
+        actual = inventory_rows()
+
+        with open(path, encoding="utf-8", newline="") as f, contextlib.redirect_stdout(io.StringIO()):
+            again = catalog_import.import_products(f, "csv")
+    finally:
+        database.close_pool()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'rows':>8} {'add_product s (est.)':>21} {'bulk import s':>14} {'speedup':>8}")
+    print(f"{args.rows:>8} {loop_s:>21.1f} {bulk_s:>14.1f} {loop_s / bulk_s:>7.1f}x")
+
+    ok = (report["created"] == args.rows and not report["failed"] and len(actual) == args.rows
+          and [tuple(r) for r in actual[:len(expected)]] == [tuple(r) for r in expected]
+          and again["updated"] == args.rows and again["created"] == 0)
+    if not ok:
+        print(f"[Benchmark] MISMATCH: first import {report['created']} created, re-import "
+              f"{again['created']} created / {again['updated']} updated, {len(actual)} rows stored")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark: SKU match time vs. catalog size, linear scan vs. InventoryIndex.
+
+tests/test_matching.py checks that both give the same matches.
+
+Usage: python benchmarks/bench_matching.py [--sizes 100,1000,10000,50000] [--items 300]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matching import InventoryIndex  # noqa: E402
+
+BRANDS = ["ProBook", "EliteBook", "PowerEdge", "Catalyst", "ThinkPad", "Latitude", "Nexus", "Aruba"]
+CATEGORIES = ["Laptop", "Server", "Software", "Networking", "Cable", "Switch", "Router", "Storage"]
+KEYWORDS = ["Laptop", "Server", "Cable", "Software", "Office 365", "Switch", "Router"]
+
+
+def make_catalog(size, rng):
+    catalog = []
+    for i in range(size):
+        catalog.append({
+            "sku": f"SKU-{i:06d}",
+            "name": f"{rng.choice(BRANDS)} {rng.choice(CATEGORIES)} {rng.randint(1, 9999)}",
+            "category": rng.choice(CATEGORIES),
+            "base_cost": float(rng.randint(100, 500000)),
+            "description": ""
+        })
+    return catalog
+
+
+def make_items(count, catalog, rng):
+    items = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.5:
+            items.append(rng.choice(KEYWORDS))
+        elif roll < 0.8:
+            items.append(rng.choice(catalog)["name"])
+        else:
+            items.append(f"Generic Item {rng.randint(1, 100000)}")
+    return items
+
+
+def linear_best_match(inventory, item_name):
+    # The original TechnicalAgent scan, kept here as the reference
+    best_match = None
+    highest_score = 0
+    for sku in inventory:
+        score = 0
+        item_lower = item_name.lower()
+        sku_name = sku["name"].lower()
+        sku_cat = sku["category"].lower()
+        if sku_name in item_lower or item_lower in sku_name:
+            score += 50
+        if sku_cat in item_lower:
+            score += 30
+        if score > highest_score:
+            highest_score = score
+            best_match = sku
+    return best_match, highest_score
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="100,1000,10000,50000")
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'SKUs':>8} {'build ms':>10} {'index ms':>10} {'linear ms':>10} {'speedup':>8}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        rng = random.Random(args.seed)
+        catalog = make_catalog(size, rng)
+        items = make_items(args.items, catalog, rng)
+
+        start = time.perf_counter()
+        index = InventoryIndex(catalog)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for name in items:
+            index.best_match(name)
+        index_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for name in items:
+            linear_best_match(catalog, name)
+        linear_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{size:>8} {build_ms:>10.1f} {index_ms:>10.1f} {linear_ms:>10.1f} {linear_ms / index_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
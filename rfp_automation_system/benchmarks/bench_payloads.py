@@ -0,0 +1,129 @@
+"""Benchmark: storage size and scan cost of inline vs. split request payloads.
+
+Runs the agents over --runs synthetic text RFPs, stores the results the old way
+(four JSON columns per row), migrates a copy with initialize_db, and compares
+file sizes after VACUUM, a full scan of rfp_requests, and that every payload
+loads back unchanged.
+
+Usage: python benchmarks/bench_payloads.py [--runs 20000]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+import records  # noqa: E402
+from rfp_system import MasterAgent, PricingAgent, SalesAgent, TechnicalAgent  # noqa: E402
+
+PRODUCTS = ["Laptop", "Server", "Cable", "Software", "Office 365", "Switch", "Router"]
+LEGACY_SCHEMA = '''
+    CREATE TABLE rfp_requests (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        input_text TEXT,
+        sales_data TEXT,
+        tech_data TEXT,
+        pricing_data TEXT,
+        final_response TEXT,
+        status TEXT DEFAULT 'Pending',
+        job_state TEXT,
+        job_stage TEXT,
+        job_error TEXT
+    )
+'''
+
+
+def make_runs(count, rng):
+    agents = SalesAgent(), TechnicalAgent(), PricingAgent(), MasterAgent()
+    # A few distinct tenders, each submitted many times (re-runs, retries)
+    tenders = [
+        " ".join(f"{rng.randint(1, 50)} {p}" for p in rng.sample(PRODUCTS, rng.randint(1, len(PRODUCTS))))
+        for _ in range(max(1, count // 20))
+    ]
+    runs = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(count):
+            text = rng.choice(tenders)
+            sales = agents[0].process(text)
+            tech = agents[1].process(sales)
+            pricing = agents[2].process(tech)
+            runs.append((text, sales, tech, pricing, agents[3].process(sales, tech, pricing)))
+    return runs
+
+
+def scan_ms(path):
+    conn = sqlite3.connect(path)
+    start = time.perf_counter()
+    conn.execute("SELECT COUNT(*) FROM rfp_requests WHERE input_text LIKE '%no such tender%'").fetchone()
+    elapsed = (time.perf_counter() - start) * 1000
+    conn.close()
+    return elapsed
+
+
+def vacuum(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=4)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="rfp-bench-payloads-")
+    legacy_path = os.path.join(workdir, "legacy.db")
+    split_path = os.path.join(workdir, "split.db")
+    try:
+        database.DB_FILE = os.path.join(workdir, "catalog.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            database.initialize_db()
+        runs = make_runs(args.runs, random.Random(args.seed))
+
+        conn = sqlite3.connect(legacy_path)
+        conn.execute(LEGACY_SCHEMA)
+        conn.executemany('''
+            INSERT INTO rfp_requests (input_text, sales_data, tech_data, pricing_data, final_response, status, job_state)
+            VALUES (?, ?, ?, ?, ?, 'Pending', 'done')
+        ''', [(text,) + tuple(records.dumps(part).decode("utf-8") for part in parts) for text, *parts in runs])
+        conn.commit()
+        conn.close()
+        shutil.copy(legacy_path, split_path)
+
+        database.DB_FILE = split_path
+        start = time.perf_counter()
+        database.initialize_db()
+        migrate_s = time.perf_counter() - start
+
+        for request_id, (text, *parts) in enumerate(runs, start=1):
+            job = database.get_job(request_id)
+            loaded = [job[column] for column in database.PAYLOAD_COLUMNS]
+            if loaded != json.loads(records.dumps(parts)):
+                print(f"[Benchmark] Payload MISMATCH for request {request_id}")
+                sys.exit(1)
+        database.close_pool()
+
+        legacy_size, split_size = vacuum(legacy_path), vacuum(split_path)
+        print(f"{'runs':>7} {'legacy MB':>10} {'split MB':>9} {'saved':>6} {'migration s':>12} {'legacy scan ms':>15} {'split scan ms':>14}")
+        print(f"{args.runs:>7} {legacy_size / 1e6:>10.1f} {split_size / 1e6:>9.1f} {100 * (1 - split_size / legacy_size):>5.0f}% "
+              f"{migrate_s:>12.1f} {scan_ms(legacy_path):>15.1f} {scan_ms(split_path):>14.1f}")
+    finally:
+        database.close_pool()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Benchmark suite: every agent and a full Orchestrator.run on generated input.
+
+Inputs come from corpus.py (seeded, so every run sees identical data) and
+tender pages are served by a local stub server, so nothing touches the
+network or the repository's database:
+
+* sales         - SalesAgent.process per page size, DOM and streaming parsers
+* technical     - TechnicalAgent.process per catalog size x BOM length
+* pricing       - PricingAgent.process on the same matrix
+* master        - MasterAgent.process per BOM length
+* orchestrator  - Orchestrator.run against a temporary SQLite database
+
+Each scenario reports p50/p99/mean latency, throughput and peak traced
+memory (one extra pass under tracemalloc). Orchestrator rows also list the
+mean per-stage timings from metrics.collect_timings().
+
+--save writes the results as a JSON baseline; --compare checks a run against
+one and exits 1 when any p50 or peak memory is worse by more than
+--tolerance (default 25%).
+
+Usage: python benchmarks/bench_pipeline.py [--quick] [--only sales,pricing]
+                                           [--save base.json] [--compare base.json]
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import artifacts  # noqa: E402
+import corpus  # noqa: E402
+import database  # noqa: E402
+import metrics  # noqa: E402
+from rfp_system import MasterAgent, Orchestrator, PricingAgent, SalesAgent, TechnicalAgent  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+# --- Suite Presets ---
+PRESETS = {
+    "full": {
+        "page_kb": [10, 100, 1000, 5000],
+        "catalog": [100, 1000, 10000, 100000],
+        "bom": [1, 100, 1000, 10000],
+        "orchestrator": (200, 1000),      # (page KB, catalog size)
+        "min_seconds": 1.0,
+    },
+    "quick": {
+        "page_kb": [10, 200],
+        "catalog": [100, 5000],
+        "bom": [1, 500],
+        "orchestrator": (50, 1000),
+        "min_seconds": 0.2,
+    },
+}
+GROUPS = ("sales", "technical", "pricing", "master", "orchestrator")
+MIN_ITERATIONS = 5
+MAX_ITERATIONS = 500
+NOISE_FLOOR_MS = 0.05     # p50 differences below this are never a regression
+NOISE_FLOOR_MB = 1.0
+
+
+def _quiet(fn, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def measure(fn, work, unit, min_seconds):
+    """Runs fn repeatedly (at least MIN_ITERATIONS times or min_seconds); work is units per call."""
+    _quiet(fn)   # warm-up: caches, lazy indexes, connection pool
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < MAX_ITERATIONS and (len(samples) < MIN_ITERATIONS or time.perf_counter() - started < min_seconds):
+        t0 = time.perf_counter()
+        _quiet(fn)
+        samples.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        _quiet(fn)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    mean = sum(samples) / len(samples)
+    return {
+        "iterations": len(samples),
+        "p50_ms": round(_percentile(samples, 0.50) * 1000, 4),
+        "p99_ms": round(_percentile(samples, 0.99) * 1000, 4),
+        "mean_ms": round(mean * 1000, 4),
+        "throughput": round(work / mean, 2) if mean else None,
+        "unit": unit,
+        "peak_mb": round(peak / 1e6, 3),
+    }
+
+
+# --- Scenarios ---
+
+def bench_sales(config, server, rng):
+    results = {}
+    for kb in config["page_kb"]:
+        page = corpus.tender_page(kb * 1024, rng)
+        url = server.add(f"/tender/{kb}kb", page)
+        for mode, stream in (("dom", False), ("stream", True)):
+            agent = SalesAgent(stream=stream)
+            results[f"sales/{mode}/{kb}kb"] = measure(
+                lambda: agent.process(url), len(page) / 1e6, "MB/s", config["min_seconds"])
+    return results
+
+
+def bench_matrix(config, rng, groups):
+    results = {}
+    technical, pricing = TechnicalAgent(), PricingAgent()
+    for size in config["catalog"]:
+        rows = corpus.inventory(size, rng)
+        snapshot, index = corpus.catalog(rows)
+        for lines in config["bom"]:
+            sales = corpus.sales_data(lines, rows, rng)
+            if "technical" in groups:
+                results[f"technical/{size}sku/{lines}lines"] = measure(
+                    lambda: technical.process(sales, index), lines, "lines/s", config["min_seconds"])
+            if "pricing" in groups:
+                tech = _quiet(technical.process, sales, index)
+                results[f"pricing/{size}sku/{lines}lines"] = measure(
+                    lambda: pricing.process(tech, snapshot), lines, "lines/s", config["min_seconds"])
+    return results
+
+
+def bench_master(config, rng):
+    results = {}
+    rows = corpus.inventory(max(config["catalog"][0], 100), rng)
+    snapshot, index = corpus.catalog(rows)
+    technical, pricing, master = TechnicalAgent(), PricingAgent(), MasterAgent()
+    for lines in config["bom"]:
+        sales = corpus.sales_data(lines, rows, rng)
+        tech = _quiet(technical.process, sales, index)
+        priced = _quiet(pricing.process, tech, snapshot)
+        results[f"master/{lines}lines"] = measure(
+            lambda: master.process(sales, tech, priced), lines, "lines/s", config["min_seconds"])
+    return results
+
+
+def bench_orchestrator(config, server, rng, workdir):
+    kb, size = config["orchestrator"]
+    url = server.add(f"/orchestrator/{kb}kb", corpus.tender_page(kb * 1024, rng))
+    _quiet(corpus.load_database, os.path.join(workdir, "bench.db"), corpus.inventory(size, rng))
+    artifacts.set_sink(artifacts.NullSink())
+    orchestrator = Orchestrator()
+
+    stage_totals = {}
+    calls = []
+
+    def run():
+        with metrics.collect_timings() as timings:
+            orchestrator.run(url, use_cache=False)   # time the agents, not the result cache
+        calls.append(1)
+        if len(calls) == 1 or tracemalloc.is_tracing():
+            return   # warm-up and the memory pass are not timed
+        for name, seconds in timings.items():
+            stage_totals.setdefault(name, []).append(seconds)
+
+    result = measure(run, 1, "runs/s", config["min_seconds"])
+    result["stages_mean_ms"] = {name: round(sum(values) / len(values) * 1000, 4)
+                                for name, values in sorted(stage_totals.items())}
+    return {f"orchestrator/{kb}kb/{size}sku": result}
+
+
+def run_suite(config, groups, seed):
+    def rng(group):
+        # One stream per group, so --only doesn't change the data a group sees
+        return random.Random(f"{seed}:{group}")
+
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="rfp_bench_")
+    cwd = os.getcwd()
+    os.chdir(workdir)   # page cache and any relative outputs stay out of the repo
+    try:
+        with StubServer() as server:
+            if "sales" in groups:
+                results.update(bench_sales(config, server, rng("sales")))
+            if "technical" in groups or "pricing" in groups:
+                results.update(bench_matrix(config, rng("matrix"), groups))
+            if "master" in groups:
+                results.update(bench_master(config, rng("master")))
+            if "orchestrator" in groups:
+                results.update(bench_orchestrator(config, server, rng("orchestrator"), workdir))
+    finally:
+        database.close_pool()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+# --- Baselines ---
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Lines describing each scenario against the baseline, and the number of regressions."""
+    lines, regressions = [], 0
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            lines.append(f"  {name:<40} (not in baseline)")
+            continue
+        ratio = result["p50_ms"] / base["p50_ms"] if base["p50_ms"] else 1.0
+        slower = ratio > 1 + tolerance and result["p50_ms"] - base["p50_ms"] > NOISE_FLOOR_MS
+        bigger = (result["peak_mb"] > base["peak_mb"] * (1 + tolerance)
+                  and result["peak_mb"] - base["peak_mb"] > NOISE_FLOOR_MB)
+        flag = "  REGRESSION" if slower or bigger else ""
+        regressions += bool(flag)
+        lines.append(f"  {name:<40} p50 {base['p50_ms']:>10.3f} -> {result['p50_ms']:>10.3f} ms ({ratio:5.2f}x)"
+                     f"  peak {base['peak_mb']:>8.2f} -> {result['peak_mb']:>8.2f} MB{flag}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quick", action="store_true", help="small corpus for a fast smoke run")
+    parser.add_argument("--only", default=",".join(GROUPS), help="comma-separated groups: " + ",".join(GROUPS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown / memory growth (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    groups = [group.strip() for group in args.only.split(",") if group.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(sorted(unknown))}")
+    preset = "quick" if args.quick else "full"
+    config = PRESETS[preset]
+
+    print(f"Running {preset} suite ({', '.join(groups)}), seed {args.seed}")
+    results = run_suite(config, groups, args.seed)
+
+    print(f"\n{'scenario':<40} {'iters':>6} {'p50 ms':>10} {'p99 ms':>10} {'throughput':>18} {'peak MB':>9}")
+    for name, r in results.items():
+        print(f"{name:<40} {r['iterations']:>6} {r['p50_ms']:>10.3f} {r['p99_ms']:>10.3f} "
+              f"{r['throughput']:>10.1f} {r['unit']:<7} {r['peak_mb']:>9.2f}")
+        for stage, ms in r.get("stages_mean_ms", {}).items():
+            print(f"    {stage:<36} {ms:>10.3f} ms mean")
+
+    if args.save:
+        report = {
+            "meta": {
+                "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "commit": _git_commit(),
+                "preset": preset,
+                "seed": args.seed,
+            },
+            "results": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        meta = baseline.get("meta", {})
+        print(f"\nAgainst {args.compare} (commit {meta.get('commit')}, {meta.get('date')}), tolerance {args.tolerance:.0%}:")
+        if meta.get("preset") != preset:
+            print(f"  note: baseline used the {meta.get('preset')} preset")
+        lines, regressions = compare(results, baseline.get("results", {}), args.tolerance)
+        print("\n".join(lines))
+        if regressions:
+            print(f"FAIL: {regressions} scenario(s) regressed")
+            sys.exit(1)
+        print("OK: no regressions")
+
+
+if __name__ == "__main__":
+    main()
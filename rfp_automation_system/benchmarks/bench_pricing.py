@@ -0,0 +1,145 @@
+"""Benchmark: columnar PricingAgent and MasterAgent on large bills of materials.
+
+Times the original per-line pricing loop and name lookup against the pricing
+engine, and pricing one BOM against many rule sets in a single batched call.
+tests/test_pricing.py checks that every formatted value matches.
+
+Usage: python benchmarks/bench_pricing.py [--lines 100,5000,50000] [--scenarios 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import MappingProxyType
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+import pricing_engine  # noqa: E402
+from rfp_system import MasterAgent, PricingAgent  # noqa: E402
+
+CATEGORIES = ["Hardware", "Software", "Networking", "Accessories"]
+RULES = {"standard_margin_percent": 15.0, "software_margin_percent": 25.0, "tax_rate_percent": 18.0}
+
+
+def make_catalog(size, rng):
+    inventory = tuple(
+        MappingProxyType({
+            "sku": f"SKU-{i:06d}",
+            "name": f"Product {i}",
+            "category": rng.choice(CATEGORIES),
+            "base_cost": round(rng.uniform(1, 250000), rng.choice([0, 1, 2])),
+            "stock": 100
+        })
+        for i in range(size)
+    )
+    by_sku = MappingProxyType({row["sku"]: row for row in inventory})
+    return database.CatalogSnapshot(0, inventory, by_sku, MappingProxyType(dict(RULES)))
+
+
+def make_tech_data(lines, catalog, rng):
+    skus = [row["sku"] for row in catalog.inventory]
+    matched = []
+    for i in range(lines):
+        if rng.random() < 0.05:
+            matched.append({"item": f"Item {i}", "matched_sku": "Not available", "match_percent": "0%"})
+        else:
+            matched.append({"item": f"Item {i}", "matched_sku": rng.choice(skus),
+                            "match_percent": "90%", "quantity": rng.randint(1, 5000)})
+    return {"tech_match": {"overall_match_percent": "95%", "matched_skus": matched}}
+
+
+def legacy_pricing(tech_data, rules, inventory):
+    # The original PricingAgent loop, kept here as the reference
+    breakdown = []
+    total_cost = 0.0
+    for match in tech_data["tech_match"]["matched_skus"]:
+        if match["matched_sku"] == "Not available":
+            continue
+        sku_info = inventory.get(match["matched_sku"])
+        base_cost = sku_info["base_cost"]
+        qty = match["quantity"]
+        margin_percent = rules["standard_margin_percent"]
+        if sku_info["category"] == "Software":
+            margin_percent = rules["software_margin_percent"]
+        unit_cost = base_cost
+        profit_margin = base_cost * (margin_percent / 100)
+        final_unit_price = unit_cost + profit_margin
+        tax = final_unit_price * (rules["tax_rate_percent"] / 100)
+        final_price_inc_tax = final_unit_price + tax
+        line_total = final_price_inc_tax * qty
+        total_cost += line_total
+        breakdown.append({
+            "sku": match["matched_sku"],
+            "unit_cost": f"{unit_cost:.2f}",
+            "profit_margin": f"{profit_margin:.2f}",
+            "tax": f"{tax:.2f}",
+            "final_unit_price": f"{final_price_inc_tax:.2f}",
+            "quantity": qty,
+            "line_total": f"{line_total:.2f}"
+        })
+    return {"pricing": {"total_cost": f"{total_cost:.2f}", "currency": "INR", "breakdown": breakdown}}
+
+
+def legacy_rows(tech_data, pricing_data):
+    # The original MasterAgent name lookup
+    rows = []
+    for item in pricing_data["pricing"]["breakdown"]:
+        item_name = next((t['item'] for t in tech_data['tech_match']['matched_skus'] if t['matched_sku'] == item['sku']), item['sku'])
+        rows.append(f"| {item_name} | {item['sku']} | {item['quantity']} | ₹{item['final_unit_price']} | ₹{item['line_total']} |")
+    return rows
+
+
+def make_rule_sets(count, rng):
+    return [
+        {"standard_margin_percent": rng.choice([10, 12.5, 15, 20]),
+         "software_margin_percent": rng.choice([20, 25, 30.5]),
+         "tax_rate_percent": rng.choice([5, 12, 18, 28])}
+        for _ in range(count)
+    ]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", default="100,5000,50000", help="BOM sizes")
+    parser.add_argument("--catalog", type=int, default=20000)
+    parser.add_argument("--scenarios", type=int, default=50)
+    parser.add_argument("--master-max-lines", type=int, default=5000, help="skip the O(n^2) legacy lookup above this")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    catalog = make_catalog(args.catalog, rng)
+    agent = PricingAgent()
+    rule_sets = make_rule_sets(args.scenarios, rng)
+    print(f"[Benchmark] NumPy: {'yes' if pricing_engine._numpy() is not None else 'no (pure-Python fallback)'}")
+
+    print(f"{'lines':>7} {'legacy ms':>10} {'engine ms':>10} {'scenarios':>10} {'loop ms':>9} {'batched ms':>11} {'master legacy ms':>17} {'master ms':>10}")
+    for lines in [int(n) for n in args.lines.split(",")]:
+        tech_data = make_tech_data(lines, catalog, rng)
+
+        _, legacy_ms = timed(legacy_pricing, tech_data, catalog.pricing_rules, catalog.by_sku)
+        fast, fast_ms = timed(agent.process, tech_data, catalog)
+
+        _, loop_ms = timed(lambda: [legacy_pricing(tech_data, rules, catalog.by_sku) for rules in rule_sets])
+        _, batch_ms = timed(agent.process_scenarios, tech_data, rule_sets, catalog)
+
+        sales_data = {"rfp_metadata": {"title": "T", "contract_id": "C", "authority": "A"}}
+        _, master_ms = timed(MasterAgent().process, sales_data, tech_data, fast)
+        master_legacy_ms = float("nan")
+        if lines <= args.master_max_lines:
+            _, master_legacy_ms = timed(legacy_rows, tech_data, fast)
+
+        print(f"{lines:>7} {legacy_ms:>10.1f} {fast_ms:>10.1f} {len(rule_sets):>10} {loop_ms:>9.1f} {batch_ms:>11.1f} "
+              f"{master_legacy_ms:>17.1f} {master_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark: typed pipeline records vs. the nested-dict payloads on a large BOM.
+
+Runs the Technical, Pricing and Master agents over a --lines item tender and
+compares the records they now produce with the compat view, i.e. the dicts of
+pre-formatted strings the agents used to return (built with records.compat):
+
+* retained memory of the technical and pricing results (tracemalloc)
+* serializing one request for every destination, as each version does it:
+  the four stored payloads, the four artifact step files (indented) and the
+  Flask response (sorted keys). Dicts go through the json module, records go
+  through records.dumps.
+
+Fails if the two versions' JSON differs.
+
+Usage: python benchmarks/bench_records.py [--lines 10000] [--repeat 5]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus  # noqa: E402
+import records  # noqa: E402
+from rfp_system import MasterAgent, PricingAgent, TechnicalAgent  # noqa: E402
+
+
+def retained(build):
+    """(value, bytes still allocated once build() has returned)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return value, size
+
+
+def serialize_dicts(steps, result):
+    stored = [json.dumps(step, ensure_ascii=False, separators=(",", ":")).encode("utf-8") for step in steps]
+    files = [json.dumps(step, indent=2, ensure_ascii=False).encode("utf-8") for step in steps]
+    response = json.dumps(result, sort_keys=True).encode("utf-8")
+    return stored + files + [response]
+
+
+def serialize_records(steps, result):
+    stored = [records.dumps(step) for step in steps]
+    files = [records.dumps(step, indent=True) for step in steps]
+    response = records.dumps(result, sort_keys=True)
+    return stored + files + [response]
+
+
+def measure(serialize, steps, result, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serialize(steps, result)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        output = serialize(steps, result)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak, output
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=10000)
+    parser.add_argument("--skus", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = corpus.inventory(args.skus, rng)
+    catalog, index = corpus.catalog(rows)
+    sales = corpus.sales_data(args.lines, rows, rng)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Warm-up, so lazy imports (NumPy) are not counted as retained by the records
+        PricingAgent().process(TechnicalAgent().process(corpus.sales_data(10, rows, rng), index), catalog)
+        (tech, priced), records_bytes = retained(
+            lambda: (lambda t: (t, PricingAgent().process(t, catalog)))(TechnicalAgent().process(sales, index)))
+        final = MasterAgent().process(sales, tech, priced)
+    (tech_dicts, priced_dicts), dict_bytes = retained(lambda: (records.compat(tech), records.compat(priced)))
+    final_dicts = records.compat(final)
+
+    steps = (sales, tech, priced, final)
+    result = {"status": "complete", "workflow": dict(zip(("sales", "technical", "pricing", "master"), steps)),
+              "final_document": final["final_response"]["final_document_text"]}
+    dict_steps = (sales, tech_dicts, priced_dicts, final_dicts)
+    dict_result = records.compat(result)
+
+    dict_s, dict_peak, dict_out = measure(serialize_dicts, dict_steps, dict_result, args.repeat)
+    record_s, record_peak, record_out = measure(serialize_records, steps, result, args.repeat)
+
+    print(f"{args.lines} lines, orjson {'on' if records.orjson is not None else 'off'}")
+    print(f"{'':>10} {'retained MB':>12} {'serialize ms':>13} {'peak MB':>9}")
+    print(f"{'dicts':>10} {dict_bytes / 1e6:>12.2f} {dict_s * 1000:>13.1f} {dict_peak / 1e6:>9.2f}")
+    print(f"{'records':>10} {records_bytes / 1e6:>12.2f} {record_s * 1000:>13.1f} {record_peak / 1e6:>9.2f}")
+    print(f"{'saving':>10} {1 - records_bytes / dict_bytes:>12.0%} {dict_s / record_s:>12.1f}x")
+
+    if any(json.loads(a) != json.loads(b) for a, b in zip(dict_out, record_out)):
+        print("[Benchmark] MISMATCH: records serialize differently from the compat dicts")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
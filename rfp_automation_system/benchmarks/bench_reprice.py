@@ -0,0 +1,151 @@
+"""Benchmark: re-pricing Pending proposals after a tax change.
+
+Fills a fresh database with --rows finished proposals (3-40 line BOMs over a
+generated catalog, TEMPLATES distinct BOMs, each row with its own sales data),
+raises tax_rate_percent, interrupts a re-pricing run after a few chunks,
+resumes it, and checks that every Pending proposal now carries the price a
+fresh PricingAgent run gives, that Approved ones were left alone, and that no
+page was fetched.
+
+Usage: python benchmarks/bench_reprice.py [--rows 50000] [--workers 4]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus  # noqa: E402
+import database  # noqa: E402
+import http_client  # noqa: E402
+import repricing  # noqa: E402
+from rfp_system import MasterAgent, PricingAgent, TechnicalAgent  # noqa: E402
+
+TEMPLATES = 1000
+
+
+class Interrupted(Exception):
+    pass
+
+
+def fill(rows, rng):
+    inventory = corpus.inventory(2000, rng)
+    technical, pricing, master = TechnicalAgent(), PricingAgent(), MasterAgent()
+    batch = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        corpus.load_database(database.DB_FILE, inventory)
+        catalog = database.get_catalog()
+        _, index = corpus.catalog(inventory, catalog.version)
+        # Matching is the slow part of filling; TEMPLATES distinct BOMs are shared between rows
+        templates = []
+        for _ in range(TEMPLATES):
+            sales = corpus.sales_data(rng.randint(3, 40), inventory, rng)
+            templates.append((sales, technical.process(sales, index)))
+        for i in range(rows):
+            sales, tech = templates[i % TEMPLATES]
+            sales = dict(sales, rfp_metadata=dict(sales["rfp_metadata"], title=f"Tender {i}"))
+            priced = pricing.process(tech, catalog)
+            batch.append((f"https://tenders.example.gov/{i}", sales, tech, priced, master.process(sales, tech, priced)))
+            if len(batch) == 1000:
+                database.save_rfp_requests(batch)
+                batch = []
+        if batch:
+            database.save_rfp_requests(batch)
+    with database.db_transaction() as conn:
+        conn.execute("UPDATE rfp_requests SET status = 'Approved' WHERE id % 10 = 0")
+
+
+def check():
+    catalog = database.get_catalog()
+    pricing = PricingAgent()
+    stale = approved_changed = 0
+    with database.db_connection() as conn:
+        ids = [row[0] for row in conn.execute("SELECT id FROM rfp_requests WHERE id % 97 = 1")]
+    for request_id in ids:
+        job = database.get_job(request_id)
+        expected = pricing.process_scenarios(job["tech_data"], None, catalog)[0]
+        current = job["pricing_data"]["pricing"]["total_cost"] == expected["pricing"]["total_cost"]
+        if job["status"] == "Pending" and not current:
+            stale += 1
+        if job["status"] == "Approved" and current and expected["pricing"]["total_cost"] != "0.00":
+            approved_changed += 1
+        document = job["final_response"]["final_response"]["final_document_text"]
+        if job["status"] == "Pending" and f"₹{expected['pricing']['total_cost']}" not in document:
+            stale += 1
+    return len(ids), stale, approved_changed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="rfp-bench-reprice-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    fetches = []
+
+    def no_network(url, *args, **kwargs):
+        fetches.append(url)
+        raise RuntimeError("re-pricing must not fetch pages")
+
+    http_client.fetch = no_network
+    try:
+        database.DB_FILE = os.path.join(workdir, "reprice.db")
+        start = time.perf_counter()
+        fill(args.rows, random.Random(args.seed))
+        print(f"[Benchmark] Stored {args.rows} proposals in {time.perf_counter() - start:.1f}s")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            database.update_pricing_rules({"tax_rate_percent": 28})
+
+        # Interrupt after three chunks, as a crash or Ctrl-C would
+        save = database.save_repriced
+        saves = []
+
+        def failing_save(*a):
+            if len(saves) == 3:
+                raise Interrupted()
+            saves.append(1)
+            return save(*a)
+
+        database.save_repriced = failing_save
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                repricing.reprice_pending(args.chunk_size, args.workers)
+        except Interrupted:
+            pass
+        database.save_repriced = save
+        interrupted = database.get_reprice_run()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = repricing.reprice_pending(args.chunk_size, args.workers)
+        elapsed = time.perf_counter() - start
+        sampled, stale, approved_changed = check()
+    finally:
+        database.close_pool()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'pending':>8} {'workers':>8} {'seconds':>8} {'per sec':>9} {'resumed at id':>14}")
+    print(f"{run['total']:>8} {args.workers:>8} {elapsed:>8.1f} {run['repriced'] / elapsed:>9.0f} {interrupted['last_id']:>14}")
+    ok = (interrupted["state"] == "failed" and run["id"] == interrupted["id"] and run["state"] == "done"
+          and run["repriced"] == run["total"] and not stale and not approved_changed and not fetches)
+    if not ok:
+        print(f"[Benchmark] FAILED: run {run}, {stale}/{sampled} sampled stale, "
+              f"{approved_changed} approved changed, {len(fetches)} fetches")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Load test: /api/process-rfp throughput as gunicorn workers are added.
+
+For each worker count, starts `gunicorn -c gunicorn.conf.py wsgi:app` in a
+scratch directory (fresh database, artifacts off), drives it with
+--clients concurrent keep-alive clients spread over several client processes
+for --seconds, and reports requests/sec and latency percentiles. Requests
+carry fresh=1 so every one runs the whole pipeline instead of hitting the
+result cache; inputs are pasted tender text, so no network is involved.
+
+--server werkzeug runs the development server (threaded, one process) once
+instead, as the baseline.
+
+Usage: python benchmarks/bench_serving.py [--workers 1,2,4] [--threads 4] [--clients 16] [--seconds 10]
+"""
+import argparse
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, APP_DIR)
+
+import corpus  # noqa: E402
+
+CLIENT_PROCESSES = 4
+START_TIMEOUT = 60
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _client(url, inputs, seconds, threads):
+    # One client process: `threads` keep-alive sessions posting until the deadline
+    import threading
+
+    latencies, errors = [], [0]
+    deadline = time.monotonic() + seconds
+    lock = threading.Lock()
+
+    def loop(offset):
+        session = requests.Session()
+        i = offset
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                response = session.post(url, json={"input": inputs[i % len(inputs)], "fresh": True}, timeout=60)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+            i += 1
+
+    workers = [threading.Thread(target=loop, args=(n * 7,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies, errors[0]
+
+
+def drive(url, inputs, clients, seconds):
+    processes = min(CLIENT_PROCESSES, clients)
+    per_process = [clients // processes + (1 if n < clients % processes else 0) for n in range(processes)]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(_client, url, inputs, seconds, threads) for threads in per_process]
+        latencies, errors = [], 0
+        for future in futures:
+            part, failed = future.result()
+            latencies.extend(part)
+            errors += failed
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else float("nan")
+    return len(latencies) / seconds, pick(0.50), pick(0.99), errors
+
+
+def start_server(kind, workers, threads, port, workdir):
+    env = dict(os.environ, RFP_ARTIFACT_MODE="off", PYTHONPATH=APP_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""),
+               RFP_WORKERS=str(workers), RFP_THREADS=str(threads), RFP_BIND=f"127.0.0.1:{port}")
+    if kind == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "-c", os.path.join(APP_DIR, "gunicorn.conf.py"), "wsgi:app"]
+    else:
+        command = [sys.executable, "-c",
+                   "import server; server.warmup(); server.create_app().run("
+                   f"host='127.0.0.1', port={port}, threaded=True)"]
+    log = open(os.path.join(workdir, f"{kind}-{workers}.log"), "w")
+    process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{kind} exited with {process.returncode}; see {log.name}")
+        try:
+            requests.get(f"http://127.0.0.1:{port}/metrics", timeout=1)
+            return process, log
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{kind} did not start within {START_TIMEOUT}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--server", choices=["gunicorn", "werkzeug"], default="gunicorn")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated gunicorn worker counts")
+    parser.add_argument("--threads", type=int, default=4, help="threads per gunicorn worker")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    if args.server == "gunicorn":
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            print("gunicorn is not installed (pip install gunicorn); use --server werkzeug for the baseline")
+            sys.exit(2)
+        counts = [int(n) for n in args.workers.split(",")]
+    else:
+        counts = [1]
+
+    rng = random.Random(args.seed)
+    inputs = [corpus.tender_page(rng.choice([2, 8, 32]) * 1024, rng).decode("utf-8") for _ in range(32)]
+
+    print(f"{os.cpu_count()} CPU(s), {args.clients} clients, {args.seconds:.0f}s per run, {args.server}")
+    print(f"{'workers':>8} {'threads':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers in counts:
+        workdir = tempfile.mkdtemp(prefix="rfp-bench-serving-")
+        shutil.copytree(os.path.join(APP_DIR, "data"), os.path.join(workdir, "data"))
+        port = _free_port()
+        process, log = start_server(args.server, workers, args.threads, port, workdir)
+        try:
+            drive(f"http://127.0.0.1:{port}/api/process-rfp", inputs, args.clients, 1)   # warm-up
+            rps, p50, p99, errors = drive(f"http://127.0.0.1:{port}/api/process-rfp", inputs, args.clients, args.seconds)
+        finally:
+            process.send_signal(signal.SIGTERM)
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            log.close()
+            shutil.rmtree(workdir, ignore_errors=True)
+        threads = args.threads if args.server == "gunicorn" else "-"
+        print(f"{workers:>8} {threads:>8} {rps:>8.1f} {p50:>8.1f} {p99:>8.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Benchmark: /api/admin/stats queries on a large rfp_requests history.
+
+Builds a database with the pre-summary schema and --rows historical requests,
+times the original full-scan stats queries, runs the initialize_db migration
+(title backfill, indexes, status-count table), then times get_dashboard_stats
+and checks that both return the same numbers.
+
+Usage: python benchmarks/bench_stats.py [--rows 1000000] [--max-ms 20]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+
+STATUSES = ["Pending"] * 6 + ["Approved"] * 3 + ["Declined"]
+
+
+def build_history(path, rows, rng):
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE rfp_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            input_text TEXT,
+            sales_data TEXT,
+            tech_data TEXT,
+            pricing_data TEXT,
+            final_response TEXT,
+            status TEXT DEFAULT 'Pending',
+            job_state TEXT,
+            job_stage TEXT,
+            job_error TEXT
+        )
+    ''')
+    start = datetime.datetime(2020, 1, 1)
+    seconds = sorted(rng.sample(range(6 * 365 * 24 * 3600), rows))
+
+    def generate():
+        for i, offset in enumerate(seconds):
+            sales = {"rfp_metadata": {"contract_id": f"GEM/{i}", "title": f"Tender {i}: Supply of IT Hardware",
+                                      "authority": "Public Works Department"},
+                     "items": [{"name": "Laptop", "quantity": rng.randint(1, 500), "description": "Detected Laptop in text"}]}
+            yield ((start + datetime.timedelta(seconds=offset)).strftime("%Y-%m-%d %H:%M:%S"),
+                   f"https://example.com/tender/{i}", json.dumps(sales), "{}", "{}", "{}", rng.choice(STATUSES), "done")
+
+    conn.executemany('''
+        INSERT INTO rfp_requests (timestamp, input_text, sales_data, tech_data, pricing_data, final_response, status, job_state)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', generate())
+    conn.commit()
+    conn.close()
+
+
+def legacy_stats(path):
+    # The original get_dashboard_stats queries, kept here as the reference
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    stats = conn.execute('SELECT status, COUNT(*) as count FROM rfp_requests GROUP BY status').fetchall()
+    recent = conn.execute('SELECT id, timestamp, status, sales_data FROM rfp_requests ORDER BY timestamp DESC LIMIT 5').fetchall()
+    conn.close()
+
+    status_counts = {row['status']: row['count'] for row in stats}
+    recent_activity = []
+    for row in recent:
+        sales = json.loads(row['sales_data']) if row['sales_data'] else {}
+        recent_activity.append({"id": row['id'], "date": row['timestamp'], "status": row['status'],
+                                "title": sales.get('rfp_metadata', {}).get('title', 'Unknown RFP')})
+    return {"approved": status_counts.get('Approved', 0), "declined": status_counts.get('Declined', 0),
+            "pending": status_counts.get('Pending', 0), "recent_activity": recent_activity}
+
+
+def timed(fn, *args, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--max-ms", type=float, default=20.0, help="fail if get_dashboard_stats is slower")
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="rfp-bench-stats-")
+    path = os.path.join(workdir, "history.db")
+    try:
+        start = time.perf_counter()
+        build_history(path, args.rows, random.Random(args.seed))
+        print(f"[Benchmark] Built {args.rows} rows in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(path) / 1e6:.0f} MB)")
+
+        legacy, legacy_ms = timed(legacy_stats, path, repeat=3)
+
+        database.DB_FILE = path
+        start = time.perf_counter()
+        database.initialize_db()
+        migrate_s = time.perf_counter() - start
+
+        current, current_ms = timed(database.get_dashboard_stats)
+        if current != legacy:
+            print(f"[Benchmark] MISMATCH\n  legacy:  {legacy}\n  current: {current}")
+            sys.exit(1)
+
+        # Cost of keeping the counts current on the write path
+        sales = {"rfp_metadata": {"title": "Benchmark"}}
+        start = time.perf_counter()
+        for _ in range(200):
+            database.save_rfp_request("bench", sales, {}, {}, {})
+        save_ms = (time.perf_counter() - start) * 1000 / 200
+
+        print(f"{'rows':>9} {'legacy stats ms':>16} {'migration s':>12} {'stats ms':>9} {'save ms':>8}")
+        print(f"{args.rows:>9} {legacy_ms:>16.1f} {migrate_s:>12.1f} {current_ms:>9.2f} {save_ms:>8.2f}")
+    finally:
+        database.close_pool()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if current_ms > args.max_ms:
+        print(f"[Benchmark] get_dashboard_stats took {current_ms:.2f} ms (budget {args.max_ms} ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark: peak memory of full-DOM vs. streaming SalesAgent parsing.
+
+Serves a synthetic table-heavy tender page from a local HTTP server and runs
+the SalesAgent in both modes under tracemalloc. tests/test_streaming.py checks
+that both modes agree and that streaming stays within its memory bound.
+
+Usage: python benchmarks/bench_streaming.py [--sizes 2,10]
+"""
+import argparse
+import http.server
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_client  # noqa: E402
+from rfp_system import SalesAgent  # noqa: E402
+
+PRODUCTS = ["Laptop", "Server", "Cable", "Software", "Office 365", "Switch", "Router", "Printer", "Scanner"]
+
+
+def make_page(size_mb, rng):
+    rows = []
+    length = 0
+    target = int(size_mb * 1024 * 1024)
+    while length < target:
+        row = (f"<tr><td>{rng.randint(1, 99999)}</td><td>{rng.choice(PRODUCTS)} model {rng.randint(1, 999)}</td>"
+               f"<td>{rng.randint(1, 500)}</td><td>Delivery by 2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}</td></tr>\n")
+        rows.append(row)
+        length += len(row)
+    head = ("<!DOCTYPE html><html><head><meta charset='utf-8'><title>Tender No: GEM/2026/B/123456</title>"
+            "<style>td{padding:2px}</style><script>var tracking = 'Laptop 999';</script></head><body>"
+            "<h1>Supply of IT Equipment</h1><p>Department: Ministry of Electronics &amp; IT. Bid opens 2026-01-05.</p><table>")
+    return (head + "".join(rows) + "</table><p>Ref No: XYZ-9</p></body></html>").encode("utf-8")
+
+
+def serve(body):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(agent, url):
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = agent.process(url)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return data, elapsed, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="2,10", help="page sizes in MB")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cache_dir = tempfile.mkdtemp(prefix="rfp-bench-cache-")
+    http_client._cache = http_client.PageCache(cache_dir, fresh_for=0)
+    try:
+        print(f"{'page MB':>8} {'dom s':>7} {'dom peak MB':>12} {'stream s':>9} {'stream peak MB':>15}")
+        for size in [float(s) for s in args.sizes.split(",")]:
+            server = serve(make_page(size, rng))
+            url = f"http://127.0.0.1:{server.server_port}/tender/{size}"
+            try:
+                _, full_s, full_peak = measure(SalesAgent(stream=False), url)
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                _, stream_s, stream_peak = measure(SalesAgent(stream=True), url)
+            finally:
+                server.shutdown()
+            print(f"{size:>8} {full_s:>7.2f} {full_peak:>12.1f} {stream_s:>9.2f} {stream_peak:>15.1f}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
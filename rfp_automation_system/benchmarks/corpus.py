@@ -0,0 +1,159 @@
+"""Seeded synthetic inputs for the benchmark suite.
+
+Everything is generated from a random.Random, so the same seed always gives
+the same pages, catalogs and bills of materials.
+"""
+import io
+import zipfile
+import zlib
+from types import MappingProxyType
+from xml.sax.saxutils import escape
+
+import database
+import matching
+
+CATEGORIES = ["Hardware", "Software", "Networking", "Accessories"]
+PRODUCT_WORDS = ["Laptop", "Server", "Cable", "Software", "Office 365", "Switch", "Router",
+                 "Printer", "Scanner", "Monitor", "Firewall", "Storage", "Rack", "UPS"]
+FILLER = ("the", "supply", "of", "units", "tender", "delivery", "within", "days", "and", "for",
+          "department", "schedule", "item", "qty", "nos", "warranty", "years", "installation")
+RULES = {"standard_margin_percent": 15.0, "software_margin_percent": 25.0, "tax_rate_percent": 18.0}
+
+
+def tender_page(size_bytes, rng):
+    """A tender notice padded with an item table to roughly size_bytes of HTML."""
+    head = ("<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            f"<title>Tender No: GEM/2026/B/{rng.randint(100000, 999999)}</title>"
+            "<script>var tracking = 'Laptop 999';</script></head><body>"
+            "<h1>Supply of IT Equipment</h1>"
+            "<p>Department: Ministry of Electronics &amp; IT. Bid opens 2026-01-05, closes 2026-02-20.</p><table>")
+    rows = []
+    length = len(head)
+    while length < size_bytes:
+        words = " ".join(rng.choice(FILLER) for _ in range(rng.randint(3, 12)))
+        row = (f"<tr><td>{rng.randint(1, 9999)}</td><td>{rng.choice(PRODUCT_WORDS)} {words}</td>"
+               f"<td>{rng.randint(1, 500)}</td></tr>\n")
+        rows.append(row)
+        length += len(row)
+    return (head + "".join(rows) + "</table><p>Ref No: XYZ-9</p></body></html>").encode("utf-8")
+
+
+def schedule_lines(rows, rng):
+    """Lines of a requirement schedule, as found in tender attachments."""
+    return [f"{i + 1}. {rng.choice(PRODUCT_WORDS)} {' '.join(rng.choice(FILLER) for _ in range(rng.randint(3, 10)))}"
+            for i in range(rows)]
+
+
+def docx_document(lines):
+    """A minimal DOCX file (zip with word/document.xml), one paragraph per line."""
+    body = "".join(f"<w:p><w:r><w:t xml:space='preserve'>{escape(line)}</w:t></w:r></w:p>" for line in lines)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", (
+            "<?xml version='1.0' encoding='UTF-8'?>"
+            "<Types xmlns='http://schemas.openxmlformats.org/package/2006/content-types'>"
+            "<Default Extension='xml' ContentType='application/xml'/>"
+            "<Override PartName='/word/document.xml' "
+            "ContentType='application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml'/></Types>"))
+        archive.writestr("word/document.xml", (
+            "<?xml version='1.0' encoding='UTF-8'?>"
+            "<w:document xmlns:w='http://schemas.openxmlformats.org/wordprocessingml/2006/main'>"
+            f"<w:body>{body}</w:body></w:document>"))
+    return buffer.getvalue()
+
+
+def pdf_document(lines, lines_per_page=50):
+    """A minimal PDF with Flate-compressed text pages, one Tj string per line."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>",
+               "<< /Type /Pages /Kids [%s] /Count %d >>" % (
+                   " ".join(f"{4 + 2 * n} 0 R" for n in range(len(pages))), len(pages)),
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    streams = {}
+    for n, page in enumerate(pages):
+        text = "BT /F1 10 Tf 50 800 Td 12 TL\n" + "".join(
+            "(%s) '\n" % line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in page) + "ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * n} 0 R >>")
+        streams[len(objects)] = zlib.compress(text.encode("latin-1", "replace"))
+        objects.append(None)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(out.tell())
+        if obj is None:
+            data = streams[number - 1]
+            out.write(f"{number} 0 obj\n<< /Length {len(data)} /Filter /FlateDecode >>\nstream\n".encode())
+            out.write(data + b"\nendstream\nendobj\n")
+        else:
+            out.write(f"{number} 0 obj\n{obj}\nendobj\n".encode())
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    out.write("".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def inventory(size, rng):
+    rows = []
+    for i in range(size):
+        word = PRODUCT_WORDS[i % len(PRODUCT_WORDS)]
+        rows.append({
+            "sku": f"SKU-{i:06d}",
+            "name": f"{word} Model {i}" if i >= len(PRODUCT_WORDS) else word,
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "base_cost": round(rng.uniform(100, 250000), 2),
+            "description": f"{word} for benchmarking"
+        })
+    return rows
+
+
+def catalog(rows, version=0):
+    """(CatalogSnapshot, InventoryIndex) over rows, without touching SQLite."""
+    items = tuple(MappingProxyType(dict(row)) for row in rows)
+    snapshot = database.CatalogSnapshot(
+        version=version,
+        inventory=items,
+        by_sku=MappingProxyType({row["sku"]: row for row in items}),
+        pricing_rules=MappingProxyType(dict(RULES))
+    )
+    return snapshot, matching.InventoryIndex(items, version)
+
+
+def sales_data(lines, rows, rng):
+    """A SalesAgent result with `lines` items named after catalog products."""
+    items = []
+    for _ in range(lines):
+        row = rng.choice(rows)
+        name = row["name"] if rng.random() < 0.7 else rng.choice(PRODUCT_WORDS)
+        items.append({"name": name, "quantity": rng.randint(1, 500), "description": f"Detected {name} in text"})
+    return {
+        "rfp_metadata": {
+            "contract_id": "GEM/2026/B/123456",
+            "title": "Supply of IT Equipment",
+            "authority": "Ministry of Electronics & IT",
+            "category": "Not available",
+            "bid_dates": {"start": "2026-01-05", "end": "2026-02-20"}
+        },
+        "items": items,
+        "financials": {},
+        "delivery_terms": "Not available",
+        "documents": []
+    }
+
+
+def load_database(path, rows):
+    """Points the database module at a fresh file at path holding rows as the catalog."""
+    database.DB_FILE = path
+    database.initialize_db()
+    with database.db_transaction() as conn:
+        conn.execute("DELETE FROM inventory")
+        conn.executemany('''
+            INSERT INTO inventory (sku, name, category, base_cost, description)
+            VALUES (:sku, :name, :category, :base_cost, :description)
+        ''', rows)
+        conn.execute("DELETE FROM pricing_rules")
+        conn.executemany("INSERT INTO pricing_rules (key, value) VALUES (?, ?)", RULES.items())
+    database.bump_catalog_version()
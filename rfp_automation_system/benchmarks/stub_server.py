@@ -0,0 +1,69 @@
+"""Local HTTP server that serves generated tender pages (and attachments) to the benchmarks.
+
+Pages are registered by path; responses carry Cache-Control: no-store so
+every fetch measures a real download instead of the page cache. A page added
+with an etag is cacheable instead and answers a matching If-None-Match with a
+304, which the tests use to exercise the page cache. Extra headers (e.g.
+Cache-Control) and a status other than 200 can be given per page.
+"""
+import http.server
+import threading
+
+
+class StubServer:
+    def __init__(self):
+        pages = self.pages = {}   # path -> (body, content type, etag, extra headers, status)
+        hits = self.hits = {}     # path -> GET requests received
+        not_modified = self.not_modified = {}   # path -> 304 responses sent
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive, like a real tender portal
+            disable_nagle_algorithm = True   # headers and body go out as separate writes
+
+            def do_GET(self):
+                hits[self.path] = hits.get(self.path, 0) + 1
+                page = pages.get(self.path)
+                if page is None:
+                    self.send_error(404)
+                    return
+                body, content_type, etag, headers, status = page
+                if etag and self.headers.get("If-None-Match") == etag:
+                    not_modified[self.path] = not_modified.get(self.path, 0) + 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if etag:
+                    self.send_header("ETag", etag)
+                elif "Cache-Control" not in headers:
+                    self.send_header("Cache-Control", "no-store")
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def add(self, path, body, content_type="text/html; charset=utf-8", etag=None, headers=None, status=200):
+        """Serves body at path; returns the page URL."""
+        self.pages[path] = (body, content_type, etag, dict(headers or {}), status)
+        return f"http://127.0.0.1:{self._server.server_port}{path}"
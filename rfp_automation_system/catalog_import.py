@@ -0,0 +1,138 @@
+"""Bulk catalog import from JSON Lines or CSV.
+
+Rows are read from a text stream one at a time, validated in chunks and
+staged with executemany; the whole import is then applied as one upsert
+transaction (database.upsert_products), followed by a single catalog version
+bump and one rebuild of the matching index.
+
+Invalid rows are skipped and reported with their line number. With
+strict=True any invalid row cancels the import.
+"""
+import csv
+import json
+import math
+
+import database
+import matching
+
+# --- Import Settings ---
+CHUNK_SIZE = 5000           # rows validated and staged per executemany
+MAX_REPORTED_ERRORS = 1000  # per-row errors kept in the report (all are counted)
+FORMATS = ("jsonl", "csv")
+
+
+def detect_format(name="", content_type=""):
+    """Guesses the format from a file name or Content-Type; None if neither says."""
+    name, content_type = (name or "").lower(), (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "jsonl"
+    return None
+
+
+def read_rows(stream, fmt):
+    """Yields (line number, row dict or None, error or None) from a text stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"invalid JSON: {e}"
+                continue
+            if isinstance(row, dict):
+                yield line_no, row, None
+            else:
+                yield line_no, None, "expected a JSON object"
+    else:
+        raise ValueError(f"Unknown import format: {fmt} (expected one of {', '.join(FORMATS)})")
+
+
+def validate(row):
+    """Returns (clean row, None) or (None, error message)."""
+    sku = str(row.get("sku") or "").strip()
+    name = str(row.get("name") or "").strip()
+    category = str(row.get("category") or "").strip()
+    if not sku:
+        return None, "sku is required"
+    if not name:
+        return None, "name is required"
+    # An empty category would be a substring of every item name (see TechnicalAgent matching)
+    if not category:
+        return None, "category is required"
+
+    base_cost = row.get("base_cost")
+    if base_cost is None or base_cost == "":
+        return None, "base_cost is required"
+    try:
+        base_cost = float(base_cost)
+    except (TypeError, ValueError):
+        return None, f"base_cost is not a number: {base_cost!r}"
+    if not math.isfinite(base_cost) or base_cost < 0:
+        return None, f"base_cost must be a non-negative number: {base_cost!r}"
+
+    return {
+        "sku": sku,
+        "name": name,
+        "category": category,
+        "base_cost": base_cost,
+        "description": str(row.get("description") or "")
+    }, None
+
+
+def import_products(stream, fmt, strict=False, chunk_size=CHUNK_SIZE):
+    """Imports every row of stream; returns a report dict.
+
+    Keys: received, imported, failed, created, updated, applied,
+    catalog_version and errors (a list of {"line", "sku", "error"}, at most
+    MAX_REPORTED_ERRORS entries; errors_truncated says if more were cut).
+    """
+    report = {"received": 0, "imported": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+    def fail(line_no, row, error):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line_no, "sku": (row or {}).get("sku"), "error": error})
+        else:
+            report["errors_truncated"] = True
+
+    def chunks():
+        chunk = []
+        for line_no, row, error in read_rows(stream, fmt):
+            report["received"] += 1
+            clean = None
+            if error is None:
+                clean, error = validate(row)
+            if error is not None:
+                fail(line_no, row, error)
+                continue
+            chunk.append(clean)
+            if len(chunk) >= chunk_size:
+                report["imported"] += len(chunk)
+                yield chunk
+                chunk = []
+        if chunk:
+            report["imported"] += len(chunk)
+            yield chunk
+
+    def should_apply():
+        return report["imported"] > 0 and not (strict and report["failed"])
+
+    counts = database.upsert_products(chunks(), should_apply)
+    report.update(counts)
+    report["applied"] = should_apply()
+    if not report["applied"]:
+        report["imported"] = 0
+    elif counts["created"] or counts["updated"]:
+        # Rebuild now rather than on the first RFP after the import
+        matching.rebuild_index()
+
+    print(f"[Import] {report['received']} rows read, {report['imported']} imported "
+          f"({counts['created']} new, {counts['updated']} updated), {report['failed']} rejected")
+    return report
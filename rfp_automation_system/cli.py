@@ -0,0 +1,132 @@
+"""Command-line entry points for the RFP automation system.
+
+Usage:
+    python cli.py batch tenders.txt [--output results.jsonl] [--workers 8] [--per-host 2] [--artifacts jsonl] [--typed]
+    python cli.py import-products catalog.csv [--format csv|jsonl] [--strict]
+    python cli.py reprice [--set tax_rate_percent=20 ...] [--workers 4] [--chunk-size 500] [--restart]
+
+`batch` reads one URL or text input per line ("-" reads stdin) and writes one
+JSON result per line as each RFP finishes. Agent logs go to stderr.
+
+`import-products` upserts a JSON Lines or CSV catalog in one transaction and
+prints the import report (with per-row errors) as JSON.
+
+`reprice` optionally updates pricing rules, then re-prices every Pending
+proposal from its stored technical data (no fetching). An interrupted run is
+resumed from its checkpoint when the command is run again.
+"""
+import argparse
+import contextlib
+import json
+import sys
+
+import artifacts
+import database
+import records
+
+
+def _read_inputs(path):
+    stream = sys.stdin if path == "-" else open(path, 'r', encoding='utf-8')
+    with stream:
+        return [line.strip() for line in stream if line.strip()]
+
+
+def cmd_batch(args):
+    from rfp_system import Orchestrator
+
+    inputs = _read_inputs(args.inputs)
+    if args.artifacts:
+        artifacts.set_sink(artifacts.create_sink(args.artifacts))
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    failed = 0
+    try:
+        # Keep stdout clean for JSON Lines; agent progress prints go to stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            database.initialize_db()
+            for result in Orchestrator().run_batch(inputs, max_workers=args.workers, per_host=args.per_host):
+                if result["status"] != "complete":
+                    failed += 1
+                out.write(records.dumps(result, typed=args.typed).decode("utf-8") + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"[CLI] {len(inputs) - failed}/{len(inputs)} RFPs completed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def cmd_import_products(args):
+    import catalog_import
+
+    fmt = args.format or catalog_import.detect_format(name=args.path) or "jsonl"
+    stream = sys.stdin if args.path == "-" else open(args.path, 'r', encoding='utf-8-sig', newline='')
+    with stream, contextlib.redirect_stdout(sys.stderr):
+        database.initialize_db()
+        report = catalog_import.import_products(stream, fmt, strict=args.strict, chunk_size=args.chunk_size)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0 if report["applied"] and not report["failed"] else 1
+
+
+def cmd_reprice(args):
+    import repricing
+
+    with contextlib.redirect_stdout(sys.stderr):
+        database.initialize_db()
+        if args.set:
+            try:
+                rules = dict(item.split("=", 1) for item in args.set)
+            except ValueError:
+                print("[CLI] --set expects key=value", file=sys.stderr)
+                return 2
+            rules, error = repricing.validate_rules(rules)
+            if error:
+                print(f"[CLI] {error}", file=sys.stderr)
+                return 2
+            print(f"[CLI] Pricing rules: {database.update_pricing_rules(rules)}")
+        try:
+            run = repricing.reprice_pending(chunk_size=args.chunk_size, workers=args.workers, restart=args.restart)
+        except database.RepriceBusyError as e:
+            print(f"[CLI] {e}", file=sys.stderr)
+            return 1
+
+    run.pop("fingerprint", None)
+    print(json.dumps(run, indent=2))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RFP automation command-line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Process a list of RFP URLs/texts")
+    batch.add_argument("inputs", help="File with one input per line, or - for stdin")
+    batch.add_argument("--output", help="Write JSON Lines here instead of stdout")
+    batch.add_argument("--workers", type=int, default=8)
+    batch.add_argument("--per-host", type=int, default=2)
+    batch.add_argument("--typed", action="store_true", help="Write numbers as JSON numbers (typed record view)")
+    batch.add_argument("--artifacts", choices=["off", "shared", "dirs", "jsonl"],
+                       help="Debug artifact mode (default: RFP_ARTIFACT_MODE or shared)")
+    batch.set_defaults(func=cmd_batch)
+
+    importer = commands.add_parser("import-products", help="Bulk upsert inventory from JSON Lines or CSV")
+    importer.add_argument("path", help="Catalog file (.jsonl/.ndjson or .csv), or - for stdin")
+    importer.add_argument("--format", choices=["jsonl", "csv"], help="Default: from the file extension, else jsonl")
+    importer.add_argument("--strict", action="store_true", help="Import nothing if any row is invalid")
+    importer.add_argument("--chunk-size", type=int, default=5000)
+    importer.set_defaults(func=cmd_import_products)
+
+    reprice = commands.add_parser("reprice", help="Re-price Pending proposals after a pricing change")
+    reprice.add_argument("--set", action="append", metavar="KEY=VALUE", help="Update a pricing rule first (repeatable)")
+    reprice.add_argument("--workers", type=int, default=4)
+    reprice.add_argument("--chunk-size", type=int, default=500)
+    reprice.add_argument("--restart", action="store_true", help="Start over instead of resuming an interrupted run")
+    reprice.set_defaults(func=cmd_reprice)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,268 @@
 import sqlite3
+import base64
+import hashlib
 import json
 import os
+import queue
+import re
+import threading
+import time
+import zlib
+from collections import namedtuple
+from contextlib import contextmanager
+from types import MappingProxyType
+
+import records
 
 DB_FILE = "rfp_database.db"
 DATA_DIR = "data"
 INVENTORY_FILE = os.path.join(DATA_DIR, "inventory.json")
 PRICING_FILE = os.path.join(DATA_DIR, "pricing_rules.json")
 
+# --- Connection Settings ---
+POOL_SIZE = int(os.environ.get("RFP_DB_POOL_SIZE", "8"))
+POOL_WAIT_SECONDS = 30       # how long a caller waits for a free pooled connection
+BUSY_TIMEOUT_MS = 5000       # how long SQLite waits on a locked database before failing
+WRITE_RETRIES = 3            # extra attempts to take the write lock after a busy timeout
+STATEMENT_CACHE_SIZE = 256   # prepared statements kept per connection
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",         # readers no longer block behind writers
+    "PRAGMA synchronous=NORMAL",       # durable at checkpoints; safe with WAL
+    "PRAGMA cache_size=-16000",        # ~16 MB page cache per connection
+    "PRAGMA mmap_size=268435456",      # memory-map up to 256 MB of the file
+    "PRAGMA temp_store=MEMORY",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+)
+
 def get_db_connection():
-    conn = sqlite3.connect(DB_FILE)
+    """Opens a new, unpooled connection with the standard pragmas. Caller closes it."""
+    conn = sqlite3.connect(
+        DB_FILE,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE
+    )
     conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
+# --- Connection Pool ---
+class ConnectionPool:
+    """Thread-safe pool of long-lived SQLite connections.
+
+    Connections keep their prepared-statement cache between checkouts. At most
+    `size` connections exist; further callers wait up to POOL_WAIT_SECONDS.
+    """
+
+    def __init__(self, db_file, size=POOL_SIZE):
+        self.db_file = db_file
+        self.pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        if not self._slots.acquire(timeout=POOL_WAIT_SECONDS):
+            raise sqlite3.OperationalError("Timed out waiting for a pooled database connection")
+        conn = None
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = get_db_connection()
+            yield conn
+        finally:
+            if conn is not None:
+                if conn.in_transaction:
+                    conn.rollback()  # never hand out a connection mid-transaction
+                self._idle.put(conn)
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    global _pool
+    pool = _pool
+    # A forked worker must not reuse its parent's connections
+    if pool is None or pool.pid != os.getpid() or pool.db_file != DB_FILE:
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid() or _pool.db_file != DB_FILE:
+                if _pool is not None and _pool.pid == os.getpid():
+                    _pool.close()
+                _pool = ConnectionPool(DB_FILE)
+            pool = _pool
+    return pool
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close()
+        _pool = None
+
+@contextmanager
+def db_connection():
+    """Borrows a pooled connection for reads or caller-managed commits."""
+    with _get_pool().connection() as conn:
+        yield conn
+
+@contextmanager
+def db_transaction():
+    """Borrows a pooled connection inside BEGIN IMMEDIATE; commits on success, rolls back on error."""
+    with db_connection() as conn:
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                break
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) or attempt == WRITE_RETRIES:
+                    raise
+                time.sleep(0.05 * 2 ** attempt)
+        yield conn
+        conn.commit()
+
+# --- Catalog Cache ---
+# Inventory and pricing rules are read on every pipeline run but change rarely.
+# Readers share one immutable snapshot until the catalog changes. Every write
+# also bumps the stored version (catalog_meta) inside its transaction, so a
+# write made by another process (a server worker, cli.py import-products or
+# reprice) invalidates this process's snapshot within CATALOG_CHECK_SECONDS.
+CatalogSnapshot = namedtuple("CatalogSnapshot", ["version", "inventory", "by_sku", "pricing_rules"])
+
+CATALOG_CHECK_SECONDS = 1.0   # how often the stored catalog version is polled
+
+_catalog_version = 0          # this process's catalog generation
+_catalog_stamp = None         # (DB_FILE, stored version) the current generation was checked against
+_catalog_checked = 0.0
+_catalog_snapshot = None
+_catalog_lock = threading.Lock()
+
+# Callbacks notified as callback(version, product) after every catalog change.
+# product is the inserted row for add_product, or None when anything may have changed.
+_catalog_listeners = []
+
+def register_catalog_listener(callback):
+    _catalog_listeners.append(callback)
+
+def _stored_catalog_version(conn):
+    return conn.execute("SELECT value FROM catalog_meta WHERE key = 'version'").fetchone()[0]
+
+def _bump_stored_catalog_version(conn):
+    """Bumps the stored version inside the caller's write transaction; returns the new value."""
+    conn.execute("UPDATE catalog_meta SET value = value + 1 WHERE key = 'version'")
+    return _stored_catalog_version(conn)
+
+def _catalog_changed(product=None, stamp=None):
+    # Starts a new generation: drops the snapshot and notifies the listeners
+    global _catalog_version, _catalog_snapshot, _catalog_stamp
+    with _catalog_lock:
+        _catalog_version += 1
+        _catalog_snapshot = None
+        _catalog_stamp = stamp
+        version = _catalog_version
+
+    for callback in _catalog_listeners:
+        callback(version, product)
+    return version
+
+def get_catalog_version():
+    """This process's catalog generation, after picking up writes committed by other processes."""
+    global _catalog_checked
+    stamp = _catalog_stamp
+    now = time.monotonic()
+    if stamp is None or stamp[0] != DB_FILE or now - _catalog_checked >= CATALOG_CHECK_SECONDS:
+        _catalog_checked = now
+        with db_connection() as conn:
+            current = (DB_FILE, _stored_catalog_version(conn))
+        if current != stamp:
+            _catalog_changed(None, current)
+    return _catalog_version
+
+def bump_catalog_version(product=None):
+    """Invalidates the catalog in this and every other process; call after inventory or pricing
+    rule writes made outside the functions below (which bump the version themselves)."""
+    with db_transaction() as conn:
+        stored = _bump_stored_catalog_version(conn)
+    return _catalog_changed(product, (DB_FILE, stored))
+
+def get_catalog():
+    """Returns the current CatalogSnapshot, querying SQLite only after an invalidation."""
+    global _catalog_snapshot, _catalog_stamp
+    get_catalog_version()
+    snapshot = _catalog_snapshot
+    if snapshot is not None:
+        return snapshot
+
+    with _catalog_lock:
+        if _catalog_snapshot is None:
+            with db_connection() as conn:
+                conn.execute('BEGIN')   # the version and the rows from one read snapshot
+                try:
+                    stored = _stored_catalog_version(conn)
+                    items = conn.execute('SELECT * FROM inventory').fetchall()
+                    rules = conn.execute('SELECT * FROM pricing_rules').fetchall()
+                finally:
+                    conn.rollback()
+
+            inventory = tuple(MappingProxyType(dict(item)) for item in items)
+            _catalog_stamp = (DB_FILE, stored)
+            _catalog_snapshot = CatalogSnapshot(
+                version=_catalog_version,
+                inventory=inventory,
+                by_sku=MappingProxyType({item['sku']: item for item in inventory}),
+                pricing_rules=MappingProxyType({rule['key']: rule['value'] for rule in rules})
+            )
+        return _catalog_snapshot
+
+# --- Schema Migrations ---
+# PRAGMA user_version counts the entries of MIGRATIONS a database has applied.
+# A boot against an up-to-date file reads that one pragma and runs no DDL.
+# Append new schema changes to MIGRATIONS; never edit an applied one.
+
 def initialize_db():
-    """Creates tables and loads initial data if empty."""
+    """Applies pending schema migrations (creating and seeding a new database)."""
     conn = get_db_connection()
+    try:
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version > len(MIGRATIONS):
+            print(f"[Database] Schema version {version} is newer than this code ({len(MIGRATIONS)}).")
+        for number in range(version, len(MIGRATIONS)):
+            # A migration commits together with its version bump, so a crash leaves it
+            # unapplied rather than half-applied (migration 1 commits in steps of its
+            # own and is safe to re-run). Another process may have applied it meanwhile.
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if conn.execute('PRAGMA user_version').fetchone()[0] > number:
+                    conn.rollback()
+                    continue
+                MIGRATIONS[number](conn)
+                conn.execute(f'PRAGMA user_version = {number + 1}')
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            print(f"[Database] Schema migrated to version {number + 1}.")
+    finally:
+        conn.close()
+    _catalog_changed()   # DB_FILE may point at another database now
+    print("[Database] Initialization Complete.")
+
+def _columns(cursor, table):
+    return {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+
+def _migration_1(conn):
+    """The schema as it stood before versioning. Brings a database of any earlier
+    layout up to date (missing columns are found with PRAGMA table_info) and
+    loads the initial catalog into empty tables."""
     cursor = conn.cursor()
 
     # Create Tables
@@ -44,15 +292,97 @@ def initialize_db():
             tech_data TEXT,
             pricing_data TEXT,
             final_response TEXT,
-            status TEXT DEFAULT 'Pending'
+            status TEXT DEFAULT 'Pending',
+            job_state TEXT,
+            job_stage TEXT,
+            job_error TEXT,
+            title TEXT,
+            authority TEXT,
+            sales_hash BLOB,
+            tech_hash BLOB,
+            pricing_hash BLOB,
+            final_hash BLOB
         )
     ''')
 
-    # Migration: Add status column if it doesn't exist (for existing DBs)
-    try:
+    # Run payloads live here, deduplicated by content hash (see Payload Storage).
+    # The *_data/final_response columns above are only read for rows not yet migrated.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rfp_payloads (
+            hash BLOB PRIMARY KEY,
+            codec TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        )
+    ''')
+
+    # Orchestrator result cache (see result_cache.py); payloads are shared with rfp_payloads
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rfp_result_cache (
+            key BLOB PRIMARY KEY,
+            fingerprint BLOB NOT NULL,
+            sales_hash BLOB,
+            tech_hash BLOB,
+            pricing_hash BLOB,
+            final_hash BLOB,
+            created REAL NOT NULL,
+            accessed REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_rfp_result_cache_accessed ON rfp_result_cache (accessed)')
+
+    # Re-pricing runs and their checkpoints (see repricing.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rfp_reprice_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fingerprint BLOB NOT NULL,
+            started DATETIME DEFAULT CURRENT_TIMESTAMP,
+            finished DATETIME,
+            state TEXT NOT NULL,
+            last_id INTEGER NOT NULL DEFAULT 0,
+            max_id INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            repriced INTEGER NOT NULL DEFAULT 0,
+            error TEXT
+        )
+    ''')
+
+    # Columns added to rfp_requests after the first release
+    columns = _columns(cursor, 'rfp_requests')
+    if 'status' not in columns:
         cursor.execute('ALTER TABLE rfp_requests ADD COLUMN status TEXT DEFAULT "Pending"')
-    except sqlite3.OperationalError:
-        pass # Column likely already exists
+
+    # Background job columns (see jobs.py)
+    for column in ('job_state', 'job_stage', 'job_error'):
+        if column not in columns:
+            cursor.execute(f'ALTER TABLE rfp_requests ADD COLUMN {column} TEXT')
+
+    # Denormalized title, so listings don't parse sales_data
+    if 'title' not in columns:
+        cursor.execute('ALTER TABLE rfp_requests ADD COLUMN title TEXT')
+        print("[Database] Backfilling rfp_requests.title...")
+        cursor.execute('''
+            UPDATE rfp_requests SET title = json_extract(sales_data, '$.rfp_metadata.title')
+            WHERE sales_data IS NOT NULL AND json_valid(sales_data)
+        ''')
+
+    # Payload hash columns
+    for column in PAYLOAD_COLUMNS.values():
+        if column not in columns:
+            cursor.execute(f'ALTER TABLE rfp_requests ADD COLUMN {column} BLOB')
+    conn.commit()
+    _migrate_payloads(conn)
+
+    # Denormalized authority for listings and search
+    if 'authority' not in columns:
+        cursor.execute('ALTER TABLE rfp_requests ADD COLUMN authority TEXT')
+        _backfill_authority(conn)
+
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_rfp_requests_timestamp ON rfp_requests (timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_rfp_requests_status_timestamp ON rfp_requests (status, timestamp)')
+    _create_status_counts(cursor)
+    _create_search_index(cursor)
+    conn.commit()
 
     # Check if inventory is empty
     cursor.execute('SELECT count(*) FROM inventory')
@@ -61,11 +391,11 @@ def initialize_db():
         if os.path.exists(INVENTORY_FILE):
             with open(INVENTORY_FILE, 'r', encoding='utf-8') as f:
                 items = json.load(f)
-                for item in items:
-                    cursor.execute('''
-                        INSERT INTO inventory (sku, name, category, base_cost, description)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (item['sku'], item['name'], item['category'], item['base_cost'], item.get('description', '')))
+            cursor.executemany('''
+                INSERT INTO inventory (sku, name, category, base_cost, description)
+                VALUES (?, ?, ?, ?, ?)
+            ''', ((item['sku'], item['name'], item['category'], item['base_cost'], item.get('description', ''))
+                  for item in items))
         conn.commit()
 
     # Check if pricing rules are empty
@@ -75,55 +405,658 @@ def initialize_db():
         if os.path.exists(PRICING_FILE):
             with open(PRICING_FILE, 'r', encoding='utf-8') as f:
                 rules = json.load(f)
-                for key, value in rules.items():
-                    cursor.execute('INSERT INTO pricing_rules (key, value) VALUES (?, ?)', (key, value))
+            cursor.executemany('INSERT INTO pricing_rules (key, value) VALUES (?, ?)', rules.items())
         conn.commit()
 
-    conn.close()
-    print("[Database] Initialization Complete.")
+def _create_status_counts(cursor):
+    """Per-status row counts, kept current by triggers inside every writing transaction."""
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rfp_status_counts'"
+    ).fetchone()
+    cursor.executescript('''
+        CREATE TABLE IF NOT EXISTS rfp_status_counts (
+            status TEXT NOT NULL PRIMARY KEY,
+            count INTEGER NOT NULL
+        );
+
+        CREATE TRIGGER IF NOT EXISTS rfp_status_counts_insert
+        AFTER INSERT ON rfp_requests WHEN NEW.status IS NOT NULL
+        BEGIN
+            INSERT OR IGNORE INTO rfp_status_counts (status, count) VALUES (NEW.status, 0);
+            UPDATE rfp_status_counts SET count = count + 1 WHERE status = NEW.status;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS rfp_status_counts_update
+        AFTER UPDATE OF status ON rfp_requests WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            UPDATE rfp_status_counts SET count = count - 1 WHERE status = OLD.status;
+            INSERT OR IGNORE INTO rfp_status_counts (status, count) VALUES (NEW.status, 0);
+            UPDATE rfp_status_counts SET count = count + 1 WHERE status = NEW.status;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS rfp_status_counts_delete
+        AFTER DELETE ON rfp_requests WHEN OLD.status IS NOT NULL
+        BEGIN
+            UPDATE rfp_status_counts SET count = count - 1 WHERE status = OLD.status;
+        END;
+    ''')
+    if not exists:
+        # Migration: count the existing history once
+        cursor.execute('''
+            INSERT INTO rfp_status_counts (status, count)
+            SELECT status, COUNT(*) FROM rfp_requests WHERE status IS NOT NULL GROUP BY status
+        ''')
+
+def _create_search_index(cursor):
+    """FTS5 index over title/authority/input_text, synced from rfp_requests by triggers."""
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rfp_requests_fts'"
+    ).fetchone()
+    try:
+        cursor.executescript('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS rfp_requests_fts USING fts5(
+                title, authority, input_text,
+                content = 'rfp_requests', content_rowid = 'id'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS rfp_requests_fts_insert AFTER INSERT ON rfp_requests
+            BEGIN
+                INSERT INTO rfp_requests_fts (rowid, title, authority, input_text)
+                VALUES (NEW.id, NEW.title, NEW.authority, NEW.input_text);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS rfp_requests_fts_delete AFTER DELETE ON rfp_requests
+            BEGIN
+                INSERT INTO rfp_requests_fts (rfp_requests_fts, rowid, title, authority, input_text)
+                VALUES ('delete', OLD.id, OLD.title, OLD.authority, OLD.input_text);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS rfp_requests_fts_update AFTER UPDATE OF title, authority, input_text ON rfp_requests
+            BEGIN
+                INSERT INTO rfp_requests_fts (rfp_requests_fts, rowid, title, authority, input_text)
+                VALUES ('delete', OLD.id, OLD.title, OLD.authority, OLD.input_text);
+                INSERT INTO rfp_requests_fts (rowid, title, authority, input_text)
+                VALUES (NEW.id, NEW.title, NEW.authority, NEW.input_text);
+            END;
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"[Database] Full-text search unavailable ({e}); search falls back to LIKE.")
+        return
+    if not exists:
+        # Migration: index the existing history once
+        cursor.execute("INSERT INTO rfp_requests_fts (rfp_requests_fts) VALUES ('rebuild')")
+
+def _migration_2(conn):
+    """Marks runs saved before background jobs existed (job_state NULL) as done, so
+    they are treated like any other finished proposal (re-pricing included)."""
+    conn.execute('''
+        UPDATE rfp_requests SET job_state = 'done'
+        WHERE job_state IS NULL AND (final_hash IS NOT NULL OR final_response IS NOT NULL)
+    ''')
+
+def _migration_3(conn):
+    """Re-pricing run leases (see start_reprice_run). Columns are checked first, as a
+    database may have been left with only the first one by an earlier release."""
+    columns = _columns(conn.cursor(), 'rfp_reprice_runs')
+    if 'owner' not in columns:
+        conn.execute('ALTER TABLE rfp_reprice_runs ADD COLUMN owner TEXT')
+    if 'heartbeat' not in columns:
+        conn.execute('ALTER TABLE rfp_reprice_runs ADD COLUMN heartbeat REAL')
+
+def _migration_4(conn):
+    """Stored catalog version, bumped by every catalog write (see Catalog Cache)."""
+    conn.execute('CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+    conn.execute("INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('version', 0)")
+
+def _migration_5(conn):
+    """Job leases (see claim_unfinished_jobs), and an index over the few unfinished jobs."""
+    columns = _columns(conn.cursor(), 'rfp_requests')
+    if 'job_owner' not in columns:
+        conn.execute('ALTER TABLE rfp_requests ADD COLUMN job_owner TEXT')
+    if 'job_heartbeat' not in columns:
+        conn.execute('ALTER TABLE rfp_requests ADD COLUMN job_heartbeat REAL')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_rfp_requests_unfinished ON rfp_requests (id)
+        WHERE job_state IN ('queued', 'running')
+    ''')
+
+MIGRATIONS = (
+    _migration_1,
+    _migration_2,
+    _migration_3,
+    _migration_4,
+    _migration_5,
+)
 
 def get_inventory():
-    conn = get_db_connection()
-    items = conn.execute('SELECT * FROM inventory').fetchall()
-    conn.close()
-    return [dict(item) for item in items]
+    return [dict(item) for item in get_catalog().inventory]
 
 def get_pricing_rules():
-    conn = get_db_connection()
-    rules = conn.execute('SELECT * FROM pricing_rules').fetchall()
-    conn.close()
-    return {rule['key']: rule['value'] for rule in rules}
+    return dict(get_catalog().pricing_rules)
 
-def save_rfp_request(input_text, sales, tech, pricing, final):
-    conn = get_db_connection()
+def update_pricing_rules(rules):
+    """Sets the given pricing rule values (new keys are added); returns the full rule set."""
+    with db_transaction() as conn:
+        conn.executemany('''
+            INSERT INTO pricing_rules (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        ''', [(key, float(value)) for key, value in rules.items()])
+        stored = _bump_stored_catalog_version(conn)
+    _catalog_changed(None, (DB_FILE, stored))
+    return get_pricing_rules()
+
+def save_rfp_request(input_text, sales, tech, pricing, final, request_id=None, cache_entry=None):
+    """Stores a finished run and returns its id. With request_id, completes that queued job row
+    instead of inserting. cache_entry=(key, fingerprint) also records the run in the result cache."""
+    payloads = _encode_run(sales, tech, pricing, final)
+    hashes = tuple(payload[0] for payload in payloads)
+    with db_transaction() as conn:
+        _store_payloads(conn, payloads)
+        if cache_entry is not None:
+            _put_cached_result(conn, cache_entry, hashes)
+        if request_id is None:
+            request_id = conn.execute('''
+                INSERT INTO rfp_requests (input_text, sales_hash, tech_hash, pricing_hash, final_hash, title, authority, status, job_state)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 'Pending', 'done')
+            ''', (input_text,) + hashes + _summary_fields(sales)).lastrowid
+        else:
+            conn.execute('''
+                UPDATE rfp_requests
+                SET sales_hash = ?, tech_hash = ?, pricing_hash = ?, final_hash = ?, title = ?, authority = ?,
+                    status = 'Pending', job_state = 'done', job_stage = NULL, job_error = NULL
+                WHERE id = ?
+            ''', hashes + _summary_fields(sales) + (request_id,))
+    return request_id
+
+def save_rfp_requests(runs):
+    """Stores many finished runs, given as (input_text, sales, tech, pricing, final) tuples, in one transaction."""
+    payloads = []
+    rows = []
+    for input_text, sales, tech, pricing, final in runs:
+        encoded = _encode_run(sales, tech, pricing, final)
+        payloads.extend(encoded)
+        rows.append((input_text,) + tuple(payload[0] for payload in encoded) + _summary_fields(sales))
+    with db_transaction() as conn:
+        _store_payloads(conn, payloads)
+        conn.executemany('''
+            INSERT INTO rfp_requests (input_text, sales_hash, tech_hash, pricing_hash, final_hash, title, authority, status, job_state)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'Pending', 'done')
+        ''', rows)
+
+def _summary_fields(sales):
+    """(title, authority) copied onto the rfp_requests row for listings and search."""
+    metadata = (sales or {}).get('rfp_metadata', {})
+    return (metadata.get('title'), metadata.get('authority'))
+
+# --- Payload Storage ---
+# Each payload is stored once per distinct content: compact JSON, zlib-compressed
+# when that helps, keyed by its SHA-256. final_response repeats the sales, tech and
+# pricing summaries, so it is stored without them and rebuilt on load.
+
+PAYLOAD_COLUMNS = {
+    'sales_data': 'sales_hash',
+    'tech_data': 'tech_hash',
+    'pricing_data': 'pricing_hash',
+    'final_response': 'final_hash',
+}
+PAYLOAD_COMPRESS_MIN_BYTES = 128   # smaller payloads are stored as plain JSON
+PAYLOAD_COMPRESS_LEVEL = 6
+PAYLOAD_MIGRATION_CHUNK = 500      # legacy rows converted per transaction
+
+_SUMMARIES = (
+    ('rfp_summary', 'sales_data', 'rfp_metadata'),
+    ('technical_summary', 'tech_data', 'tech_match'),
+    ('pricing_summary', 'pricing_data', 'pricing'),
+)
+
+def _encode_payload(value):
+    """Returns (hash, codec, size, data) for a JSON-serializable value, or None for None."""
+    if value is None:
+        return None
+    raw = records.dumps(value)
+    digest = hashlib.sha256(raw).digest()
+    if len(raw) >= PAYLOAD_COMPRESS_MIN_BYTES:
+        packed = zlib.compress(raw, PAYLOAD_COMPRESS_LEVEL)
+        if len(packed) < len(raw):
+            return (digest, 'zlib', len(raw), packed)
+    return (digest, 'json', len(raw), raw)
+
+def _decode_payload(codec, data):
+    if codec == 'zlib':
+        data = zlib.decompress(data)
+    return json.loads(data)
+
+def _pack_final(final, parts):
+    """Drops the summaries final_response copies from the other payloads, when they match exactly."""
+    response = final.get('final_response') if isinstance(final, dict) else None
+    if (not isinstance(response, dict) or len(final) != 1
+            or list(response) != [key for key, _, _ in _SUMMARIES] + ['final_document_text']):
+        return final
+    for key, column, field in _SUMMARIES:
+        if not isinstance(parts[column], dict) or field not in parts[column] or parts[column][field] != response[key]:
+            return final
+    return {"$summaries": True, "final_document_text": response['final_document_text']}
+
+def _unpack_final(final, parts):
+    if not isinstance(final, dict) or not final.get("$summaries"):
+        return final
+    response = {key: parts[column][field] for key, column, field in _SUMMARIES}
+    response['final_document_text'] = final['final_document_text']
+    return {"final_response": response}
+
+def _encode_run(sales, tech, pricing, final):
+    parts = {'sales_data': sales, 'tech_data': tech, 'pricing_data': pricing}
+    return (_encode_payload(sales), _encode_payload(tech), _encode_payload(pricing),
+            _encode_payload(_pack_final(final, parts)))
+
+def _store_payloads(conn, payloads):
+    """Inserts payloads not stored yet; returns the bytes actually added."""
+    added = 0
+    for payload in payloads:
+        if payload is not None:
+            cursor = conn.execute('INSERT OR IGNORE INTO rfp_payloads (hash, codec, size, data) VALUES (?, ?, ?, ?)', payload)
+            added += len(payload[3]) if cursor.rowcount > 0 else 0
+    return added
+
+# Payloads no longer referenced (replaced by re-pricing, or left by trimmed and
+# purged result cache entries) are deleted by a mark-and-sweep pass, so writers
+# never check references row by row.
+PAYLOAD_GC_AFTER_DROPS = 1000   # result cache entries dropped between passes
+
+def _collect_payload_garbage(conn):
+    """Deletes payloads no request or result cache entry refers to (inside the caller's
+    write transaction); returns the count."""
+    referenced = ' UNION ALL '.join(
+        f'SELECT {column} FROM {table} WHERE {column} IS NOT NULL'
+        for table in ('rfp_requests', 'rfp_result_cache') for column in PAYLOAD_COLUMNS.values()
+    )
+    return conn.execute(f'DELETE FROM rfp_payloads WHERE hash NOT IN ({referenced})').rowcount
+
+def collect_payload_garbage():
+    """Deletes unreferenced payloads in one write transaction; returns the count."""
+    with db_transaction() as conn:
+        return _collect_payload_garbage(conn)
+
+def _load_payloads(conn, row):
+    """Decodes a row's payloads into the legacy column names (sales_data, ... final_response)."""
+    hashes = [row[column] for column in PAYLOAD_COLUMNS.values() if row[column] is not None]
+    stored = {}
+    if hashes:
+        placeholders = ', '.join('?' * len(hashes))
+        for payload in conn.execute(f'SELECT hash, codec, data FROM rfp_payloads WHERE hash IN ({placeholders})', hashes):
+            stored[payload['hash']] = _decode_payload(payload['codec'], payload['data'])
+
+    parts = {}
+    for column, hash_column in PAYLOAD_COLUMNS.items():
+        if row[hash_column] is not None:
+            parts[column] = stored[row[hash_column]]
+        elif row[column] is not None:
+            parts[column] = json.loads(row[column])   # not migrated yet
+        else:
+            parts[column] = None
+    parts['final_response'] = _unpack_final(parts['final_response'], parts)
+    return parts
+
+def _backfill_authority(conn):
+    print("[Database] Backfilling rfp_requests.authority...")
+    last_id = 0
+    while True:
+        rows = conn.execute('''
+            SELECT r.id, p.codec, p.data FROM rfp_requests r JOIN rfp_payloads p ON p.hash = r.sales_hash
+            WHERE r.id > ? ORDER BY r.id LIMIT ?
+        ''', (last_id, PAYLOAD_MIGRATION_CHUNK)).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+        updates = [(_summary_fields(_decode_payload(row['codec'], row['data']))[1], row['id']) for row in rows]
+        conn.executemany('UPDATE rfp_requests SET authority = ? WHERE id = ?', updates)
+        conn.commit()
+
+def _migrate_payloads(conn):
+    """Moves inline JSON payloads of existing rows into rfp_payloads, in chunks."""
+    columns = ', '.join(PAYLOAD_COLUMNS)
+    last_id = 0
+    moved = before = after = 0
+    while True:
+        rows = conn.execute(f'''
+            SELECT id, {columns} FROM rfp_requests
+            WHERE id > ? AND sales_hash IS NULL AND final_hash IS NULL
+              AND (sales_data IS NOT NULL OR tech_data IS NOT NULL OR pricing_data IS NOT NULL OR final_response IS NOT NULL)
+            ORDER BY id LIMIT ?
+        ''', (last_id, PAYLOAD_MIGRATION_CHUNK)).fetchall()
+        if not rows:
+            break
+        if not moved:
+            print("[Database] Moving request payloads into rfp_payloads...")
+
+        conn.execute('BEGIN IMMEDIATE')
+        for row in rows:
+            last_id = row['id']
+            try:
+                parts = {column: json.loads(row[column]) if row[column] is not None else None for column in PAYLOAD_COLUMNS}
+            except ValueError:
+                continue # leave unreadable rows as they are
+            payloads = _encode_run(parts['sales_data'], parts['tech_data'], parts['pricing_data'], parts['final_response'])
+            before += sum(len(row[column].encode('utf-8')) for column in PAYLOAD_COLUMNS if row[column] is not None)
+            after += _store_payloads(conn, payloads)
+            conn.execute('''
+                UPDATE rfp_requests
+                SET sales_hash = ?, tech_hash = ?, pricing_hash = ?, final_hash = ?,
+                    sales_data = NULL, tech_data = NULL, pricing_data = NULL, final_response = NULL
+                WHERE id = ?
+            ''', tuple(payload[0] if payload else None for payload in payloads) + (row['id'],))
+            moved += 1
+        conn.commit()
+
+    if moved:
+        saved = 100 * (1 - after / before) if before else 0
+        print(f"[Database] Moved {moved} request payloads: {before / 1024:.0f} KB -> {after / 1024:.0f} KB ({saved:.0f}% smaller)")
+        print("[Database] Run VACUUM to return the freed pages to the filesystem.")
+    return before, after
+
+# --- Result Cache ---
+# Entries point at rfp_payloads rows, so a cached run costs one small row.
+RESULT_CACHE_MAX_ROWS = int(os.environ.get("RFP_RESULT_CACHE_MAX_ROWS", "5000"))
+RESULT_CACHE_TRIM_EVERY = 64       # puts between checks of the row limit
+RESULT_CACHE_TOUCH_SECONDS = 60    # accessed is rewritten at most this often per entry
+
+_cache_puts = 0
+_cache_dropped = 0   # entries deleted since the last payload GC pass
+
+def _cache_entries_dropped(conn, count):
+    global _cache_dropped
+    _cache_dropped += count
+    if _cache_dropped >= PAYLOAD_GC_AFTER_DROPS:
+        _cache_dropped = 0
+        _collect_payload_garbage(conn)
+
+def _put_cached_result(conn, cache_entry, hashes):
+    global _cache_puts
+    key, fingerprint = cache_entry
+    now = time.time()
     conn.execute('''
-        INSERT INTO rfp_requests (input_text, sales_data, tech_data, pricing_data, final_response, status)
-        VALUES (?, ?, ?, ?, ?, 'Pending')
-    ''', (input_text, json.dumps(sales), json.dumps(tech), json.dumps(pricing), json.dumps(final)))
-    conn.commit()
-    conn.close()
+        INSERT OR REPLACE INTO rfp_result_cache (key, fingerprint, sales_hash, tech_hash, pricing_hash, final_hash, created, accessed)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (key, fingerprint) + hashes + (now, now))
+
+    _cache_puts += 1
+    if _cache_puts % RESULT_CACHE_TRIM_EVERY == 0:
+        # Least recently used entries go first
+        trimmed = conn.execute('''
+            DELETE FROM rfp_result_cache WHERE key IN (
+                SELECT key FROM rfp_result_cache ORDER BY accessed
+                LIMIT max((SELECT count(*) FROM rfp_result_cache) - ?, 0)
+            )
+        ''', (RESULT_CACHE_MAX_ROWS,)).rowcount
+        _cache_entries_dropped(conn, trimmed)
+
+def get_cached_result(key, max_age):
+    """Payloads (sales_data .. final_response) of a cached run younger than max_age seconds, or None."""
+    now = time.time()
+    with db_connection() as conn:
+        row = conn.execute(f'''
+            SELECT created, accessed, {', '.join(PAYLOAD_COLUMNS.values())},
+                   {', '.join('NULL AS ' + column for column in PAYLOAD_COLUMNS)}
+            FROM rfp_result_cache WHERE key = ?
+        ''', (key,)).fetchone()
+        if row is None:
+            return None
+        fresh = now - row['created'] <= max_age
+        parts = _load_payloads(conn, row) if fresh else None
+
+    if not fresh:
+        with db_transaction() as conn:
+            _cache_entries_dropped(conn, conn.execute('DELETE FROM rfp_result_cache WHERE key = ?', (key,)).rowcount)
+        return None
+    if now - row['accessed'] > RESULT_CACHE_TOUCH_SECONDS:
+        with db_transaction() as conn:
+            conn.execute('UPDATE rfp_result_cache SET accessed = ? WHERE key = ?', (now, key))
+    return parts
+
+def purge_result_cache(fingerprint=None, max_age=None):
+    """Deletes entries built against another catalog fingerprint and/or older than max_age; returns the count."""
+    conditions, params = [], []
+    if fingerprint is not None:
+        conditions.append('fingerprint != ?')
+        params.append(fingerprint)
+    if max_age is not None:
+        conditions.append('created < ?')
+        params.append(time.time() - max_age)
+    where = f"WHERE {' OR '.join(conditions)}" if conditions else ""
+    with db_transaction() as conn:
+        removed = conn.execute(f'DELETE FROM rfp_result_cache {where}', params).rowcount
+        _cache_entries_dropped(conn, removed)
+    return removed
+
+# --- Re-pricing ---
+# A run walks Pending proposals in id order up to max_id (rows saved later were
+# priced with the new rules already); last_id is the checkpoint, advanced in
+# the same transaction as each chunk's updates.
+REPRICE_COLUMNS = ('id', 'sales_hash', 'tech_hash', 'sales_data', 'tech_data')
+# A running run is leased to one process (owner), which renews the heartbeat at every
+# checkpoint. Other processes only take a run over once its lease has expired.
+REPRICE_LEASE_SECONDS = 120
+
+class RepriceBusyError(RuntimeError):
+    pass
+
+def reprice_run_active(run):
+    """True while run (a dict from get_reprice_run) is held by a live process."""
+    return (run is not None and run['state'] == 'running' and run['heartbeat'] is not None
+            and time.time() - run['heartbeat'] < REPRICE_LEASE_SECONDS)
+
+def start_reprice_run(fingerprint, owner, restart=False):
+    """Resumes the interrupted run for this catalog fingerprint, or starts a new one, leased to owner;
+    returns it as a dict. An unfinished run for another fingerprint is marked superseded.
+    Raises RepriceBusyError while another process holds the lease."""
+    with db_transaction() as conn:
+        row = conn.execute(
+            "SELECT * FROM rfp_reprice_runs WHERE state IN ('running', 'failed') ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if row is not None and reprice_run_active(dict(row)):
+            raise RepriceBusyError(f"Re-pricing run {row['id']} is in progress in {row['owner']}")
+        now = time.time()
+        if row is not None and (restart or row['fingerprint'] != fingerprint):
+            conn.execute("UPDATE rfp_reprice_runs SET state = 'superseded', finished = CURRENT_TIMESTAMP WHERE id = ?",
+                         (row['id'],))
+            row = None
+        if row is not None:
+            conn.execute("UPDATE rfp_reprice_runs SET state = 'running', error = NULL, owner = ?, heartbeat = ? WHERE id = ?",
+                         (owner, now, row['id']))
+            run_id = row['id']
+        else:
+            max_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM rfp_requests').fetchone()[0]
+            total = conn.execute(
+                "SELECT count(*) FROM rfp_requests WHERE status = 'Pending' AND job_state = 'done'"
+            ).fetchone()[0]
+            run_id = conn.execute('''
+                INSERT INTO rfp_reprice_runs (fingerprint, state, max_id, total, owner, heartbeat)
+                VALUES (?, 'running', ?, ?, ?, ?)
+            ''', (fingerprint, max_id, total, owner, now)).lastrowid
+        return dict(conn.execute('SELECT * FROM rfp_reprice_runs WHERE id = ?', (run_id,)).fetchone())
+
+def get_reprice_run(run_id=None):
+    """The given (default: latest) re-pricing run as a dict, or None."""
+    with db_connection() as conn:
+        if run_id is None:
+            row = conn.execute('SELECT * FROM rfp_reprice_runs ORDER BY id DESC LIMIT 1').fetchone()
+        else:
+            row = conn.execute('SELECT * FROM rfp_reprice_runs WHERE id = ?', (run_id,)).fetchone()
+    return dict(row) if row is not None else None
+
+def finish_reprice_run(run_id, owner, state, error=None):
+    """Ends the run and releases its lease (a no-op if owner no longer holds it)."""
+    with db_transaction() as conn:
+        conn.execute('''
+            UPDATE rfp_reprice_runs SET state = ?, error = ?, finished = CURRENT_TIMESTAMP, heartbeat = NULL
+            WHERE id = ? AND owner = ? AND state = 'running'
+        ''', (state, error, run_id, owner))
+
+def get_pending_ids(after_id, max_id, limit):
+    """Ids of finished Pending proposals in (after_id, max_id], ascending."""
+    with db_connection() as conn:
+        rows = conn.execute('''
+            SELECT id FROM rfp_requests
+            WHERE id > ? AND id <= ? AND status = 'Pending' AND job_state = 'done'
+            ORDER BY id LIMIT ?
+        ''', (after_id, max_id, limit)).fetchall()
+    return [row['id'] for row in rows]
+
+def load_pricing_inputs(ids):
+    """[(id, sales_data, tech_data)] for the given requests, with one payload query per chunk."""
+    if not ids:
+        return []
+    with db_connection() as conn:
+        rows = conn.execute(
+            f"SELECT {', '.join(REPRICE_COLUMNS)} FROM rfp_requests WHERE id IN ({', '.join('?' * len(ids))}) ORDER BY id",
+            ids
+        ).fetchall()
+        hashes = {row[column] for row in rows for column in ('sales_hash', 'tech_hash') if row[column] is not None}
+        stored = {}
+        if hashes:
+            for payload in conn.execute(
+                f"SELECT hash, codec, data FROM rfp_payloads WHERE hash IN ({', '.join('?' * len(hashes))})", list(hashes)
+            ):
+                stored[payload['hash']] = (payload['codec'], payload['data'])
+
+    def part(row, hash_column, column):
+        if row[hash_column] is not None:
+            return _decode_payload(*stored[row[hash_column]])
+        return json.loads(row[column]) if row[column] is not None else None   # not migrated yet
+
+    return [(row['id'], part(row, 'sales_hash', 'sales_data'), part(row, 'tech_hash', 'tech_data')) for row in rows]
+
+def encode_pricing_update(sales, tech, pricing, final):
+    """The (pricing, final) payloads to store for a re-priced request."""
+    parts = {'sales_data': sales, 'tech_data': tech, 'pricing_data': pricing}
+    return _encode_payload(pricing), _encode_payload(_pack_final(final, parts))
+
+def save_repriced(run_id, owner, updates, last_id):
+    """Applies [(id, pricing payload, final payload)], moves the run's checkpoint to last_id and renews
+    owner's lease, atomically. Rows whose status left Pending in the meantime are left alone. Returns
+    the rows updated; raises RepriceBusyError (writing nothing) if owner has lost the lease."""
+    with db_transaction() as conn:
+        held = conn.execute(
+            "UPDATE rfp_reprice_runs SET heartbeat = ? WHERE id = ? AND owner = ? AND state = 'running'",
+            (time.time(), run_id, owner)
+        ).rowcount
+        if not held:
+            raise RepriceBusyError(f"Re-pricing run {run_id} was taken over by another process")
+        _store_payloads(conn, [payload for _, pricing, final in updates for payload in (pricing, final)])
+        updated = 0
+        for request_id, pricing, final in updates:
+            updated += conn.execute('''
+                UPDATE rfp_requests SET pricing_hash = ?, final_hash = ?
+                WHERE id = ? AND status = 'Pending' AND job_state = 'done'
+            ''', (pricing[0], final[0], request_id)).rowcount
+        conn.execute('UPDATE rfp_reprice_runs SET last_id = ?, repriced = repriced + ? WHERE id = ?',
+                     (last_id, updated, run_id))
+    return updated
+
+RFP_STATUSES = ('Pending', 'Approved', 'Declined')
+
+def update_rfp_status(request_id, status):
+    """Sets a proposal's review status; False if there is no finished request with that id."""
+    with db_transaction() as conn:
+        cursor = conn.execute(
+            "UPDATE rfp_requests SET status = ? WHERE id = ? AND status IS NOT NULL",
+            (status, request_id)
+        )
+        return cursor.rowcount > 0
+
+# --- Job State ---
+# Queued submissions live in rfp_requests with job_state queued -> running -> done | failed.
+# status stays NULL until the job finishes, so unfinished jobs are not counted as proposals.
+# An unfinished job is leased to the process that runs it (job_owner), which renews
+# job_heartbeat while it is alive. Once a lease expires, because that process stopped,
+# any other process may claim the job and run it again.
+JOB_LEASE_SECONDS = 30
+UNFINISHED_JOBS = "job_state IN ('queued', 'running')"   # matches idx_rfp_requests_unfinished
+
+def create_job(input_text, owner):
+    with db_transaction() as conn:
+        cursor = conn.execute('''
+            INSERT INTO rfp_requests (input_text, status, job_state, job_owner, job_heartbeat)
+            VALUES (?, NULL, 'queued', ?, ?)
+        ''', (input_text, owner, time.time()))
+        return cursor.lastrowid
+
+def update_job(request_id, job_state, job_stage=None, job_error=None):
+    with db_transaction() as conn:
+        conn.execute(
+            'UPDATE rfp_requests SET job_state = ?, job_stage = ?, job_error = ? WHERE id = ?',
+            (job_state, job_stage, job_error, request_id)
+        )
+
+def get_job(request_id, with_payloads=True):
+    """Returns the job row as a dict, or None. Payloads (sales_data .. final_response,
+    decoded) are loaded from rfp_payloads only when with_payloads is set."""
+    with db_connection() as conn:
+        row = conn.execute(f'''
+            SELECT id, timestamp, input_text, title, status, job_state, job_stage, job_error,
+                   {', '.join(PAYLOAD_COLUMNS)}, {', '.join(PAYLOAD_COLUMNS.values())}
+            FROM rfp_requests WHERE id = ?
+        ''', (request_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = {key: row[key] for key in ('id', 'timestamp', 'input_text', 'title', 'status', 'job_state', 'job_stage', 'job_error')}
+        if with_payloads:
+            job.update(_load_payloads(conn, row))
+    return job
+
+def renew_job_leases(owner):
+    """Extends the lease on every unfinished job owner holds; returns how many."""
+    with db_transaction() as conn:
+        return conn.execute(
+            f'UPDATE rfp_requests SET job_heartbeat = ? WHERE {UNFINISHED_JOBS} AND job_owner = ?',
+            (time.time(), owner)
+        ).rowcount
+
+def claim_unfinished_jobs(owner, limit):
+    """Leases up to limit unfinished jobs whose lease has expired (or that never had one)
+    to owner and marks them queued again; returns them as [{id, input_text}], oldest first."""
+    orphaned = f'''
+        SELECT id, input_text FROM rfp_requests
+        WHERE {UNFINISHED_JOBS} AND (job_heartbeat IS NULL OR job_heartbeat < ?)
+        ORDER BY id LIMIT ?
+    '''
+    if limit <= 0:
+        return []
+    # Checked without the write lock first, as every process polls for orphaned jobs
+    with db_connection() as conn:
+        if conn.execute(orphaned, (time.time() - JOB_LEASE_SECONDS, 1)).fetchone() is None:
+            return []
+    now = time.time()
+    with db_transaction() as conn:
+        rows = conn.execute(orphaned, (now - JOB_LEASE_SECONDS, limit)).fetchall()
+        conn.executemany('''
+            UPDATE rfp_requests SET job_state = 'queued', job_stage = NULL, job_error = NULL,
+                job_owner = ?, job_heartbeat = ?
+            WHERE id = ?
+        ''', [(owner, now, row['id']) for row in rows])
+    return [dict(row) for row in rows]
 
 def get_dashboard_stats():
-    conn = get_db_connection()
-    
-    # Status Counts
-    stats = conn.execute('SELECT status, COUNT(*) as count FROM rfp_requests GROUP BY status').fetchall()
+    with db_connection() as conn:
+        # Status Counts (maintained by triggers, see _create_status_counts)
+        stats = conn.execute('SELECT status, count FROM rfp_status_counts').fetchall()
+        
+        # Recent Activity (walks idx_rfp_requests_timestamp backwards)
+        recent = conn.execute('''
+            SELECT id, timestamp, status, title FROM rfp_requests
+            ORDER BY timestamp DESC, id DESC LIMIT 5
+        ''').fetchall()
+
     status_counts = {row['status']: row['count'] for row in stats}
-    
-    # Recent Activity
-    recent = conn.execute('SELECT id, timestamp, status, sales_data FROM rfp_requests ORDER BY timestamp DESC LIMIT 5').fetchall()
     recent_activity = []
     for row in recent:
-        sales = json.loads(row['sales_data'])
-        title = sales.get('rfp_metadata', {}).get('title', 'Unknown RFP')
         recent_activity.append({
             "id": row['id'],
             "date": row['timestamp'],
             "status": row['status'],
-            "title": title
+            "title": row['title'] if row['title'] is not None else 'Unknown RFP'
         })
-
-    conn.close()
     
     return {
         "approved": status_counts.get('Approved', 0),
@@ -132,16 +1065,167 @@ def get_dashboard_stats():
         "recent_activity": recent_activity
     }
 
+# --- History & Search ---
+# Listings return summary columns only and page with a keyset cursor on
+# (timestamp, id), so every page is an index range scan however deep it is.
+
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+HISTORY_PREVIEW_CHARS = 200   # input_text characters returned per row
+
+def encode_cursor(timestamp, request_id):
+    raw = json.dumps([timestamp, request_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, request_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(timestamp, str) or not isinstance(request_id, int):
+        raise ValueError("Invalid cursor")
+    return timestamp, request_id
+
+def _fts_query(text):
+    """Turns free text into an FTS5 query: every word must match; a trailing * makes the last a prefix."""
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return None
+    query = ' '.join(f'"{term}"' for term in terms)
+    return query + '*' if text.rstrip().endswith('*') else query
+
+def _date_bound(value, end):
+    # Date-only upper bounds include the whole day
+    if end and len(value) == 10:
+        return value + ' 23:59:59'
+    return value
+
+def list_rfp_requests(status=None, date_from=None, date_to=None, query=None, limit=HISTORY_PAGE_SIZE, cursor=None):
+    """Newest-first page of request summaries.
+
+    Returns (items, next_cursor); next_cursor is None on the last page. query
+    is matched against title, authority and input text.
+    """
+    limit = max(1, min(int(limit), HISTORY_MAX_PAGE_SIZE))
+    clauses, params = [], []
+    if status is not None:
+        clauses.append('r.status = ?')
+        params.append(status)
+    if date_from:
+        clauses.append('r.timestamp >= ?')
+        params.append(_date_bound(date_from, end=False))
+    if date_to:
+        clauses.append('r.timestamp <= ?')
+        params.append(_date_bound(date_to, end=True))
+    if cursor:
+        clauses.append('(r.timestamp, r.id) < (?, ?)')
+        params.extend(decode_cursor(cursor))
+
+    with db_connection() as conn:
+        if query:
+            fts = _fts_query(query)
+            if fts is None:
+                return [], None
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'rfp_requests_fts'").fetchone():
+                clauses.append('r.id IN (SELECT rowid FROM rfp_requests_fts WHERE rfp_requests_fts MATCH ?)')
+                params.append(fts)
+            else:
+                for term in re.findall(r'\w+', query):
+                    clauses.append("(r.title LIKE ? OR r.authority LIKE ? OR r.input_text LIKE ?)")
+                    params.extend([f'%{term}%'] * 3)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = conn.execute(f'''
+            SELECT r.id, r.timestamp, r.status, r.job_state, r.title, r.authority,
+                   substr(r.input_text, 1, {HISTORY_PREVIEW_CHARS}) AS input_preview
+            FROM rfp_requests r {where}
+            ORDER BY r.timestamp DESC, r.id DESC
+            LIMIT ?
+        ''', params + [limit + 1]).fetchall()
+
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last['timestamp'], last['id'])
+    return items, next_cursor
+
 def add_product(product):
-    conn = get_db_connection()
+    row = {
+        "sku": product['sku'],
+        "name": product['name'],
+        "category": product['category'],
+        "base_cost": product['base_cost'],
+        "description": product.get('description', '')
+    }
     try:
-        conn.execute('''
-            INSERT INTO inventory (sku, name, category, base_cost, description)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (product['sku'], product['name'], product['category'], product['base_cost'], product.get('description', '')))
-        conn.commit()
-        return True
+        with db_transaction() as conn:
+            conn.execute('''
+                INSERT INTO inventory (sku, name, category, base_cost, description)
+                VALUES (:sku, :name, :category, :base_cost, :description)
+            ''', row)
+            stored = _bump_stored_catalog_version(conn)
     except sqlite3.IntegrityError:
         return False # SKU likely exists
-    finally:
-        conn.close()
+
+    _catalog_changed(row, (DB_FILE, stored))
+    return True
+
+# --- Bulk Import ---
+IMPORT_COLUMNS = ("sku", "name", "category", "base_cost", "description")
+
+def upsert_products(chunks, should_apply=None):
+    """Inserts or replaces inventory rows from an iterable of row-dict lists.
+
+    Rows are staged in a TEMP table first, so a slow upload never holds the
+    database write lock; the staged rows are then applied with one
+    INSERT .. ON CONFLICT statement in a single write transaction (a SKU
+    repeated in the input ends up with its last row). should_apply() is
+    called once everything is staged; if it returns false nothing is applied.
+    Returns {"created", "updated"} as distinct SKU counts, plus "catalog_version".
+    """
+    with db_connection() as conn:
+        conn.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS inventory_import (
+                sku TEXT, name TEXT, category TEXT, base_cost REAL, description TEXT
+            )
+        ''')
+        conn.execute('DELETE FROM temp.inventory_import')
+        try:
+            for chunk in chunks:
+                conn.executemany('''
+                    INSERT INTO temp.inventory_import (sku, name, category, base_cost, description)
+                    VALUES (:sku, :name, :category, :base_cost, :description)
+                ''', chunk)
+            conn.commit()
+            if should_apply is not None and not should_apply():
+                return {"created": 0, "updated": 0, "catalog_version": _catalog_version}
+
+            conn.execute('BEGIN IMMEDIATE')
+            updated = conn.execute('''
+                SELECT count(DISTINCT sku) FROM temp.inventory_import
+                WHERE sku IN (SELECT sku FROM inventory)
+            ''').fetchone()[0]
+            staged = conn.execute('SELECT count(DISTINCT sku) FROM temp.inventory_import').fetchone()[0]
+            conn.execute('''
+                INSERT INTO inventory (sku, name, category, base_cost, description)
+                SELECT sku, name, category, base_cost, description FROM temp.inventory_import WHERE true
+                ORDER BY rowid
+                ON CONFLICT(sku) DO UPDATE SET
+                    name = excluded.name,
+                    category = excluded.category,
+                    base_cost = excluded.base_cost,
+                    description = excluded.description
+            ''')
+            stored = _bump_stored_catalog_version(conn) if staged else None
+            conn.commit()
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute('DELETE FROM temp.inventory_import')
+            conn.commit()
+
+    # One invalidation for the whole import, however many rows it touched
+    version = _catalog_changed(None, (DB_FILE, stored)) if staged else _catalog_version
+    return {"created": staged - updated, "updated": updated, "catalog_version": version}
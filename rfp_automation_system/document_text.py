@@ -0,0 +1,98 @@
+"""Plain-text extraction from PDF and DOCX tender attachments.
+
+Runs inside attachments.py's worker processes. DOCX is read with zipfile and
+ElementTree, one paragraph per line. PDF text comes from pypdf (a declared
+dependency, see requirements.txt), imported when the first PDF is read.
+
+Extraction stops with DocumentError after `seconds` or once MAX_TEXT_CHARS
+characters have been collected.
+"""
+import io
+import time
+import zipfile
+from xml.etree import ElementTree
+
+# --- Extraction Limits ---
+MAX_TEXT_CHARS = 2 * 1024 * 1024         # text kept per document
+MAX_PART_BYTES = 64 * 1024 * 1024        # decompressed document.xml (zip bomb guard)
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class DocumentError(Exception):
+    pass
+
+
+class _Text:
+    # Collects text parts up to MAX_TEXT_CHARS and enforces the deadline
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+        self.parts = []
+        self.size = 0
+
+    def add(self, text):
+        """Returns False once the text is long enough."""
+        if time.monotonic() > self.deadline:
+            raise DocumentError(f"text extraction took longer than {self.seconds}s")
+        self.parts.append(text)
+        self.size += len(text)
+        return self.size < MAX_TEXT_CHARS
+
+    def value(self):
+        return "".join(self.parts)[:MAX_TEXT_CHARS]
+
+
+def extract_text(content, kind, seconds=30):
+    """Text of a document given as bytes; kind is "pdf" or "docx"."""
+    text = _Text(seconds)
+    if kind == "docx":
+        _docx_text(content, text)
+    elif kind == "pdf":
+        _pdf_text(content, text)
+    else:
+        raise DocumentError(f"unsupported document type: {kind}")
+    return text.value()
+
+
+def _docx_text(content, text):
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(content))
+    except zipfile.BadZipFile:
+        raise DocumentError("not a DOCX file")
+    with archive:
+        try:
+            info = archive.getinfo("word/document.xml")
+        except KeyError:
+            raise DocumentError("not a DOCX file (no word/document.xml)")
+        if info.file_size > MAX_PART_BYTES:
+            raise DocumentError(f"document.xml is larger than {MAX_PART_BYTES} bytes")
+
+        with archive.open(info) as xml:
+            for _, element in ElementTree.iterparse(xml):
+                tag = element.tag
+                if tag == _W + "t":
+                    if element.text and not text.add(element.text):
+                        return
+                elif tag in (_W + "tab", _W + "br"):
+                    text.add(" ")
+                elif tag == _W + "p":
+                    text.add("\n")
+                    element.clear()
+
+
+def _pdf_text(content, text):
+    from pypdf import PdfReader
+
+    if not content.startswith(b"%PDF"):
+        raise DocumentError("not a PDF file")
+    try:
+        reader = PdfReader(io.BytesIO(content))
+        for page in reader.pages:
+            if not text.add((page.extract_text() or "") + "\n"):
+                return
+    except DocumentError:
+        raise
+    except Exception as e:
+        raise DocumentError(f"unreadable PDF: {e}")
+
@@ -0,0 +1,153 @@
+"""Single-pass keyword and quantity extraction for the SalesAgent.
+
+The keyword list is compiled once into a trie-shaped regex, so one scan of the
+lower-cased page text finds every keyword occurrence. Quantities follow the original
+per-keyword rules:
+
+* the first number within 20 characters after the first occurrence that has one
+  (`keyword.{0,20}?(\\d+)`), otherwise
+* the leftmost number ending within 20 characters before an occurrence
+  (`(\\d+).{0,20}?keyword`), otherwise 1.
+
+Both rules are checked in a bounded window around each occurrence instead of
+rescanning the whole text per keyword. Items come out in keyword-list order.
+"""
+import re
+
+from records import LineItem
+
+QUANTITY_WINDOW = 20
+
+_FORWARD_QTY = re.compile(rf'.{{0,{QUANTITY_WINDOW}}}?(\d+)')
+
+
+def _trie_pattern(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional suffix: the longest keyword at a position wins
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordExtractor:
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._folded = sorted({k.lower() for k in self.keywords if k})
+
+        # For each keyword, every keyword that is a prefix of it (itself included)
+        folded = set(self._folded)
+        self._prefixes = {
+            k: [k[:i] for i in range(1, len(k) + 1) if k[:i] in folded]
+            for k in self._folded
+        }
+        pattern = _trie_pattern(self._folded)
+        self._scan = re.compile(pattern) if self._folded else None
+        # Used when lower-casing changes the text length (rare non-ASCII case mappings)
+        self._scan_ignorecase = re.compile(pattern, re.IGNORECASE) if self._folded else None
+        self._backward = {}
+
+    def _backward_pattern(self, keyword):
+        pattern = self._backward.get(keyword)
+        if pattern is None:
+            pattern = re.compile(rf'(\d+).{{0,{QUANTITY_WINDOW}}}?{re.escape(keyword)}', re.IGNORECASE)
+            self._backward[keyword] = pattern
+        return pattern
+
+    def scanner(self):
+        return KeywordScanner(self)
+
+    def find_quantities(self, text):
+        """Returns {folded keyword: quantity or None} for every keyword present in text."""
+        scanner = self.scanner()
+        scanner.feed(text, 0, len(text))
+        return scanner.result()
+
+    def extract(self, text):
+        """Returns the SalesAgent items list for text."""
+        return self.items(self.find_quantities(text))
+
+    def items(self, quantities):
+        items = []
+        for keyword in self.keywords:
+            folded = keyword.lower()
+            if folded not in quantities:
+                continue
+            qty = quantities[folded]
+            items.append(LineItem(keyword, qty if qty is not None else 1))
+        return items
+
+
+class KeywordScanner:
+    """Incremental state for KeywordExtractor.
+
+    feed() may be called repeatedly with successive windows of one document
+    (see html_stream.py); each call processes the occurrences that start in
+    [begin, limit) of the window, with the rest of the window as lookahead.
+    """
+
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self.found = {}      # keyword -> forward quantity (None until one is found)
+        self.backward = {}   # keyword -> first backward quantity
+        # Once every keyword has a forward quantity nothing later can change the result
+        self.unresolved = len(extractor._folded)
+
+    @property
+    def done(self):
+        return not self.unresolved
+
+    def feed(self, text, begin, limit):
+        extractor = self.extractor
+        if extractor._scan is None:
+            return
+
+        haystack, scan = text.lower(), extractor._scan
+        if len(haystack) != len(text):
+            haystack, scan = text, extractor._scan_ignorecase
+
+        found, backward = self.found, self.backward
+        pos = begin
+        while self.unresolved:
+            match = scan.search(haystack, pos)
+            if match is None or match.start() >= limit:
+                break
+            start = match.start()
+            pos = start + 1  # occurrences may overlap
+            longest = match.group().lower()
+            for keyword in extractor._prefixes.get(longest, (longest,)):
+                if found.get(keyword) is not None:
+                    continue
+                found.setdefault(keyword, None)
+                end = start + len(keyword)
+
+                qty_match = _FORWARD_QTY.match(text, end)
+                if qty_match:
+                    found[keyword] = int(qty_match.group(1))
+                    self.unresolved -= 1
+                    continue
+
+                if keyword not in backward:
+                    # The number may begin before the window if it is a long digit run
+                    lo = max(0, start - QUANTITY_WINDOW)
+                    while lo > 0 and text[lo - 1].isdecimal():
+                        lo -= 1
+                    qty_match = extractor._backward_pattern(keyword).search(text, lo, end)
+                    if qty_match:
+                        backward[keyword] = int(qty_match.group(1))
+
+    def result(self):
+        return {
+            keyword: qty if qty is not None else self.backward.get(keyword)
+            for keyword, qty in self.found.items()
+        }
@@ -0,0 +1,37 @@
+"""Gunicorn settings: gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is preloaded in the master (wsgi.py warms the schema, catalog and
+matching index), then forked into RFP_WORKERS processes with RFP_THREADS
+threads each. Every worker opens its own SQLite connections and HTTP session
+after the fork.
+"""
+import multiprocessing
+import os
+
+# --- Server Settings ---
+bind = os.environ.get("RFP_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("RFP_WORKERS", str(multiprocessing.cpu_count())))
+threads = int(os.environ.get("RFP_THREADS", "4"))
+worker_class = "gthread"
+preload_app = True
+timeout = 120            # a pipeline run includes fetching the tender page
+graceful_timeout = 30
+keepalive = 5
+
+# Workers writing one shared outputs/test_run/ would overwrite each other's
+# artifacts, and synchronously; keep one directory per run unless told otherwise
+os.environ.setdefault("RFP_ARTIFACT_MODE", "dirs")
+
+
+def post_fork(server, worker):
+    import database
+    import metrics
+    import server as rfp_server
+
+    # Connections opened in the master must never be shared with a worker
+    database.close_pool()
+    # Each worker's /metrics counts only its own work, not what the master recorded
+    metrics.reset()
+    # Every worker keeps a job queue, which claims jobs left by a stopped worker through
+    # their database lease, so each orphaned job is resumed by one worker
+    rfp_server.get_job_queue()
@@ -0,0 +1,218 @@
+"""Streaming HTML analysis for large tender pages.
+
+TenderPageParser tokenizes HTML incrementally (html.parser, no DOM) and keeps
+only the title/h1 text and the visible text nodes, in the same order and with
+the same stripping as BeautifulSoup's get_text(separator=' ', strip=True).
+The text goes straight into a StreamingTextAnalyzer, which runs the SalesAgent
+heuristics over bounded windows and then drops everything but an overlap
+tail. Memory stays proportional to the window size, not the page size.
+
+A match is only missed if it spans more than OVERLAP_CHARS of text, e.g. a
+single token longer than that.
+"""
+import codecs
+import re
+from html.parser import HTMLParser
+
+WINDOW_CHARS = 256 * 1024
+OVERLAP_CHARS = 4096
+MAX_HOLD_CHARS = 64 * 1024   # longest authority value kept waiting for its terminator
+
+CONTRACT_ID_PATTERN = re.compile(r'(Tender No|Contract ID|Ref No)[:\s]+([A-Za-z0-9\-/]+)', re.IGNORECASE)
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+AUTHORITY_PATTERN = re.compile(r'(Authority|Organization|Department)[:\s]+([^.\n]+)', re.IGNORECASE)
+
+_SKIP_TAGS = {"script", "style", "template"}   # not text for get_text()
+_CHARSET = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+
+
+class TenderPageParser(HTMLParser):
+    def __init__(self, on_text, on_link=None):
+        super().__init__(convert_charrefs=True)
+        self.on_text = on_text
+        self.on_link = on_link
+        self.title = None
+        self.h1 = None
+        self._skip = 0
+        self._capture = None   # "title" or "h1" while inside the first such element
+        self._captured = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a" and self.on_link is not None:
+            href = dict(attrs).get("href")
+            if href:
+                self.on_link(href)
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif self._capture is None and (
+                (tag == "title" and self.title is None) or (tag == "h1" and self.h1 is None)):
+            self._capture = tag
+            self._captured = []
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == self._capture:
+            setattr(self, tag, "".join(self._captured))
+            self._capture = None
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        text = data.strip()
+        if not text:
+            return
+        if self._capture is not None:
+            self._captured.append(text)
+        self.on_text(text)
+
+    def unknown_decl(self, data):
+        # CDATA sections count as text, as in BeautifulSoup
+        if data.upper().startswith("CDATA["):
+            self.handle_data(data[6:])
+
+    def close(self):
+        super().close()
+        if self._capture is not None:
+            setattr(self, self._capture, "".join(self._captured))
+            self._capture = None
+
+
+class StreamingTextAnalyzer:
+    """Runs the SalesAgent text heuristics over a stream of text segments.
+
+    Segments are joined with single spaces. Each heuristic keeps an absolute
+    scan position, so matches in the overlap between windows are not counted
+    twice and the results equal one pass over the whole text.
+    """
+
+    def __init__(self, extractor, window=WINDOW_CHARS, overlap=OVERLAP_CHARS):
+        self.window = window
+        self.overlap = overlap
+        self.keywords = extractor.scanner()
+        self.contract_id = None
+        self.authority = None
+        self.first_date = None
+        self.last_date = None
+        self.date_count = 0
+
+        self._parts = []
+        self._pending = 0
+        self._buffer = ""
+        self._base = 0          # absolute offset of self._buffer[0]
+        self._started = False
+        self._id_pos = 0
+        self._date_pos = 0
+        self._auth_pos = 0
+        self._keyword_pos = 0
+
+    def feed(self, text):
+        if self._started:
+            self._parts.append(" ")
+            self._pending += 1
+        self._started = True
+        self._parts.append(text)
+        self._pending += len(text)
+        if self._pending >= self.window:
+            self._analyze(final=False)
+
+    def close(self):
+        self._analyze(final=True)
+
+    def _analyze(self, final):
+        buf = self._buffer + "".join(self._parts)
+        self._parts = []
+        self._pending = 0
+        base = self._base
+        end = base + len(buf)
+        limit = end if final else end - self.overlap
+
+        if self.contract_id is None and self._id_pos < limit:
+            match = CONTRACT_ID_PATTERN.search(buf, self._id_pos - base)
+            if match and match.start() + base < limit:
+                self.contract_id = match.group(2)
+            else:
+                self._id_pos = limit
+
+        # findall semantics: non-overlapping, continuing after the last match
+        for match in DATE_PATTERN.finditer(buf, self._date_pos - base):
+            if match.start() + base >= limit:
+                break
+            if self.first_date is None:
+                self.first_date = match.group()
+            self.last_date = match.group()
+            self.date_count += 1
+            self._date_pos = match.end() + base
+        self._date_pos = max(self._date_pos, limit)
+
+        hold = end
+        if self.authority is None and self._auth_pos < limit:
+            match = AUTHORITY_PATTERN.search(buf, self._auth_pos - base)
+            if match and match.start() + base < limit:
+                # The value runs to the next '.' or newline; wait for it unless it is huge
+                if final or match.end() < len(buf) or end - (match.start() + base) > MAX_HOLD_CHARS:
+                    self.authority = match.group(2).strip()
+                else:
+                    self._auth_pos = hold = match.start() + base
+            else:
+                self._auth_pos = limit
+
+        if not self.keywords.done and self._keyword_pos < limit:
+            self.keywords.feed(buf, self._keyword_pos - base, limit - base)
+            self._keyword_pos = limit
+
+        # Keep the unscanned tail plus backward context for quantities
+        keep_from = max(0, min(limit - self.overlap, hold) - base)
+        self._buffer = buf[keep_from:]
+        self._base = base + keep_from
+
+    def apply(self, data, extractor):
+        """Writes the results into a SalesAgent data dict (rfp_metadata is a records.RfpMetadata)."""
+        metadata = data["rfp_metadata"]
+        if self.contract_id is not None:
+            metadata.contract_id = self.contract_id
+        if self.first_date is not None:
+            metadata.bid_start = self.first_date
+            if self.date_count > 1:
+                metadata.bid_end = self.last_date
+        if self.authority is not None:
+            metadata.authority = self.authority
+        data["items"] = extractor.items(self.keywords.result())
+
+
+def analyze_stream(chunks, extractor, content_type=None, on_link=None):
+    """Parses an iterable of HTML byte chunks.
+
+    Returns (title, analyzer); title is the first <title>, else the first
+    <h1>, else None. content_type may be a callable, evaluated once the first
+    chunk has arrived (PageStream only knows its headers by then). on_link,
+    if given, is called with the href of every <a> element.
+    """
+    analyzer = StreamingTextAnalyzer(extractor)
+    parser = TenderPageParser(analyzer.feed, on_link)
+    decoder = None
+
+    for chunk in chunks:
+        if decoder is None:
+            header = content_type() if callable(content_type) else content_type
+            decoder = codecs.getincrementaldecoder(_sniff_encoding(header, chunk))(errors="replace")
+        parser.feed(decoder.decode(chunk))
+
+    if decoder is not None:
+        parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    analyzer.close()
+
+    title = parser.title if parser.title is not None else parser.h1
+    return title, analyzer
+
+
+def _sniff_encoding(content_type, first_chunk):
+    for source in (content_type or "", first_chunk[:2048].decode("ascii", "ignore")):
+        match = _CHARSET.search(source)
+        if match:
+            try:
+                return codecs.lookup(match.group(1)).name
+            except LookupError:
+                pass
+    return "utf-8"
@@ -0,0 +1,448 @@
+"""Shared HTTP session and conditional-GET page cache for tender fetches.
+
+All fetches go through one keep-alive requests.Session. Failed attempts
+are retried with backoff, but every attempt and sleep of a fetch fits in the
+caller's timeout, so a retry never makes a fetch slower than one attempt
+could have been.
+
+Responses are cached on disk by URL together with their ETag/Last-Modified
+validators. A page is served without touching the network for as long as its
+Cache-Control max-age (or Expires) allows, CACHE_FRESH_SECONDS when it sends
+neither, and never with no-cache. Older entries are revalidated with a
+conditional request, so an unchanged page costs a 304 instead of a full
+download.
+
+requests is imported when the session is first created, so importing this
+module (and the agents) does not pay for it.
+"""
+import email.utils
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# --- Session Settings ---
+POOL_CONNECTIONS = 32        # hosts with a kept-alive connection pool
+POOL_MAXSIZE = 16            # connections kept per host
+RETRIES = 2                  # extra attempts, within the fetch's timeout
+BACKOFF_FACTOR = 0.5         # sleeps 0.5s, 1s, ... between retries
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# --- Cache Settings ---
+CACHE_DIR = os.path.join("cache", "pages")
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_MAX_AGE_SECONDS = 7 * 24 * 3600    # entries not revalidated for this long are dropped
+CACHE_FRESH_SECONDS = 300                # served without revalidation when a page has no max-age/Expires
+
+STREAM_CHUNK_SIZE = 64 * 1024
+SPOOL_MEMORY_BYTES = 1024 * 1024     # SpooledPage bodies above this go to a temporary file
+
+Page = namedtuple("Page", ["url", "status", "content", "from_cache"])
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Returns the process-wide session (recreated after a fork)."""
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                # Retries are done by _get, which knows the fetch's deadline
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers['User-Agent'] = USER_AGENT
+                _session, _session_pid = session, os.getpid()
+    return _session
+
+
+def _retry_delay(response, attempt):
+    delay = BACKOFF_FACTOR * 2 ** attempt
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit():
+        delay = max(delay, int(retry_after))
+    return delay
+
+
+def _get(url, headers, timeout, verify, stream=False):
+    """session.get with up to RETRIES retries on connection errors and RETRY_STATUSES.
+
+    All attempts and backoff sleeps share one deadline, `timeout` seconds from
+    now: each attempt gets what is left of it as its timeout, and a retry that
+    could not start before the deadline is not made (the last response or
+    error is returned or raised instead).
+    """
+    import requests
+
+    session = get_session()
+    deadline = time.monotonic() + timeout
+    for attempt in range(RETRIES + 1):
+        response = None
+        try:
+            response = session.get(url, headers=headers, timeout=max(deadline - time.monotonic(), 0.001),
+                                   verify=verify, stream=stream)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == RETRIES or time.monotonic() + _retry_delay(None, attempt) >= deadline:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == RETRIES:
+                return response
+            if time.monotonic() + _retry_delay(response, attempt) >= deadline:
+                return response
+            response.close()
+        time.sleep(_retry_delay(response, attempt))
+
+
+def freshness(headers, default=CACHE_FRESH_SECONDS):
+    """Seconds a response may be served from the cache without revalidation.
+
+    Cache-Control no-cache gives 0 and max-age gives its value less the Age
+    header; otherwise Expires counts from the response's Date. A response
+    with none of them gets `default`.
+    """
+    directives = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        directives[name.lower()] = value.strip().strip('"')
+    if "no-cache" in directives:
+        return 0
+    if "max-age" in directives:
+        try:
+            age = int(headers.get("Age") or 0)
+        except ValueError:
+            age = 0
+        try:
+            return max(int(directives["max-age"]) - age, 0)
+        except ValueError:
+            return 0   # an invalid max-age means stale
+    if headers.get("Expires"):
+        try:
+            expires = email.utils.parsedate_to_datetime(headers["Expires"]).timestamp()
+        except (TypeError, ValueError):
+            return 0   # so does an invalid Expires ("0", "-1")
+        try:
+            date = email.utils.parsedate_to_datetime(headers["Date"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            date = time.time()
+        return max(expires - date, 0)
+    return default
+
+
+class PageCache:
+    """Disk cache of response bodies keyed by URL, with size- and age-based eviction.
+
+    Each entry is <sha256(url)>.body plus a .json sidecar holding the validators,
+    timestamps and how long the entry is fresh for (see freshness(); fresh_for
+    is the default). Reads bump the body's mtime, so when the cache grows past
+    max_bytes the least recently used entries are removed first.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES,
+                 max_age=CACHE_MAX_AGE_SECONDS, fresh_for=CACHE_FRESH_SECONDS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.fresh_for = fresh_for
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def lookup(self, url):
+        """Returns the entry metadata for url, or None when missing or too old."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry["validated_at"] > self.max_age or not os.path.exists(body_path):
+            self._remove(meta_path, body_path)
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        return time.time() - entry["validated_at"] < entry.get("fresh_for", self.fresh_for)
+
+    def read(self, url):
+        body_path = self._paths(url)[1]
+        with open(body_path, 'rb') as f:
+            content = f.read()
+        os.utime(body_path)  # recency for LRU eviction
+        return content
+
+    def store(self, url, content, headers):
+        tmp_path = self.temp_path(url)
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        self.commit(url, tmp_path, headers)
+
+    def temp_path(self, url):
+        """A private file path to write a body into before commit()."""
+        os.makedirs(self.directory, exist_ok=True)
+        return f"{self._paths(url)[1]}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def commit(self, url, tmp_path, headers):
+        """Moves a fully written body into place and records its validators."""
+        meta_path, body_path = self._paths(url)
+        now = time.time()
+        size = os.path.getsize(tmp_path)
+        entry = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "content_type": headers.get("Content-Type"),
+            "size": size,
+            "stored_at": now,
+            "validated_at": now,
+            "fresh_for": freshness(headers, self.fresh_for)
+        }
+
+        previous = self.lookup(url)
+        os.replace(tmp_path, body_path)
+        self._write_meta(meta_path, entry)
+
+        with self._lock:
+            self._ensure_size()
+            self._size += size - (previous["size"] if previous else 0)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def open(self, url):
+        """Opens a cached body for streaming reads."""
+        body_path = self._paths(url)[1]
+        os.utime(body_path)  # recency for LRU eviction
+        return open(body_path, 'rb')
+
+    def touch(self, url, entry, headers=None):
+        """Marks an entry as revalidated (after a 304, whose caching headers replace the stored ones)."""
+        entry["validated_at"] = time.time()
+        if headers is not None and ("Cache-Control" in headers or "Expires" in headers):
+            entry["fresh_for"] = freshness(headers, self.fresh_for)
+        self._write_meta(self._paths(url)[0], entry)
+
+    def _write_meta(self, meta_path, entry):
+        tmp_path = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, meta_path)
+
+    def _remove(self, meta_path, body_path):
+        for path in (meta_path, body_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".body"):
+                continue
+            body_path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(body_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, body_path[:-len(".body")]))
+        return entries
+
+    def _ensure_size(self):
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Drops expired entries, then least recently used ones until under max_bytes."""
+        with self._lock:
+            now = time.time()
+            total = 0
+            kept = []
+            # Most recently used first; the meta file's mtime is the last validation
+            for used_at, size, base in sorted(self._entries(), reverse=True):
+                meta_path = base + ".json"
+                try:
+                    validated_at = os.stat(meta_path).st_mtime
+                except OSError:
+                    validated_at = 0
+                if now - validated_at > self.max_age or total + size > self.max_bytes:
+                    self._remove(meta_path, base + ".body")
+                else:
+                    total += size
+                    kept.append(base)
+            self._size = total
+            return len(kept)
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = PageCache()
+    return _cache
+
+
+def _conditional_headers(entry):
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _cacheable(response):
+    return "no-store" not in response.headers.get("Cache-Control", "")
+
+
+def fetch(url, timeout=10, verify=False, use_cache=True):
+    """GETs url through the shared session, serving and revalidating the disk cache."""
+    cache = get_cache() if use_cache else None
+    entry = cache.lookup(url) if cache else None
+
+    if entry and cache.is_fresh(entry):
+        return Page(url, 200, cache.read(url), True)
+
+    response = _get(url, _conditional_headers(entry), timeout, verify)
+    if entry and response.status_code == 304:
+        cache.touch(url, entry, response.headers)
+        return Page(url, 200, cache.read(url), True)
+
+    response.raise_for_status()
+    content = response.content
+    if cache and _cacheable(response):
+        cache.store(url, content, response.headers)
+    return Page(url, response.status_code, content, False)
+
+
+class PageStream:
+    """Iterates over the body of url in chunks without holding it in memory.
+
+    Uses the same cache and revalidation rules as fetch(). A network body is
+    written to the cache as it streams, unless it is cut off at max_bytes, in
+    which case `truncated` is set and nothing is cached. `content_type` is
+    available once iteration has started; `stored` is set once the body has
+    been written to the cache.
+    """
+
+    def __init__(self, url, max_bytes=None, chunk_size=STREAM_CHUNK_SIZE, timeout=10, verify=False, use_cache=True):
+        self.url = url
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.verify = verify
+        self.cache = get_cache() if use_cache else None
+        self.content_type = None
+        self.from_cache = False
+        self.truncated = False
+        self.stored = False
+        self.bytes_read = 0
+
+    def _limit(self, chunks):
+        for chunk in chunks:
+            if self.max_bytes is not None and self.bytes_read + len(chunk) > self.max_bytes:
+                chunk = chunk[:self.max_bytes - self.bytes_read]
+                self.truncated = True
+            self.bytes_read += len(chunk)
+            if chunk:
+                yield chunk
+            if self.truncated:
+                return
+
+    def _from_cache(self, entry):
+        self.from_cache = True
+        self.content_type = entry.get("content_type")
+        with self.cache.open(self.url) as f:
+            yield from self._limit(iter(lambda: f.read(self.chunk_size), b""))
+
+    def __iter__(self):
+        cache = self.cache
+        entry = cache.lookup(self.url) if cache else None
+        if entry and cache.is_fresh(entry):
+            yield from self._from_cache(entry)
+            return
+
+        response = _get(self.url, _conditional_headers(entry), self.timeout, self.verify, stream=True)
+        with response:
+            if entry and response.status_code == 304:
+                cache.touch(self.url, entry, response.headers)
+                yield from self._from_cache(entry)
+                return
+
+            response.raise_for_status()
+            self.content_type = response.headers.get("Content-Type")
+            chunks = self._limit(response.iter_content(self.chunk_size))
+            if not (cache and _cacheable(response)):
+                yield from chunks
+                return
+
+            tmp_path = cache.temp_path(self.url)
+            try:
+                with open(tmp_path, 'wb') as f:
+                    for chunk in chunks:
+                        f.write(chunk)
+                        yield chunk
+                if not self.truncated:
+                    cache.commit(self.url, tmp_path, response.headers)
+                    self.stored = True
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+
+class SpooledPage:
+    """A PageStream read to the end once and kept for a second pass.
+
+    The body is hashed while it is read and held in a SpooledTemporaryFile
+    (in memory up to SPOOL_MEMORY_BYTES), so a page that is hashed first and
+    parsed afterwards is downloaded once even when it could not be cached.
+    Iterating yields the body in chunks, like the PageStream, and the
+    stream's content_type, from_cache, stored, truncated and bytes_read are
+    kept. close() frees the spool.
+    """
+
+    def __init__(self, page, chunk_size=STREAM_CHUNK_SIZE):
+        self.url = page.url
+        self.chunk_size = chunk_size
+        self._spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+        digest = hashlib.sha256()
+        try:
+            for chunk in page:
+                digest.update(chunk)
+                self._spool.write(chunk)
+        except BaseException:
+            self._spool.close()
+            raise
+        self.sha256 = digest.hexdigest()
+        self.content_type = page.content_type
+        self.from_cache = page.from_cache
+        self.stored = page.stored
+        self.truncated = page.truncated
+        self.bytes_read = page.bytes_read
+
+    def __iter__(self):
+        self._spool.seek(0)
+        return iter(lambda: self._spool.read(self.chunk_size), b"")
+
+    def close(self):
+        self._spool.close()
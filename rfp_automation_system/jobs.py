@@ -0,0 +1,155 @@
+"""Background job queue for /api/process-rfp submissions.
+
+Jobs are rows in rfp_requests (see database.create_job), so queued and
+in-flight work survives a restart. Each job is leased in the database to the
+process running it (host/pid); a JobQueue renews its leases every
+JOB_HEARTBEAT_SECONDS and, on the same beat, claims jobs whose lease has
+expired because their process stopped (resume_unfinished). Every server
+worker can therefore pick up another worker's jobs, once, within
+database.JOB_LEASE_SECONDS of it stopping.
+A fixed-size worker pool bounds how many pipelines run at once, and
+max_queued bounds new and resumed jobs alike.
+"""
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+
+MAX_CONCURRENT_JOBS = int(os.environ.get("RFP_MAX_CONCURRENT_JOBS", "4"))
+MAX_QUEUED_JOBS = int(os.environ.get("RFP_MAX_QUEUED_JOBS", "200"))
+JOB_HEARTBEAT_SECONDS = 5    # lease renewal and orphaned-job check interval
+
+STAGES = ("sales", "technical", "pricing", "master")
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def _owner():
+    return f"{socket.gethostname()}/{os.getpid()}"
+
+
+class JobQueue:
+    def __init__(self, orchestrator, max_workers=MAX_CONCURRENT_JOBS, max_queued=MAX_QUEUED_JOBS, owner=None):
+        self.orchestrator = orchestrator
+        self.max_queued = max_queued
+        self.owner = owner or _owner()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rfp-job")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._leases = threading.Thread(target=self._keep_leases, name="rfp-job-leases", daemon=True)
+        self._leases.start()
+
+    def submit(self, input_text):
+        """Stores a queued job and schedules it. Raises QueueFullError when saturated."""
+        with self._lock:
+            if self._in_flight >= self.max_queued:
+                raise QueueFullError(f"{self._in_flight} jobs already queued")
+            self._in_flight += 1
+
+        try:
+            job_id = database.create_job(input_text, self.owner)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+
+        self._executor.submit(self._run, job_id, input_text)
+        return job_id
+
+    def resume_unfinished(self):
+        """Claims and re-enqueues jobs left queued or running by a stopped process, as many
+        as max_queued leaves room for; the rest wait for a later call. Returns the count."""
+        with self._lock:
+            room = self.max_queued - self._in_flight
+            if room <= 0:
+                return 0
+            self._in_flight += room   # reserved while claiming, so submit() can't overfill the queue
+        jobs = []
+        try:
+            jobs = database.claim_unfinished_jobs(self.owner, room)
+        finally:
+            with self._lock:
+                self._in_flight -= room - len(jobs)
+        for job in jobs:
+            self._executor.submit(self._run, job["id"], job["input_text"])
+        if jobs:
+            print(f"[Jobs] Resumed {len(jobs)} unfinished job(s)")
+        return len(jobs)
+
+    def _keep_leases(self):
+        while not self._stopped.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                if self._in_flight:
+                    database.renew_job_leases(self.owner)
+                self.resume_unfinished()
+            except Exception as e:
+                print(f"[Jobs] Lease check failed: {e}")
+
+    def _run(self, job_id, input_text):
+        stage = None
+
+        def on_stage(name):
+            nonlocal stage
+            stage = name
+            database.update_job(job_id, "running", name)
+
+        try:
+            self.orchestrator.run(input_text, on_stage=on_stage, request_id=job_id)
+        except Exception as e:
+            print(f"[Jobs] Job {job_id} failed: {e}")
+            database.update_job(job_id, "failed", stage, str(e))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def shutdown(self, wait=True):
+        self._stopped.set()
+        self._executor.shutdown(wait=wait)
+
+
+def describe_job(job):
+    """Progress view of a job row from database.get_job()."""
+    state = job["job_state"] or "done"
+    current = job["job_stage"]
+
+    stages = {}
+    for name in STAGES:
+        if state == "done":
+            stages[name] = "done"
+        elif current is None:
+            stages[name] = "pending"
+        elif STAGES.index(name) < STAGES.index(current):
+            stages[name] = "done"
+        elif name == current:
+            stages[name] = "failed" if state == "failed" else "running"
+        else:
+            stages[name] = "pending"
+
+    return {
+        "job_id": job["id"],
+        "submitted_at": job["timestamp"],
+        "state": state,
+        "stage": current,
+        "stages": stages,
+        "error": job["job_error"]
+    }
+
+
+def job_result(job):
+    """The same payload a synchronous /api/process-rfp call returns."""
+    final = job["final_response"]
+    return {
+        "status": "complete",
+        "workflow": {
+            "sales": job["sales_data"],
+            "technical": job["tech_data"],
+            "pricing": job["pricing_data"],
+            "master": final
+        },
+        "final_document": final["final_response"]["final_document_text"]
+    }
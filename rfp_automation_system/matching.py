@@ -0,0 +1,161 @@
+"""SKU matching index for the TechnicalAgent.
+
+Names and categories are lower-cased once when a SKU enters the index, and
+trigram postings narrow each lookup to the SKUs that can actually score, so
+matching an item no longer scans the whole catalog. Scoring is unchanged:
++50 when the SKU name and item name contain one another, +30 when the SKU
+category appears in the item name, ties resolved in catalog order.
+"""
+import threading
+
+import database
+
+NGRAM = 3
+
+NAME_SCORE = 50
+CATEGORY_SCORE = 30
+
+
+def _grams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _substrings(text):
+    subs = {""}
+    for i in range(len(text)):
+        for j in range(i + 1, len(text) + 1):
+            subs.add(text[i:j])
+    return subs
+
+
+class InventoryIndex:
+    def __init__(self, inventory=(), version=None):
+        self.version = version  # catalog version the index reflects
+        self.skus = []        # SKU rows in catalog order
+        self._names = []      # lower-cased names, same positions as self.skus
+        self._categories = []  # lower-cased categories, same positions
+        self._by_name = {}    # lower-cased name -> positions
+        self._by_category = {}  # lower-cased category -> positions
+        self._postings = {}   # name trigram -> positions (ascending)
+        for sku in inventory:
+            self.add(sku)
+
+    def __len__(self):
+        return len(self.skus)
+
+    def add(self, sku):
+        """Appends a SKU; positions only grow, so catalog order is kept."""
+        pos = len(self.skus)
+        name = sku["name"].lower()
+        category = sku["category"].lower()
+
+        self.skus.append(sku)
+        self._names.append(name)
+        self._categories.append(category)
+        self._by_name.setdefault(name, []).append(pos)
+        self._by_category.setdefault(category, []).append(pos)
+        for gram in _grams(name):
+            self._postings.setdefault(gram, []).append(pos)
+
+    def with_sku(self, sku, version):
+        """Returns a new index with sku appended. This one is left unchanged, so a
+        run holding it (and the catalog snapshot it came with) stays consistent."""
+        index = InventoryIndex(version=version)
+        index.skus = self.skus[:]
+        index._names = self._names[:]
+        index._categories = self._categories[:]
+        index._by_name = dict(self._by_name)
+        index._by_category = dict(self._by_category)
+        index._postings = dict(self._postings)
+
+        # Only the position lists add() appends to are copied; the rest stay shared
+        name = sku["name"].lower()
+        category = sku["category"].lower()
+        for table, key in ((index._by_name, name), (index._by_category, category)):
+            if key in table:
+                table[key] = table[key][:]
+        for gram in _grams(name):
+            if gram in index._postings:
+                index._postings[gram] = index._postings[gram][:]
+        index.add(sku)
+        return index
+
+    def _containing(self, item_name):
+        """Positions of SKUs whose name contains item_name."""
+        names = self._names
+        if len(item_name) < NGRAM:
+            return [pos for pos, name in enumerate(names) if item_name in name]
+
+        # Verify against the rarest trigram of the item name
+        shortest = None
+        for gram in _grams(item_name):
+            postings = self._postings.get(gram)
+            if not postings:
+                return []
+            if shortest is None or len(postings) < len(shortest):
+                shortest = postings
+        return [pos for pos in shortest if item_name in names[pos]]
+
+    def best_match(self, item_name):
+        """Returns (sku, score) for the best match, or (None, 0)."""
+        item_name = item_name.lower()
+        subs = _substrings(item_name)
+
+        # Categories appearing in the item name; each SKU has exactly one
+        categories = {sub for sub in subs if sub in self._by_category}
+
+        name_hits = set(self._containing(item_name))
+        for sub in subs:
+            name_hits.update(self._by_name.get(sub, ()))
+
+        if name_hits:
+            both = [pos for pos in name_hits if self._categories[pos] in categories]
+            if both:
+                best = min(both)
+                return self.skus[best], NAME_SCORE + CATEGORY_SCORE
+            best = min(name_hits)
+            return self.skus[best], NAME_SCORE
+
+        if categories:
+            best = min(self._by_category[category][0] for category in categories)
+            return self.skus[best], CATEGORY_SCORE
+
+        return None, 0
+
+
+# --- Shared Index ---
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Returns the shared index, rebuilding it if the catalog version moved on."""
+    index = _index
+    if index is not None and index.version == database.get_catalog_version():
+        return index
+    return rebuild_index()
+
+
+def rebuild_index():
+    global _index
+    with _index_lock:
+        catalog = database.get_catalog()
+        if _index is None or _index.version != catalog.version:
+            _index = InventoryIndex(catalog.inventory, catalog.version)
+        return _index
+
+
+def _on_catalog_change(version, product):
+    # A single inserted SKU gets a patched copy of the index (runs may still hold
+    # the old one); anything else rebuilds on next use.
+    # Returns before taking the lock otherwise: changes seen while polling the stored
+    # version arrive from inside rebuild_index, which already holds it.
+    global _index
+    if product is None:
+        return
+    with _index_lock:
+        if _index is not None and _index.version == version - 1:
+            _index = _index.with_sku(product, version)
+
+
+database.register_catalog_listener(_on_catalog_change)
@@ -0,0 +1,215 @@
+"""Low-overhead pipeline metrics: stage latency histograms and counters.
+
+Every thread records into its own shard, so recording never takes a lock:
+it is a dict lookup and a few integer/float additions, all done by the only
+thread that writes that shard. A lock is taken once per thread (to register
+the shard), when a thread exits (its shard is folded into the retired
+totals), and by render(), which sums all shards for /metrics. A forked
+worker calls reset() so the master's shards are not counted again.
+
+stage(name) also adds the elapsed time to the current run's timings when a
+collect_timings() block is active (a ContextVar, so concurrent requests
+don't mix), which is how /api/process-rfp can return a `timings` block.
+"""
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# --- Metric Definitions ---
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HISTOGRAMS = {
+    "rfp_stage_duration_seconds": ("Time spent in each pipeline stage.", "stage"),
+}
+COUNTERS = {
+    "rfp_runs_total": ("Orchestrator runs started.", None),
+    "rfp_errors_total": ("Errors raised or caught, by stage.", "stage"),
+    "rfp_page_cache_hits_total": ("Tender pages served from the page cache (fresh or 304).", None),
+    "rfp_page_fetches_total": ("Tender page downloads (cache misses).", None),
+    "rfp_fetched_bytes_total": ("Tender page bytes downloaded.", None),
+    "rfp_artifacts_dropped_total": ("Run artifacts dropped because the writer queue was full.", None),
+    "rfp_result_cache_hits_total": ("Runs answered from the result cache, by tier.", "tier"),
+    "rfp_result_cache_misses_total": ("Result cache lookups that ran the agents.", None),
+    "rfp_attachments_total": ("Tender attachments read, by outcome (extracted, cached, failed).", "outcome"),
+}
+
+_timings = ContextVar("rfp_timings", default=None)
+
+
+class _Shard:
+    __slots__ = ("histograms", "counters")
+
+    def __init__(self):
+        self.histograms = {}   # (metric, label) -> [bucket counts (+Inf last), sum]
+        self.counters = {}     # (metric, label) -> value
+
+
+class _ShardOwner:
+    # Lives in the thread's local storage; collected when the thread exits
+    __slots__ = ("__weakref__",)
+
+
+_local = threading.local()
+_live = {}
+_retired = _Shard()
+_registry_lock = threading.Lock()
+
+
+def _shard():
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _Shard()
+        owner = _ShardOwner()
+        with _registry_lock:
+            _live[id(shard)] = shard
+        weakref.finalize(owner, _retire, shard)
+        _local.shard, _local.owner = shard, owner
+    return shard
+
+
+def _retire(shard):
+    with _registry_lock:
+        # A shard dropped by reset() is not folded back in
+        if _live.pop(id(shard), None) is shard:
+            _merge(_retired, shard)
+
+
+def reset():
+    """Drops everything recorded so far in this process.
+
+    Called in each freshly forked server worker: shards inherited from the
+    master would otherwise be reported again by every worker.
+    """
+    global _local, _live, _retired, _registry_lock
+    # The lock is replaced too: another master thread may have held it at the fork
+    _local = threading.local()
+    _live = {}
+    _retired = _Shard()
+    _registry_lock = threading.Lock()
+
+
+def _merge(into, shard):
+    for key, (counts, total) in list(shard.histograms.items()):
+        target = into.histograms.get(key)
+        if target is None:
+            into.histograms[key] = [list(counts), total]
+        else:
+            target[0] = [a + b for a, b in zip(target[0], counts)]
+            target[1] += total
+    for key, value in list(shard.counters.items()):
+        into.counters[key] = into.counters.get(key, 0) + value
+
+
+# --- Recording ---
+
+def observe(metric, seconds, label=None):
+    histograms = _shard().histograms
+    entry = histograms.get((metric, label))
+    if entry is None:
+        entry = histograms[(metric, label)] = [[0] * (len(STAGE_BUCKETS) + 1), 0.0]
+    entry[0][bisect_left(STAGE_BUCKETS, seconds)] += 1
+    entry[1] += seconds
+
+
+def inc(metric, amount=1, label=None):
+    counters = _shard().counters
+    key = (metric, label)
+    counters[key] = counters.get(key, 0) + amount
+
+
+def record(name, seconds):
+    """Records a stage duration measured by the caller."""
+    observe("rfp_stage_duration_seconds", seconds, name)
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name):
+    """Times the block (or, as a decorator, each call) as stage `name`.
+
+    Exceptions are counted in rfp_errors_total and re-raised.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        inc("rfp_errors_total", label=name)
+        raise
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+@contextmanager
+def collect_timings():
+    """Collects this context's stage timings into the yielded dict (seconds, summed per stage)."""
+    timings = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def timings_ms(timings):
+    return {name: round(seconds * 1000, 3) for name, seconds in timings.items()}
+
+
+# --- Exposition ---
+
+def snapshot():
+    """Totals over all shards: (histograms, counters), keyed by (metric, label)."""
+    total = _Shard()
+    with _registry_lock:
+        _merge(total, _retired)
+        for shard in list(_live.values()):
+            _merge(total, shard)
+    return total.histograms, total.counters
+
+
+def _labels(label_name, label, extra=""):
+    parts = []
+    if label_name is not None and label is not None:
+        parts.append(f'{label_name}="{_escape(label)}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    histograms, counters = snapshot()
+    lines = []
+
+    for metric, (help_text, label_name) in HISTOGRAMS.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for (name, label), (counts, total) in sorted(histograms.items(), key=lambda item: str(item[0])):
+            if name != metric:
+                continue
+            cumulative = 0
+            for bound, count in zip(STAGE_BUCKETS + ("+Inf",), counts):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{metric}_bucket{_labels(label_name, label, le)} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(label_name, label)} {total}")
+            lines.append(f"{metric}_count{_labels(label_name, label)} {cumulative}")
+
+    for metric, (help_text, label_name) in COUNTERS.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        values = {label: value for (name, label), value in counters.items() if name == metric}
+        if not values and label_name is None:
+            values = {None: 0}
+        for label, value in sorted(values.items(), key=lambda item: str(item[0])):
+            lines.append(f"{metric}{_labels(label_name, label)} {value}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,147 @@
+"""Columnar pricing engine for the PricingAgent.
+
+A bill of materials is held as parallel arrays (base cost, quantity, whether
+the SKU takes the software margin), and every pricing step is one array
+operation. The same BOM can be priced against many rule sets at once:
+results then have one row per rule set.
+
+The arithmetic follows PricingAgent's original per-line formula, step by step
+and in the same order, and totals are summed sequentially. Rounded strings are
+therefore identical to the loop version. NumPy is optional; without it the
+engine falls back to plain Python loops. It is imported when the first BOM
+is built, not with this module, to keep start-up fast.
+"""
+from records import PriceLine
+
+SOFTWARE_CATEGORY = "Software"
+
+np = None
+_numpy_checked = False
+
+
+def _numpy():
+    """The numpy module (imported on first call), or None when it is not installed."""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - exercised only where NumPy is missing
+            numpy = None
+        np, _numpy_checked = numpy, True
+    return np
+
+
+class PricingColumns:
+    """Results for one rule set (lists when NumPy is unavailable).
+
+    unit_cost, profit_margin, tax and final_unit_price have one entry per
+    distinct SKU (see BillOfMaterials.positions); line_total has one per line.
+    """
+
+    def __init__(self, unit_cost, profit_margin, tax, final_unit_price, line_total, total_cost):
+        self.unit_cost = unit_cost
+        self.profit_margin = profit_margin
+        self.tax = tax
+        self.final_unit_price = final_unit_price
+        self.line_total = line_total
+        self.total_cost = total_cost
+
+
+class BillOfMaterials:
+    def __init__(self, skus, quantities, inventory):
+        """skus/quantities are parallel sequences; inventory maps SKU -> row.
+
+        Everything but the line total depends only on the SKU, so per-unit
+        values are computed (and formatted) once per distinct SKU and
+        gathered back to lines through self.positions.
+        """
+        self.skus = list(skus)
+        self.quantities = list(quantities)
+        codes = {}
+        self.positions = [codes.setdefault(sku, len(codes)) for sku in self.skus]
+        rows = [inventory[sku] for sku in codes]
+        base_costs = [row["base_cost"] for row in rows]
+        software = [row["category"] == SOFTWARE_CATEGORY for row in rows]
+        self._unit_cost_values = None
+
+        if _numpy() is not None:
+            self._base = np.asarray(base_costs, dtype=np.float64)
+            self._qty = np.asarray(self.quantities, dtype=np.float64)
+            self._software = np.asarray(software, dtype=bool)
+            self._gather = np.asarray(self.positions, dtype=np.intp)
+        else:
+            self._base = base_costs
+            self._qty = self.quantities
+            self._software = software
+
+    def __len__(self):
+        return len(self.skus)
+
+    def price(self, rules):
+        return self.price_many([rules])[0]
+
+    def price_many(self, rule_sets):
+        """Prices the BOM against every rule set in one batched computation."""
+        if _numpy() is None:
+            return [self._price_loop(rules) for rules in rule_sets]
+
+        standard = np.array([r["standard_margin_percent"] for r in rule_sets], dtype=np.float64)[:, None]
+        software = np.array([r["software_margin_percent"] for r in rule_sets], dtype=np.float64)[:, None]
+        tax_rate = np.array([r["tax_rate_percent"] for r in rule_sets], dtype=np.float64)[:, None]
+
+        margin_percent = np.where(self._software[None, :], software, standard)
+        unit_cost = self._base
+        profit_margin = unit_cost * (margin_percent / 100)
+        final_unit_price = unit_cost + profit_margin
+        tax = final_unit_price * (tax_rate / 100)
+        final_price_inc_tax = final_unit_price + tax
+        line_total = final_price_inc_tax[:, self._gather] * self._qty
+
+        # Sequential running sum, as the original `total_cost += line_total`
+        if len(self):
+            totals = np.add.accumulate(line_total, axis=1)[:, -1]
+        else:
+            totals = np.zeros(len(rule_sets))
+
+        return [
+            PricingColumns(unit_cost, profit_margin[i], tax[i], final_price_inc_tax[i], line_total[i], float(totals[i]))
+            for i in range(len(rule_sets))
+        ]
+
+    def _price_loop(self, rules):
+        profit_margin, tax, final_prices = [], [], []
+        for base_cost, is_software in zip(self._base, self._software):
+            margin_percent = rules["software_margin_percent"] if is_software else rules["standard_margin_percent"]
+            margin = base_cost * (margin_percent / 100)
+            final_unit_price = base_cost + margin
+            line_tax = final_unit_price * (rules["tax_rate_percent"] / 100)
+            profit_margin.append(margin)
+            tax.append(line_tax)
+            final_prices.append(final_unit_price + line_tax)
+
+        line_totals = []
+        total_cost = 0.0
+        for position, qty in zip(self.positions, self._qty):
+            line_total = final_prices[position] * qty
+            total_cost += line_total
+            line_totals.append(line_total)
+        return PricingColumns(self._base, profit_margin, tax, final_prices, line_totals, total_cost)
+
+    def breakdown(self, columns):
+        """The PricingAgent breakdown rows for one result (records.PriceLine, shown as two-decimal strings)."""
+        if self._unit_cost_values is None:
+            self._unit_cost_values = _values(columns.unit_cost)
+        unit_cost = self._unit_cost_values
+        profit_margin = _values(columns.profit_margin)
+        tax = _values(columns.tax)
+        final_unit_price = _values(columns.final_unit_price)
+        return [
+            PriceLine(sku, unit_cost[i], profit_margin[i], tax[i], final_unit_price[i], qty, line_total)
+            for sku, qty, i, line_total
+            in zip(self.skus, self.quantities, self.positions, _values(columns.line_total))
+        ]
+
+
+def _values(column):
+    # Python floats, so rows hold no NumPy scalars
+    return column.tolist() if hasattr(column, "tolist") else column
@@ -0,0 +1,241 @@
+"""Typed records for the rows the agents pass along, and the one JSON encoder.
+
+RfpMetadata, LineItem, SkuMatch and PriceLine are classes with __slots__ that
+keep numbers as numbers (match percent as an int, prices as floats). Each is
+also a read-only Mapping whose keys and values are the original JSON shape:
+"90%" for a match, "%.2f" strings for money. Code that indexes rows like
+dicts works unchanged, on records and on payloads loaded back from SQLite
+alike, and a record compares equal to its compat dict.
+
+Formatting happens only when a record is serialized. dumps() is the single
+encoder for every destination (SQLite, artifacts, HTTP responses): orjson
+when it is installed, the json module otherwise, with records written as
+their compat view, or with typed=True as their typed view (numbers as JSON
+numbers, an unmatched SKU as null).
+"""
+import json
+from collections.abc import Mapping
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+NOT_AVAILABLE = "Not available"
+
+
+class _Record(Mapping):
+    # Mapping compares by items, so a record equals its compat dict
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class RfpMetadata(_Record):
+    __slots__ = ("contract_id", "title", "authority", "category", "bid_start", "bid_end", "description")
+
+    def __init__(self, contract_id=NOT_AVAILABLE, title=NOT_AVAILABLE, authority=NOT_AVAILABLE,
+                 category=NOT_AVAILABLE, bid_start=NOT_AVAILABLE, bid_end=NOT_AVAILABLE, description=None):
+        self.contract_id = contract_id
+        self.title = title
+        self.authority = authority
+        self.category = category
+        self.bid_start = bid_start
+        self.bid_end = bid_end
+        self.description = description   # pasted tender text; only present for text input
+
+    def compat(self):
+        view = {"contract_id": self.contract_id, "title": self.title, "authority": self.authority,
+                "category": self.category, "bid_dates": {"start": self.bid_start, "end": self.bid_end}}
+        if self.description is not None:
+            view["description"] = self.description
+        return view
+
+    typed = compat   # no numeric fields
+
+    def __getitem__(self, key):
+        if key == "bid_dates":
+            return {"start": self.bid_start, "end": self.bid_end}
+        if key in ("contract_id", "title", "authority", "category") or (key == "description" and self.description is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from ("contract_id", "title", "authority", "category", "bid_dates")
+        if self.description is not None:
+            yield "description"
+
+    def __len__(self):
+        return 5 if self.description is None else 6
+
+
+class LineItem(_Record):
+    """A product the SalesAgent found in the tender text."""
+    __slots__ = ("name", "quantity")
+
+    def __init__(self, name, quantity):
+        self.name = name
+        self.quantity = quantity
+
+    def compat(self):
+        return {"name": self.name, "quantity": self.quantity, "description": f"Detected {self.name} in text"}
+
+    def typed(self):
+        return {"name": self.name, "quantity": self.quantity}
+
+    def __getitem__(self, key):
+        if key == "name":
+            return self.name
+        if key == "quantity":
+            return self.quantity
+        if key == "description":
+            return f"Detected {self.name} in text"
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(("name", "quantity", "description"))
+
+    def __len__(self):
+        return 3
+
+
+class SkuMatch(_Record):
+    """The TechnicalAgent's match for one item; sku is None when nothing matched."""
+    __slots__ = ("item", "sku", "sku_name", "match_percent", "quantity")
+
+    def __init__(self, item, sku=None, sku_name=None, match_percent=0, quantity=None):
+        self.item = item
+        self.sku = sku
+        self.sku_name = sku_name
+        self.match_percent = match_percent
+        self.quantity = quantity
+
+    def compat(self):
+        if self.sku is None:
+            return {"item": self.item, "matched_sku": NOT_AVAILABLE, "match_percent": "0%"}
+        return {"item": self.item, "matched_sku": self.sku, "sku_name": self.sku_name,
+                "match_percent": f"{self.match_percent}%", "quantity": self.quantity}
+
+    def typed(self):
+        return {"item": self.item, "sku": self.sku, "sku_name": self.sku_name,
+                "match_percent": self.match_percent, "quantity": self.quantity}
+
+    def __getitem__(self, key):
+        if key == "item":
+            return self.item
+        if key == "matched_sku":
+            return NOT_AVAILABLE if self.sku is None else self.sku
+        if key == "match_percent":
+            return f"{self.match_percent}%"
+        if self.sku is not None:
+            if key == "sku_name":
+                return self.sku_name
+            if key == "quantity":
+                return self.quantity
+        raise KeyError(key)
+
+    def __iter__(self):
+        if self.sku is None:
+            return iter(("item", "matched_sku", "match_percent"))
+        return iter(("item", "matched_sku", "sku_name", "match_percent", "quantity"))
+
+    def __len__(self):
+        return 3 if self.sku is None else 5
+
+
+_MONEY = frozenset(("unit_cost", "profit_margin", "tax", "final_unit_price", "line_total"))
+
+
+class PriceLine(_Record):
+    """One PricingAgent breakdown row; money fields are floats, shown with two decimals."""
+    __slots__ = ("sku", "unit_cost", "profit_margin", "tax", "final_unit_price", "quantity", "line_total")
+
+    def __init__(self, sku, unit_cost, profit_margin, tax, final_unit_price, quantity, line_total):
+        self.sku = sku
+        self.unit_cost = unit_cost
+        self.profit_margin = profit_margin
+        self.tax = tax
+        self.final_unit_price = final_unit_price
+        self.quantity = quantity
+        self.line_total = line_total
+
+    def compat(self):
+        return {"sku": self.sku, "unit_cost": "%.2f" % self.unit_cost, "profit_margin": "%.2f" % self.profit_margin,
+                "tax": "%.2f" % self.tax, "final_unit_price": "%.2f" % self.final_unit_price,
+                "quantity": self.quantity, "line_total": "%.2f" % self.line_total}
+
+    def typed(self):
+        return {"sku": self.sku, "unit_cost": self.unit_cost, "profit_margin": self.profit_margin, "tax": self.tax,
+                "final_unit_price": self.final_unit_price, "quantity": self.quantity, "line_total": self.line_total}
+
+    def __getitem__(self, key):
+        if key in _MONEY:
+            return "%.2f" % getattr(self, key)
+        if key == "sku":
+            return self.sku
+        if key == "quantity":
+            return self.quantity
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(("sku", "unit_cost", "profit_margin", "tax", "final_unit_price", "quantity", "line_total"))
+
+    def __len__(self):
+        return 7
+
+
+RECORD_TYPES = (RfpMetadata, LineItem, SkuMatch, PriceLine)
+
+
+def compat(value):
+    """The original JSON shape of a value, with every record replaced by its compat dict (a deep copy)."""
+    if isinstance(value, RECORD_TYPES):
+        return {key: compat(item) for key, item in value.compat().items()}
+    if isinstance(value, dict):
+        return {key: compat(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [compat(item) for item in value]
+    return value
+
+
+def typed(value):
+    """Like compat(), with every record replaced by its typed dict instead."""
+    if isinstance(value, RECORD_TYPES):
+        return {key: typed(item) for key, item in value.typed().items()}
+    if isinstance(value, dict):
+        return {key: typed(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [typed(item) for item in value]
+    return value
+
+
+def _raise(value):
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value, indent=False, sort_keys=False, default=_raise, typed=False):
+    """UTF-8 JSON bytes for value (compact unless indent); records are written as their
+    compat view, or their typed view when typed is set.
+
+    default(obj) handles any other type the json module can't encode (dates
+    included, so both encoders treat them alike).
+    """
+    def encode_other(obj):
+        if isinstance(obj, RECORD_TYPES):
+            return obj.typed() if typed else obj.compat()
+        return default(obj)
+
+    if orjson is not None:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(value, default=encode_other, option=option)
+        except orjson.JSONEncodeError:
+            pass   # e.g. an integer beyond 64 bits (a long digit run read as a quantity)
+    return json.dumps(value, default=encode_other, ensure_ascii=False, sort_keys=sort_keys,
+                      indent=2 if indent else None, separators=None if indent else (",", ":")).encode("utf-8")
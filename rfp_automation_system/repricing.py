@@ -0,0 +1,141 @@
+"""Re-prices stored Pending proposals after a pricing-rule or catalog change.
+
+Only PricingAgent and MasterAgent run again, on each request's stored
+sales_data and tech_data, so no tender site is contacted. Pending ids are
+read in chunks; a thread pool loads, prices, renders and encodes the chunks,
+and the calling thread commits them in id order, one transaction per chunk
+that also advances the run's checkpoint (rfp_reprice_runs.last_id).
+
+An interrupted run is resumed from its checkpoint by the next call, as long
+as the catalog fingerprint (inventory and pricing rules) is unchanged;
+otherwise it is superseded and a new run starts from the first Pending row.
+
+A run is leased in the database to the process running it (host/pid) and
+the lease is renewed at every checkpoint, so another server worker or a
+`cli.py reprice` started meanwhile refuses to run instead of resuming the
+same run. A crashed process's run is taken over once its lease expires
+(database.REPRICE_LEASE_SECONDS).
+"""
+import os
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+import metrics
+import result_cache
+from rfp_system import MasterAgent, PricingAgent
+
+# --- Re-pricing Settings ---
+CHUNK_SIZE = 500          # requests per worker task and per write transaction
+WORKERS = 4
+PRICING_RULE_KEYS = ("standard_margin_percent", "software_margin_percent", "tax_rate_percent")
+
+_running = threading.Lock()
+
+
+def _owner():
+    return f"{socket.gethostname()}/{os.getpid()}"
+
+
+def _price_chunk(ids, catalog):
+    pricing, master = PricingAgent(), MasterAgent()
+    updates = []
+    for request_id, sales, tech in database.load_pricing_inputs(ids):
+        if not sales or not tech:
+            continue
+        # process_scenarios is PricingAgent.process without its per-call log line
+        priced = pricing.process_scenarios(tech, None, catalog)[0]
+        final = master.process(sales, tech, priced)
+        updates.append((request_id,) + database.encode_pricing_update(sales, tech, priced, final))
+    return updates
+
+
+def reprice_pending(chunk_size=CHUNK_SIZE, workers=WORKERS, restart=False):
+    """Re-prices every Pending proposal against the current catalog; returns the finished run dict.
+
+    Raises RuntimeError (database.RepriceBusyError when it is another
+    process) if a re-pricing run is already active.
+    """
+    if not _running.acquire(blocking=False):
+        raise RuntimeError("A re-pricing run is already in progress")
+    try:
+        catalog = database.get_catalog()
+        owner = _owner()
+        run = database.start_reprice_run(result_cache.catalog_fingerprint(catalog), owner, restart)
+        resumed = " (resumed at id %d)" % run['last_id'] if run['last_id'] else ""
+        print(f"[Reprice] Run {run['id']}: {run['total']} Pending proposal(s) up to id {run['max_id']}{resumed}")
+
+        start = time.perf_counter()
+        repriced = run['repriced']
+        try:
+            with metrics.stage("reprice"), ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rfp-reprice") as pool:
+                # Workers run ahead by at most two chunks each; commits happen in id order
+                in_flight = deque()
+                after_id = run['last_id']
+                while True:
+                    while len(in_flight) < workers * 2:
+                        ids = database.get_pending_ids(after_id, run['max_id'], chunk_size)
+                        if not ids:
+                            break
+                        after_id = ids[-1]
+                        in_flight.append((ids[-1], pool.submit(_price_chunk, ids, catalog)))
+                    if not in_flight:
+                        break
+                    last_id, future = in_flight.popleft()
+                    repriced += database.save_repriced(run['id'], owner, future.result(), last_id)
+                    print(f"[Reprice] {repriced}/{run['total']} re-priced (checkpoint id {last_id})")
+        except BaseException as e:
+            database.finish_reprice_run(run['id'], owner, 'failed', str(e) or type(e).__name__)
+            raise
+
+        database.finish_reprice_run(run['id'], owner, 'done')
+        # The replaced pricing/final payloads are now garbage, unless shared with another row
+        collected = database.collect_payload_garbage()
+        print(f"[Reprice] Run {run['id']} complete: {repriced} proposal(s) in {time.perf_counter() - start:.1f}s, "
+              f"{collected} stale payload(s) deleted")
+        return database.get_reprice_run(run['id'])
+    finally:
+        _running.release()
+
+
+def validate_rules(rules):
+    """Returns (rules with float values, None) or (None, error message). Only known rule keys are accepted."""
+    if not isinstance(rules, dict) or not rules:
+        return None, "Provide at least one pricing rule"
+    known = set(PRICING_RULE_KEYS) | set(database.get_pricing_rules())
+    clean = {}
+    for key, value in rules.items():
+        if key not in known:
+            return None, f"Unknown pricing rule: {key}"
+        try:
+            clean[key] = float(value)
+        except (TypeError, ValueError):
+            return None, f"{key} must be a number"
+        if clean[key] < 0:
+            return None, f"{key} must not be negative"
+    return clean, None
+
+
+def is_running():
+    """True while a run is active in this or any other process."""
+    return _running.locked() or database.reprice_run_active(database.get_reprice_run())
+
+
+def start_background(**kwargs):
+    """Runs reprice_pending on a daemon thread; False if a run is already active."""
+    if is_running():
+        return False
+
+    def work():
+        try:
+            reprice_pending(**kwargs)
+        except RuntimeError as e:
+            print(f"[Reprice] {e}")
+        except Exception as e:
+            print(f"[Reprice] Failed: {e}")
+
+    threading.Thread(target=work, name="rfp-reprice-main", daemon=True).start()
+    return True
@@ -0,0 +1,146 @@
+"""Content-addressed cache of Orchestrator results.
+
+A result is keyed by SHA-256 over the normalized input, the hash of the
+tender page (or pasted text) it was built from, and a fingerprint of the
+inventory and pricing rules. A resubmitted tender whose page and catalog are
+unchanged is answered from the cache without matching or pricing again.
+
+Two tiers: a per-process LRU of result dicts (MEMORY_ENTRIES, TTL_SECONDS)
+and the rfp_result_cache table in SQLite, which outlives restarts and is
+shared by every worker process. A catalog or pricing-rule change clears the
+memory tier; SQLite entries built against another fingerprint (and expired
+ones) are purged whenever a process computes a new fingerprint.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+
+import database
+
+# --- Cache Settings ---
+ENABLED = os.environ.get("RFP_RESULT_CACHE", "1") == "1"
+TTL_SECONDS = int(os.environ.get("RFP_RESULT_CACHE_TTL", "3600"))
+MEMORY_ENTRIES = int(os.environ.get("RFP_RESULT_CACHE_ENTRIES", "256"))
+
+
+def normalize_input(input_text):
+    """URLs lose their fragment and get a lower-case scheme and host; text only loses outer whitespace."""
+    text = input_text.strip().replace("\r\n", "\n")
+    if text.startswith("http"):
+        parts = urlsplit(text)
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, ""))
+    return text
+
+
+def content_hash(content):
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def make_key(normalized_input, page_hash, fingerprint):
+    return hashlib.sha256("\0".join((normalized_input, page_hash, fingerprint.hex())).encode("utf-8")).digest()
+
+
+_fingerprint = (None, None)    # (catalog version, fingerprint)
+_fingerprint_lock = threading.Lock()
+
+
+def catalog_fingerprint(catalog):
+    """SHA-256 over the inventory and pricing rules of a CatalogSnapshot, computed once per version.
+
+    Content-based rather than the in-process catalog version, so entries stay
+    valid across restarts and between worker processes.
+    """
+    global _fingerprint
+    version, fingerprint = _fingerprint
+    if version == catalog.version:
+        return fingerprint
+
+    digest = hashlib.sha256()
+    for item in sorted(catalog.inventory, key=lambda item: item["sku"]):
+        digest.update(json.dumps([item["sku"], item["name"], item["category"], item["base_cost"],
+                                  item["description"]]).encode("utf-8"))
+    digest.update(json.dumps(sorted(catalog.pricing_rules.items())).encode("utf-8"))
+    fingerprint = digest.digest()
+
+    with _fingerprint_lock:
+        previous = _fingerprint[1]
+        _fingerprint = (catalog.version, fingerprint)
+    if previous != fingerprint:
+        get_cache().purge(fingerprint)
+    return fingerprint
+
+
+class ResultCache:
+    def __init__(self, max_entries=MEMORY_ENTRIES, ttl=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (stored at, result)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns (result, tier) with tier "memory" or "sqlite", or (None, None) on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    return entry[1], "memory"
+                del self._entries[key]
+
+        parts = database.get_cached_result(key, self.ttl)
+        if parts is None:
+            return None, None
+        result = {
+            "status": "complete",
+            "workflow": {
+                "sales": parts["sales_data"],
+                "technical": parts["tech_data"],
+                "pricing": parts["pricing_data"],
+                "master": parts["final_response"]
+            },
+            "final_document": parts["final_response"]["final_response"]["final_document_text"]
+        }
+        self.remember(key, result)
+        return result, "sqlite"
+
+    def remember(self, key, result):
+        """Adds a result to the memory tier (the SQLite tier is written with the run, see Orchestrator.run)."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def purge(self, fingerprint):
+        """Drops everything built against another catalog; returns the SQLite rows deleted."""
+        self.clear()
+        removed = database.purge_result_cache(fingerprint, self.ttl)
+        if removed:
+            print(f"[Result Cache] Catalog changed, purged {removed} cached result(s)")
+        return removed
+
+
+_cache = ResultCache()
+
+
+def get_cache():
+    return _cache
+
+
+def _on_catalog_change(version, product):
+    # Keys embed the fingerprint, so this only frees memory early; SQLite is purged lazily
+    _cache.clear()
+
+
+database.register_catalog_listener(_on_catalog_change)
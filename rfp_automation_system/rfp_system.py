@@ -1,161 +1,250 @@
-import json
 import os
 import datetime
-import requests
-from bs4 import BeautifulSoup
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from urllib.parse import urlsplit
 import re
+import artifacts
+import attachments
 import database  # Import the new database module
+import html_stream
+import http_client
+import matching
+import metrics
+import pricing_engine
+import result_cache
+from records import RfpMetadata, SkuMatch
+from extraction import KeywordExtractor
 
 # --- Configuration ---
 DATA_DIR = "data"
-OUTPUT_DIR = "outputs/test_run"
+BATCH_WORKERS = 8        # RFPs processed concurrently by Orchestrator.run_batch
+BATCH_PER_HOST = 2       # concurrent fetches against any one tender site
 
-# Ensure output directory exists
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# Streaming mode parses pages chunk by chunk instead of building a full DOM (see html_stream.py)
+STREAM_HTML = os.environ.get("RFP_STREAM_HTML", "0") == "1"
+STREAM_MAX_BYTES = int(os.environ.get("RFP_STREAM_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Rows (or document lines) per event in Orchestrator.run_stream
+STREAM_ROWS_PER_EVENT = 200
+
+# Product terms the SalesAgent looks for, compiled once into a single matcher
+KNOWN_KEYWORDS = ["Laptop", "Server", "Cable", "Software", "Office 365", "Switch", "Router"]
+KEYWORD_EXTRACTOR = KeywordExtractor(KNOWN_KEYWORDS)
 
 # --- Helper Functions ---
-def save_json(filename, data):
-    path = os.path.join(OUTPUT_DIR, filename)
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"Saved: {path}")
+class HostLimiter:
+    """Caps concurrent requests per host so a batch doesn't hammer one portal."""
+
+    def __init__(self, per_host=BATCH_PER_HOST):
+        self.per_host = per_host
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def slot(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._slots[host]
 
 # --- Agents ---
 
 class SalesAgent:
-    def process(self, url):
+    def __init__(self, limiter=None, stream=None, max_bytes=STREAM_MAX_BYTES):
+        self.limiter = limiter
+        self.stream = STREAM_HTML if stream is None else stream
+        self.max_bytes = max_bytes
+
+    def fetch(self, url):
+        # Pooled keep-alive session plus conditional-GET disk cache (see http_client.py)
+        with self.limiter.slot(url) if self.limiter else nullcontext():
+            with metrics.stage("fetch"):
+                page = http_client.fetch(url, timeout=10, verify=False)
+        self._count_page(page.from_cache, len(page.content))
+        if page.from_cache:
+            print(f"[Sales Agent] Served from page cache: {url}")
+        return page.content
+
+    def _count_page(self, from_cache, size):
+        if from_cache:
+            metrics.inc("rfp_page_cache_hits_total")
+        else:
+            metrics.inc("rfp_page_fetches_total")
+            metrics.inc("rfp_fetched_bytes_total", size)
+
+    def _process_stream(self, url, data, page=None):
+        # Text windows go straight to the heuristics; neither the page nor a DOM is held.
+        # page is an http_client.SpooledPage already downloaded by page_hash (closed here).
+        links = attachments.LinkCollector(url)
+        if page is not None:
+            try:
+                with metrics.stage("stream"):
+                    title, analyzer = html_stream.analyze_stream(
+                        page, KEYWORD_EXTRACTOR, lambda: page.content_type,
+                        on_link=links if attachments.ENABLED else None
+                    )
+            finally:
+                page.close()
+        else:
+            page = http_client.PageStream(url, max_bytes=self.max_bytes, timeout=10, verify=False)
+            with self.limiter.slot(url) if self.limiter else nullcontext():
+                # Fetching, parsing and extraction are interleaved, so they are timed as one stage
+                with metrics.stage("stream"):
+                    title, analyzer = html_stream.analyze_stream(
+                        page, KEYWORD_EXTRACTOR, lambda: page.content_type,
+                        on_link=links if attachments.ENABLED else None
+                    )
+            self._count_page(page.from_cache, page.bytes_read)
+
+        if title is not None:
+            data["rfp_metadata"].title = title
+        analyzer.apply(data, KEYWORD_EXTRACTOR)
+        self._read_attachments(links.urls, data, analyzer.keywords)
+        if page.truncated:
+            print(f"[Sales Agent] Page truncated at {self.max_bytes} bytes: {url}")
+            data["truncated"] = True
+
+    def _read_attachments(self, urls, data, scanner):
+        """Fills data["documents"]; attachment text goes through the page's keyword scanner, after the page."""
+        if not urls:
+            return
+        print(f"[Sales Agent] Reading {len(urls)} attachment(s)")
+        for document, text in attachments.ingest(urls):
+            data["documents"].append(document)
+            if text:
+                scanner.feed(text, 0, len(text))
+        data["items"] = KEYWORD_EXTRACTOR.items(scanner.result())
+
+    def page_hash(self, url):
+        """(SHA-256 of the page body, the downloaded page) for process(url, page).
+
+        The page is the html in DOM mode, or an http_client.SpooledPage in
+        streaming mode, so the body is downloaded once either way. The hash is
+        None when a streamed page could not be kept in the page cache (cut
+        off at max_bytes, or sent with no-store); the result is then not
+        cached either.
+        """
+        if not self.stream:
+            html = self.fetch(url)
+            return result_cache.content_hash(html), html
+        stream = http_client.PageStream(url, max_bytes=self.max_bytes, timeout=10, verify=False)
+        with self.limiter.slot(url) if self.limiter else nullcontext():
+            with metrics.stage("fetch"):
+                page = http_client.SpooledPage(stream)
+        self._count_page(page.from_cache, page.bytes_read)
+        if page.truncated or not (page.from_cache or page.stored):
+            return None, page
+        return page.sha256, page
+
+    @metrics.stage("sales")
+    def process(self, url, page=None, fetch_error=None):
+        """page is the body already downloaded by page_hash(); fetch_error is the
+        exception page_hash() raised, reported as this run's error without fetching again."""
         print(f"[Sales Agent] Fetching URL: {url}")
         
+        metadata = RfpMetadata()
         data = {
-            "rfp_metadata": {
-                "contract_id": "Not available",
-                "title": "Not available",
-                "authority": "Not available",
-                "category": "Not available",
-                "bid_dates": {
-                    "start": "Not available",
-                    "end": "Not available"
-                }
-            },
+            "rfp_metadata": metadata,
             "items": [],
             "financials": {},
             "delivery_terms": "Not available",
             "documents": []
         }
 
+        links = attachments.LinkCollector(url)
         try:
+            if fetch_error is not None:
+                raise fetch_error
+
             # Real Scraping Logic
+            if url.startswith("http") and self.stream:
+                self._process_stream(url, data, page)
+                return data
+
             if url.startswith("http"):
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                response = requests.get(url, headers=headers, timeout=10, verify=False)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
+                html = page if page is not None else self.fetch(url)
+                from bs4 import BeautifulSoup  # imported on first use, not at start-up
+
+                parse_start = time.perf_counter()
+                soup = BeautifulSoup(html, 'html.parser')
                 
                 # Extract Title
                 title_tag = soup.find('title') or soup.find('h1')
                 if title_tag:
-                    data["rfp_metadata"]["title"] = title_tag.get_text(strip=True)
+                    metadata.title = title_tag.get_text(strip=True)
                 
                 # Extract Text for analysis
                 text_content = soup.get_text(separator=' ', strip=True)
+                if attachments.ENABLED:
+                    for link in soup.find_all('a', href=True):
+                        links(link['href'])
                 
                 # Heuristics for Contract ID
                 id_match = re.search(r'(Tender No|Contract ID|Ref No)[:\s]+([A-Za-z0-9\-/]+)', text_content, re.IGNORECASE)
                 if id_match:
-                    data["rfp_metadata"]["contract_id"] = id_match.group(2)
+                    metadata.contract_id = id_match.group(2)
                 
                 # Heuristics for Dates
                 date_matches = re.findall(r'\d{4}-\d{2}-\d{2}', text_content)
                 if date_matches:
-                    data["rfp_metadata"]["bid_dates"]["start"] = date_matches[0]
+                    metadata.bid_start = date_matches[0]
                     if len(date_matches) > 1:
-                        data["rfp_metadata"]["bid_dates"]["end"] = date_matches[-1]
+                        metadata.bid_end = date_matches[-1]
                 
                 # Heuristics for Authority
                 auth_match = re.search(r'(Authority|Organization|Department)[:\s]+([^.\n]+)', text_content, re.IGNORECASE)
                 if auth_match:
-                    data["rfp_metadata"]["authority"] = auth_match.group(2).strip()
+                    metadata.authority = auth_match.group(2).strip()
+                metrics.record("parse", time.perf_counter() - parse_start)
 
             else:
                 # Fallback for text input (testing)
-                data["rfp_metadata"]["title"] = "Manual Text Input"
-                data["rfp_metadata"]["description"] = url
+                metadata.title = "Manual Text Input"
+                metadata.description = url
                 text_content = url # Treat the input as the text content
 
             # Common Keyword Extraction (Applied to both Scraped Text and Manual Input)
-            known_keywords = ["Laptop", "Server", "Cable", "Software", "Office 365", "Switch", "Router"]
-            
-            for keyword in known_keywords:
-                if keyword.lower() in text_content.lower():
-                    # Try to find a quantity near the keyword
-                    # Regex: keyword ... number OR number ... keyword
-                    qty = 1 # Default
-                    qty_match = re.search(rf'{keyword}.{{0,20}}?(\d+)', text_content, re.IGNORECASE)
-                    if not qty_match:
-                            qty_match = re.search(rf'(\d+).{{0,20}}?{keyword}', text_content, re.IGNORECASE)
-                    
-                    if qty_match:
-                        qty = int(qty_match.group(1))
-                    
-                    data["items"].append({
-                        "name": keyword,
-                        "quantity": qty,
-                        "description": f"Detected {keyword} in text"
-                    })
+            # One pass over the text for all keywords and nearby quantities
+            with metrics.stage("extract"):
+                scanner = KEYWORD_EXTRACTOR.scanner()
+                scanner.feed(text_content, 0, len(text_content))
+                data["items"] = KEYWORD_EXTRACTOR.items(scanner.result())
+            self._read_attachments(links.urls, data, scanner)
 
         except Exception as e:
             print(f"[Sales Agent] Error: {e}")
+            metrics.inc("rfp_errors_total", label="sales")
             data["error"] = str(e)
 
         return data
 
 class TechnicalAgent:
-    def process(self, sales_data):
+    @metrics.stage("match")
+    def process(self, sales_data, index=None):
         print("[Technical Agent] Matching SKUs...")
-        # DATABASE CALL: Get inventory from SQLite
-        inventory = database.get_inventory()
+        # Prebuilt index over the cached inventory snapshot (patched on add_product)
+        if index is None:
+            index = matching.get_index()
         
         matched_skus = []
         total_items = len(sales_data.get("items", []))
         matched_count = 0
         
         for item in sales_data.get("items", []):
-            best_match = None
-            highest_score = 0
-            
-            for sku in inventory:
-                score = 0
-                # Simple keyword matching
-                item_name = item["name"].lower()
-                sku_name = sku["name"].lower()
-                sku_cat = sku["category"].lower()
-                
-                if sku_name in item_name or item_name in sku_name:
-                    score += 50
-                if sku_cat in item_name:
-                    score += 30
-                
-                if score > highest_score:
-                    highest_score = score
-                    best_match = sku
+            best_match, highest_score = index.best_match(item["name"])
             
             if best_match and highest_score > 0:
                 matched_count += 1
-                matched_skus.append({
-                    "item": item["name"],
-                    "matched_sku": best_match["sku"],
-                    "sku_name": best_match["name"],
-                    "match_percent": f"{min(highest_score + 40, 100)}%", # Simulation
-                    "quantity": item["quantity"]
-                })
+                matched_skus.append(SkuMatch(
+                    item["name"], best_match["sku"], best_match["name"],
+                    min(highest_score + 40, 100),  # Simulation
+                    item["quantity"]
+                ))
             else:
-                matched_skus.append({
-                    "item": item["name"],
-                    "matched_sku": "Not available",
-                    "match_percent": "0%"
-                })
+                matched_skus.append(SkuMatch(item["name"]))
 
         overall_match = int((matched_count / total_items * 100)) if total_items > 0 else 0
 
@@ -167,83 +256,72 @@ class TechnicalAgent:
         }
 
 class PricingAgent:
-    def process(self, tech_data):
+    def process(self, tech_data, catalog=None):
         print("[Pricing Agent] Calculating pricing...")
-        # DATABASE CALL: Get rules and inventory from SQLite
-        rules = database.get_pricing_rules()
-        inventory_list = database.get_inventory()
-        inventory = {item['sku']: item for item in inventory_list}
-        
-        breakdown = []
-        total_cost = 0.0
-        
-        for match in tech_data["tech_match"]["matched_skus"]:
-            if match["matched_sku"] == "Not available":
-                continue
-                
-            sku_info = inventory.get(match["matched_sku"])
-            base_cost = sku_info["base_cost"]
-            qty = match["quantity"]
-            
-            # Margin logic
-            margin_percent = rules["standard_margin_percent"]
-            if sku_info["category"] == "Software":
-                margin_percent = rules["software_margin_percent"]
-            
-            unit_cost = base_cost
-            profit_margin = base_cost * (margin_percent / 100)
-            final_unit_price = unit_cost + profit_margin
-            
-            # Add tax
-            tax = final_unit_price * (rules["tax_rate_percent"] / 100)
-            final_price_inc_tax = final_unit_price + tax
-            
-            line_total = final_price_inc_tax * qty
-            total_cost += line_total
-            
-            breakdown.append({
-                "sku": match["matched_sku"],
-                "unit_cost": f"{unit_cost:.2f}",
-                "profit_margin": f"{profit_margin:.2f}",
-                "tax": f"{tax:.2f}",
-                "final_unit_price": f"{final_price_inc_tax:.2f}",
-                "quantity": qty,
-                "line_total": f"{line_total:.2f}"
+        return self.process_scenarios(tech_data, None, catalog)[0]
+
+    @metrics.stage("pricing")
+    def process_scenarios(self, tech_data, rule_sets, catalog=None):
+        """Prices one BOM against several rule sets in a single batched pass.
+
+        rule_sets is a list of pricing-rule dicts (None means the stored rules);
+        returns one pricing result per rule set, in order.
+        """
+        # Cached catalog snapshot: SQLite is only queried after the catalog changes
+        if catalog is None:
+            catalog = database.get_catalog()
+        if rule_sets is None:
+            rule_sets = [catalog.pricing_rules]
+
+        matched = [m for m in tech_data["tech_match"]["matched_skus"] if m["matched_sku"] != "Not available"]
+        # Columnar engine: one array operation per pricing step (see pricing_engine.py)
+        bom = pricing_engine.BillOfMaterials(
+            [m["matched_sku"] for m in matched], [m["quantity"] for m in matched], catalog.by_sku)
+
+        results = []
+        for columns in bom.price_many(rule_sets):
+            results.append({
+                "pricing": {
+                    "total_cost": f"{columns.total_cost:.2f}",
+                    "currency": "INR",
+                    "breakdown": bom.breakdown(columns)
+                }
             })
-            
-        return {
-            "pricing": {
-                "total_cost": f"{total_cost:.2f}",
-                "currency": "INR",
-                "breakdown": breakdown
-            }
-        }
+        return results
 
 class MasterAgent:
+    @metrics.stage("render")
     def process(self, sales_data, tech_data, pricing_data):
         
         # Construct the final document text
-        doc_lines = []
-        doc_lines.append(f"# RFP Response: {sales_data['rfp_metadata']['title']}")
-        doc_lines.append(f"**Contract ID:** {sales_data['rfp_metadata']['contract_id']}")
-        doc_lines.append(f"**Authority:** {sales_data['rfp_metadata']['authority']}")
-        doc_lines.append(f"**Date:** {datetime.date.today()}")
-        doc_lines.append("\n## Executive Summary")
-        doc_lines.append(f"We are pleased to submit our proposal. We have achieved a {tech_data['tech_match']['overall_match_percent']} technical match for your requirements.")
+        final_doc_text = "\n".join(self.render_lines(sales_data, tech_data, pricing_data))
+        return self.respond(sales_data, tech_data, pricing_data, final_doc_text)
+
+    def render_lines(self, sales_data, tech_data, pricing_data):
+        """Yields the proposal's markdown lines in order (one per breakdown row in the table)."""
+        yield f"# RFP Response: {sales_data['rfp_metadata']['title']}"
+        yield f"**Contract ID:** {sales_data['rfp_metadata']['contract_id']}"
+        yield f"**Authority:** {sales_data['rfp_metadata']['authority']}"
+        yield f"**Date:** {datetime.date.today()}"
+        yield "\n## Executive Summary"
+        yield f"We are pleased to submit our proposal. We have achieved a {tech_data['tech_match']['overall_match_percent']} technical match for your requirements."
         
-        doc_lines.append("\n## Technical & Commercial Breakdown")
-        doc_lines.append("| Item | SKU | Qty | Unit Price | Total |")
-        doc_lines.append("|---|---|---|---|---|")
+        yield "\n## Technical & Commercial Breakdown"
+        yield "| Item | SKU | Qty | Unit Price | Total |"
+        yield "|---|---|---|---|---|"
         
+        # Item name per SKU (first match wins), so each row is a dict lookup
+        item_names = {}
+        for t in tech_data['tech_match']['matched_skus']:
+            item_names.setdefault(t['matched_sku'], t['item'])
+
         for item in pricing_data["pricing"]["breakdown"]:
-            # Find item name from tech data
-            item_name = next((t['item'] for t in tech_data['tech_match']['matched_skus'] if t['matched_sku'] == item['sku']), item['sku'])
-            doc_lines.append(f"| {item_name} | {item['sku']} | {item['quantity']} | ₹{item['final_unit_price']} | ₹{item['line_total']} |")
+            item_name = item_names.get(item['sku'], item['sku'])
+            yield f"| {item_name} | {item['sku']} | {item['quantity']} | ₹{item['final_unit_price']} | ₹{item['line_total']} |"
             
-        doc_lines.append(f"\n**Grand Total:** ₹{pricing_data['pricing']['total_cost']}")
-        
-        final_doc_text = "\n".join(doc_lines)
-        
+        yield f"\n**Grand Total:** ₹{pricing_data['pricing']['total_cost']}"
+
+    def respond(self, sales_data, tech_data, pricing_data, final_doc_text):
         return {
             "final_response": {
                 "rfp_summary": sales_data["rfp_metadata"],
@@ -260,46 +338,245 @@ class Orchestrator:
         self.pricing = PricingAgent()
         self.master = MasterAgent()
     
-    def run(self, url):
+    def run(self, url, on_stage=None, request_id=None, use_cache=True):
+        """Runs all four agents. on_stage(name) is called as each stage starts;
+        request_id completes an existing queued job row instead of inserting one.
+        Unless use_cache is False (or RFP_RESULT_CACHE=0), an unchanged
+        input/page/catalog is answered from the result cache (the result then
+        carries "cached": true)."""
         print("=== Starting Strict RFP Workflow ===")
+        metrics.inc("rfp_runs_total")
+        run_start = time.perf_counter()
+        if on_stage is None:
+            on_stage = lambda stage: None
+
+        on_stage("sales")
+        catalog, index, cache_entry, fetched, cached = self._lookup(url, use_cache)
+        if cached is not None:
+            if request_id is not None:
+                workflow = cached["workflow"]
+                database.save_rfp_request(url, workflow["sales"], workflow["technical"], workflow["pricing"],
+                                          workflow["master"], request_id=request_id)
+            metrics.record("run", time.perf_counter() - run_start)
+            return dict(cached, cached=True)
         
         # Step 1: Sales
-        step1 = self.sales.process(url)
-        save_json("step1_sales.json", step1)
+        step1 = self.sales.process(url, *fetched)
+        if "error" in step1:
+            cache_entry = None   # don't serve a failed fetch again
         
         # Step 2: Technical
-        step2 = self.technical.process(step1)
-        save_json("step2_technical.json", step2)
+        on_stage("technical")
+        step2 = self.technical.process(step1, index=index)
         
         # Step 3: Pricing
-        step3 = self.pricing.process(step2)
-        save_json("step3_pricing.json", step3)
+        on_stage("pricing")
+        step3 = self.pricing.process(step2, catalog=catalog)
         
         # Step 4: Master (Final Response)
+        on_stage("master")
         step4 = self.master.process(step1, step2, step3)
-        save_json("step4_master.json", step4)
         
-        # DATABASE CALL: Save full request to SQLite
-        database.save_rfp_request(url, step1, step2, step3, step4)
+        self._save(url, (step1, step2, step3, step4), request_id, cache_entry)
+        metrics.record("run", time.perf_counter() - run_start)
+        print("=== Workflow Complete ===")
         
-        # Save Markdown for easy reading
-        with open(os.path.join(OUTPUT_DIR, "final_proposal.md"), 'w', encoding='utf-8') as f:
-            f.write(step4["final_response"]["final_document_text"])
+        # Final Main Agent Output
+        result = self._result(step1, step2, step3, step4)
+        if cache_entry is not None:
+            result_cache.get_cache().remember(cache_entry[0], result)
+            result = dict(result)   # callers may add keys; keep the cached copy clean
+        return result
+
+    def run_stream(self, url, use_cache=True, rows_per_event=STREAM_ROWS_PER_EVENT):
+        """Runs the pipeline like run(), yielding (event, data) pairs as results become available.
+
+        Events, in order: sales (the SalesAgent result); technical (overall
+        match and row count) then technical_rows; pricing (total, currency,
+        row count) then pricing_rows; document (chunks of proposal markdown
+        lines); done (request_id, cached). Row events carry at most
+        rows_per_event rows, so a large BOM is never serialized in one piece,
+        and the combined run() response is never built.
+        """
+        print("=== Starting Streaming RFP Workflow ===")
+        metrics.inc("rfp_runs_total")
+        run_start = time.perf_counter()
+
+        catalog, index, cache_entry, fetched, cached = self._lookup(url, use_cache)
+        if cached is not None:
+            workflow = cached["workflow"]
+            yield "sales", workflow["sales"]
+            yield from self._stream_rows(workflow["technical"]["tech_match"], "matched_skus", "technical", rows_per_event)
+            yield from self._stream_rows(workflow["pricing"]["pricing"], "breakdown", "pricing", rows_per_event)
+            yield from self._chunks("document", "lines", cached["final_document"].split("\n"), rows_per_event)
+            metrics.record("run", time.perf_counter() - run_start)
+            yield "done", {"request_id": None, "cached": True}
+            return
+
+        step1 = self.sales.process(url, *fetched)
+        if "error" in step1:
+            cache_entry = None
+        yield "sales", step1
 
+        step2 = self.technical.process(step1, index=index)
+        yield from self._stream_rows(step2["tech_match"], "matched_skus", "technical", rows_per_event)
+
+        step3 = self.pricing.process(step2, catalog=catalog)
+        yield from self._stream_rows(step3["pricing"], "breakdown", "pricing", rows_per_event)
+
+        # Document lines are sent as they are rendered and joined once for storage
+        # (no render stage timing here: it would include the client's read time)
+        lines = []
+        chunk = []
+        for line in self.master.render_lines(step1, step2, step3):
+            lines.append(line)
+            chunk.extend(line.split("\n"))   # same lines as a replay of the stored text
+            if len(chunk) >= rows_per_event:
+                yield "document", {"lines": chunk}
+                chunk = []
+        if chunk:
+            yield "document", {"lines": chunk}
+        step4 = self.master.respond(step1, step2, step3, "\n".join(lines))
+
+        request_id = self._save(url, (step1, step2, step3, step4), None, cache_entry)
+        if cache_entry is not None:
+            result_cache.get_cache().remember(cache_entry[0], self._result(step1, step2, step3, step4))
+        metrics.record("run", time.perf_counter() - run_start)
         print("=== Workflow Complete ===")
+        yield "done", {"request_id": request_id, "cached": False}
+
+    def _stream_rows(self, section, rows_key, event, rows_per_event):
+        # Summary first (everything but the rows), then the rows in chunks
+        rows = section[rows_key]
+        summary = {key: value for key, value in section.items() if key != rows_key}
+        summary["rows"] = len(rows)
+        yield event, summary
+        yield from self._chunks(f"{event}_rows", "rows", rows, rows_per_event)
+
+    def _chunks(self, event, key, items, size):
+        for start in range(0, len(items), size):
+            yield event, {key: items[start:start + size]}
+
+    def _lookup(self, url, use_cache):
+        """(catalog, index, cache entry, fetched, cached result or None) for a run, where
+        fetched = (page, fetch error) is passed on to SalesAgent.process."""
+        # One catalog snapshot for the cache key, matching and pricing
+        catalog, index = self._snapshot()
+        if not (use_cache and result_cache.ENABLED):
+            return catalog, index, None, (None, None), None
+
+        with metrics.stage("cache_lookup"):
+            cache_entry, fetched = self._cache_entry(url, catalog)
+            cached, tier = result_cache.get_cache().get(cache_entry[0]) if cache_entry else (None, None)
+        if cached is not None:
+            metrics.inc("rfp_result_cache_hits_total", label=tier)
+            print(f"[Result Cache] Hit ({tier}), skipping agents")
+            if isinstance(fetched[0], http_client.SpooledPage):
+                fetched[0].close()
+        else:
+            metrics.inc("rfp_result_cache_misses_total")
+        return catalog, index, cache_entry, fetched, cached
+
+    def _save(self, url, steps, request_id, cache_entry):
+        # DATABASE CALL: Save full request to SQLite (and the result cache entry, same transaction)
+        with metrics.stage("db_save"):
+            saved_id = database.save_rfp_request(url, *steps, request_id=request_id, cache_entry=cache_entry)
         
-        # Final Main Agent Output
+        # Debug artifacts (step JSON + proposal markdown); every mode but "shared" writes them off the request path
+        with metrics.stage("artifacts"):
+            artifacts.record_run(url, self._steps(*steps), run_id=request_id)
+        return saved_id
+
+    def _cache_entry(self, url, catalog):
+        """((key, catalog fingerprint) or None, (downloaded page, fetch error)).
+
+        No entry is made when the page can't be read or can't be cached; the
+        page or the error still goes to the sales stage, which never fetches
+        the page a second time.
+        """
+        if url.startswith("http"):
+            try:
+                page_hash, page = self.sales.page_hash(url)
+            except Exception as e:
+                return None, (None, e)
+            if page_hash is None:
+                return None, (page, None)
+        else:
+            page_hash, page = result_cache.content_hash(url), None
+        fingerprint = result_cache.catalog_fingerprint(catalog)
+        key = result_cache.make_key(result_cache.normalize_input(url), page_hash, fingerprint)
+        return (key, fingerprint), (page, None)
+
+    def _steps(self, step1, step2, step3, step4):
+        return {
+            "sales": step1,
+            "technical": step2,
+            "pricing": step3,
+            "master": step4
+        }
+
+    def _result(self, step1, step2, step3, step4):
         return {
             "status": "complete",
-            "workflow": {
-                "sales": step1,
-                "technical": step2,
-                "pricing": step3,
-                "master": step4
-            },
+            "workflow": self._steps(step1, step2, step3, step4),
             "final_document": step4["final_response"]["final_document_text"]
         }
 
+    def _snapshot(self):
+        # A matching index and catalog snapshot from the same catalog version
+        while True:
+            catalog = database.get_catalog()
+            index = matching.get_index()
+            if index.version == catalog.version:
+                return catalog, index
+
+    def run_batch(self, inputs, max_workers=BATCH_WORKERS, per_host=BATCH_PER_HOST):
+        """Processes many RFP inputs concurrently, yielding each result as it finishes.
+
+        Every input is priced against one catalog snapshot, fetches are capped per
+        host, and all rfp_requests rows are committed in a single transaction once
+        the batch is done. Artifacts go to the artifact sink like single runs.
+        Yields dicts with "index" and "input" plus either the run() payload or "error".
+        """
+        inputs = list(inputs)
+        print(f"=== Starting Batch RFP Workflow ({len(inputs)} inputs) ===")
+        catalog, index = self._snapshot()
+        sales = SalesAgent(limiter=HostLimiter(per_host))
+
+        def run_one(url):
+            metrics.inc("rfp_runs_total")
+            step1 = sales.process(url)
+            step2 = self.technical.process(step1, index=index)
+            step3 = self.pricing.process(step2, catalog=catalog)
+            step4 = self.master.process(step1, step2, step3)
+            return step1, step2, step3, step4
+
+        rows = []
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rfp-batch")
+        try:
+            futures = {executor.submit(run_one, url): i for i, url in enumerate(inputs)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    steps = future.result()
+                except Exception as e:
+                    print(f"[Batch] Input {i} failed: {e}")
+                    yield {"index": i, "input": inputs[i], "status": "error", "error": str(e)}
+                    continue
+
+                rows.append((inputs[i],) + steps)
+                artifacts.record_run(inputs[i], self._steps(*steps))
+                result = self._result(*steps)
+                result.update({"index": i, "input": inputs[i]})
+                yield result
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            # DATABASE CALL: one transaction for every finished run, even if the caller stops early
+            if rows:
+                with metrics.stage("db_save"):
+                    database.save_rfp_requests(rows)
+            print(f"=== Batch Complete: {len(rows)}/{len(inputs)} saved ===")
+
 if __name__ == "__main__":
     # Test with a dummy URL or text if run directly
     database.initialize_db() # Ensure DB is ready for test
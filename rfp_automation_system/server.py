@@ -1,14 +1,106 @@
-from flask import Flask, request, jsonify
+"""RFP automation HTTP API.
+
+Development: `python server.py` (Werkzeug, debug reloader).
+Production: `gunicorn -c gunicorn.conf.py wsgi:app`, which builds the app with
+create_app(warm=True) once in the master and forks workers from it (see
+gunicorn.conf.py). waitress-serve --threads 8 wsgi:app works the same way in
+a single process.
+"""
+from flask import Blueprint, Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from rfp_system import Orchestrator
+import jobs
+import metrics
+import records
+import io
 import os
+import threading
+
+api = Blueprint('api', __name__)
+
+_orchestrator = None
+_job_queue = None
+_state_pid = None
+_state_lock = threading.Lock()
+
+def _own_state():
+    # A forked worker starts with its own orchestrator and job queue; the parent's
+    # job-queue threads did not survive the fork
+    global _orchestrator, _job_queue, _state_pid
+    if _state_pid != os.getpid():
+        _orchestrator, _job_queue, _state_pid = None, None, os.getpid()
+
+def get_orchestrator():
+    global _orchestrator
+    with _state_lock:
+        _own_state()
+        if _orchestrator is None:
+            _orchestrator = Orchestrator()
+        return _orchestrator
+
+def get_job_queue():
+    """Creates the worker pool on first use and resumes jobs left over by stopped processes."""
+    global _job_queue
+    orchestrator = get_orchestrator()
+    with _state_lock:
+        _own_state()
+        if _job_queue is None:
+            _job_queue = jobs.JobQueue(orchestrator)
+            _job_queue.resume_unfinished()
+    return _job_queue
+
+def warmup():
+    """Does the shared start-up work once, before a pre-forking server forks.
+
+    Runs the schema migrations, loads the catalog snapshot, builds the matching
+    index and the result-cache fingerprint (the keyword and HTML regexes are
+    compiled when rfp_system is imported). Workers inherit all of it
+    copy-on-write. Pooled SQLite connections are closed so none crosses the fork.
+    """
+    import database
+    import matching
+    import result_cache
+    database.initialize_db()
+    catalog = database.get_catalog()
+    index = matching.get_index()
+    result_cache.catalog_fingerprint(catalog)
+    database.close_pool()
+    print(f"[Server] Warmed up: {len(index)} SKUs indexed, catalog version {catalog.version}")
 
-app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "*"}}) # Allow all origins explicitly
+class RecordJSONProvider(DefaultJSONProvider):
+    """jsonify() through records.dumps, so pipeline records are sent as their compat view."""
 
-orchestrator = Orchestrator()
+    def dumps(self, obj, **kwargs):
+        return records.dumps(obj, indent=bool(kwargs.get("indent")), sort_keys=kwargs.get("sort_keys", self.sort_keys),
+                             default=self.default).decode("utf-8")
 
-@app.route('/api/process-rfp', methods=['POST'])
+def create_app(warm=False):
+    """Builds the Flask app; warm=True runs warmup() first."""
+    if warm:
+        warmup()
+    app = Flask(__name__)
+    app.json = RecordJSONProvider(app)
+    CORS(app, resources={r"/*": {"origins": "*"}}) # Allow all origins explicitly
+    app.register_blueprint(api)
+    return app
+
+_BOOLEANS = {'1': True, 'true': True, 'yes': True, 'on': True, '0': False, 'false': False, 'no': False, 'off': False}
+
+def _flag(data, name):
+    flag = request.args.get(name, data.get(name, False))
+    return _BOOLEANS.get(str(flag).strip().lower(), False)
+
+def _boolean(name, value):
+    """A JSON boolean or one of the _BOOLEANS strings; raises ValueError for anything else."""
+    if isinstance(value, bool):
+        return value
+    parsed = _BOOLEANS.get(str(value).strip().lower())
+    if parsed is None:
+        raise ValueError(f'"{name}" must be true or false, not {value!r}')
+    return parsed
+
+@api.route('/api/process-rfp', methods=['POST'])
 def process_rfp():
     data = request.json
     input_text = data.get('input')
@@ -17,17 +109,112 @@ def process_rfp():
         return jsonify({"error": "No input provided"}), 400
     
     print(f"Received request: {input_text}")
+
+    if _flag(data, 'async'):
+        # Submit-and-poll: the pipeline runs on the job worker pool
+        try:
+            job_id = get_job_queue().submit(input_text)
+        except jobs.QueueFullError as e:
+            return jsonify({"error": f"Job queue is full: {e}"}), 503
+        return jsonify({
+            "job_id": job_id,
+            "state": "queued",
+            "status_url": f"/api/jobs/{job_id}",
+            "result_url": f"/api/jobs/{job_id}/result"
+        }), 202
     
     try:
         # Run the full workflow
-        result = orchestrator.run(input_text)
+        with metrics.collect_timings() as timings:
+            result = get_orchestrator().run(input_text, use_cache=not _flag(data, 'fresh'))
+        if _flag(data, 'timings'):
+            result["timings"] = metrics.timings_ms(timings)
+        if _flag(data, 'typed'):
+            # Numeric match percentages and prices instead of the "90%" / "%.2f" strings
+            return Response(records.dumps(result, typed=True), mimetype='application/json')
         return jsonify(result)
 
     except Exception as e:
         print(f"Error processing RFP: {e}")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/admin/stats', methods=['GET'])
+@api.route('/api/process-rfp/batch', methods=['POST'])
+def process_rfp_batch():
+    data = request.json or {}
+    inputs = [item for item in data.get('inputs', []) if item]
+
+    if not inputs:
+        return jsonify({"error": "No inputs provided"}), 400
+
+    print(f"Received batch request: {len(inputs)} inputs")
+
+    def generate():
+        # JSON Lines: one result per RFP as it finishes, then a summary line
+        completed = 0
+        for result in get_orchestrator().run_batch(inputs):
+            if result["status"] == "complete":
+                completed += 1
+            yield records.dumps(result) + b"\n"
+        yield records.dumps({"status": "batch_complete", "total": len(inputs), "completed": completed}) + b"\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@api.route('/api/process-rfp/stream', methods=['GET', 'POST'])
+def process_rfp_stream():
+    """Server-sent events, one per agent result as it completes (see Orchestrator.run_stream).
+    GET ?input=... is accepted so browsers can use EventSource."""
+    data = request.get_json(silent=True) or {}
+    input_text = data.get('input') or request.args.get('input')
+
+    if not input_text:
+        return jsonify({"error": "No input provided"}), 400
+
+    print(f"Received streaming request: {input_text}")
+    use_cache = not _flag(data, 'fresh')
+
+    def generate():
+        try:
+            for event, payload in get_orchestrator().run_stream(input_text, use_cache=use_cache):
+                yield b"event: " + event.encode() + b"\ndata: " + records.dumps(payload) + b"\n\n"
+        except Exception as e:
+            print(f"Error processing RFP: {e}")
+            yield b"event: error\ndata: " + records.dumps({"error": str(e)}) + b"\n\n"
+
+    # no-cache and X-Accel-Buffering keep proxies from holding events back
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@api.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job_status(job_id):
+    from database import get_job
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    status = jobs.describe_job(job)
+    if status["state"] == "done":
+        status["result"] = jobs.job_result(job)
+    return jsonify(status)
+
+@api.route('/api/jobs/<int:job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    from database import get_job
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    status = jobs.describe_job(job)
+    if status["state"] == "failed":
+        return jsonify(status), 500
+    if status["state"] != "done":
+        return jsonify(status), 202
+    return jsonify(jobs.job_result(job))
+
+@api.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/api/admin/stats', methods=['GET'])
 def get_stats():
     try:
         from database import get_dashboard_stats
@@ -36,7 +223,64 @@ def get_stats():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/admin/products', methods=['POST'])
+def _history_page(query=None):
+    from database import HISTORY_PAGE_SIZE, list_rfp_requests
+    try:
+        limit = int(request.args.get('limit', HISTORY_PAGE_SIZE))
+        items, next_cursor = list_rfp_requests(
+            status=request.args.get('status'),
+            date_from=request.args.get('from'),
+            date_to=request.args.get('to'),
+            query=query,
+            limit=limit,
+            cursor=request.args.get('cursor')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"items": items, "next_cursor": next_cursor})
+
+@api.route('/api/rfps', methods=['GET'])
+def list_rfps():
+    """Newest first; filters: status, from, to (YYYY-MM-DD[ HH:MM:SS]), q; paging: limit, cursor."""
+    try:
+        return _history_page(request.args.get('q'))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/api/rfps/search', methods=['GET'])
+def search_rfps():
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"error": "q is required"}), 400
+        return _history_page(query)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/api/rfps/<int:request_id>', methods=['GET'])
+def get_rfp(request_id):
+    from database import get_job
+    rfp = get_job(request_id)
+    if rfp is None:
+        return jsonify({"error": "RFP request not found"}), 404
+    return jsonify(rfp)
+
+@api.route('/api/admin/rfp/<int:request_id>/status', methods=['POST'])
+def set_rfp_status(request_id):
+    try:
+        from database import RFP_STATUSES, update_rfp_status
+        data = request.get_json(silent=True) or {}
+        status = data.get('status')
+        if status not in RFP_STATUSES:
+            return jsonify({"error": f"status must be one of {', '.join(RFP_STATUSES)}"}), 400
+
+        if not update_rfp_status(request_id, status):
+            return jsonify({"error": "RFP request not found"}), 404
+        return jsonify({"id": request_id, "status": status})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/api/admin/products', methods=['POST'])
 def add_new_product():
     try:
         from database import add_product
@@ -54,11 +298,99 @@ def add_new_product():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@api.route('/api/admin/products/bulk', methods=['POST'])
+def bulk_import_products():
+    """Streams a JSON Lines or CSV body (?format=jsonl|csv, else from Content-Type) into the catalog."""
+    try:
+        import catalog_import
+        fmt = request.args.get('format') or catalog_import.detect_format(content_type=request.content_type)
+        if fmt not in catalog_import.FORMATS:
+            return jsonify({"error": "Send text/csv or application/x-ndjson, or pass ?format=csv|jsonl"}), 400
+
+        # Read the body as a stream so a large catalog is never held in memory whole
+        stream = io.TextIOWrapper(request.stream, encoding='utf-8-sig', errors='replace', newline='')
+        report = catalog_import.import_products(stream, fmt, strict=_flag({}, 'strict'))
+        if report["received"] == 0:
+            return jsonify({"error": "No rows provided"}), 400
+        return jsonify(report), 200 if report["applied"] else 422
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/api/admin/pricing-rules', methods=['GET'])
+def get_pricing_rules():
+    from database import get_pricing_rules
+    return jsonify(get_pricing_rules())
+
+@api.route('/api/admin/pricing-rules', methods=['POST'])
+def set_pricing_rules():
+    """Updates rule values; Pending proposals are re-priced in the background unless "reprice" is false."""
+    try:
+        import repricing
+        from database import update_pricing_rules
+        data = request.get_json(silent=True) or {}
+        try:
+            reprice = _boolean('reprice', data.pop('reprice', True))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        rules, error = repricing.validate_rules(data)
+        if error:
+            return jsonify({"error": error}), 400
+
+        response = {"pricing_rules": update_pricing_rules(rules)}
+        if reprice:
+            response["reprice_started"] = repricing.start_background()
+            response["status_url"] = "/api/admin/reprice"
+        return jsonify(response)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/api/admin/reprice', methods=['POST'])
+def start_reprice():
+    """Starts (or resumes) re-pricing Pending proposals against the current catalog."""
+    import repricing
+    data = request.get_json(silent=True) or {}
+    try:
+        restart = _boolean('restart', data.get('restart', False))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not repricing.start_background(restart=restart):
+        return jsonify({"error": "A re-pricing run is already in progress"}), 409
+    return jsonify({"status_url": "/api/admin/reprice"}), 202
+
+@api.route('/api/admin/reprice', methods=['GET'])
+def get_reprice_status():
+    import repricing
+    from database import get_reprice_run
+    run = get_reprice_run()
+    if run is None:
+        return jsonify({"error": "No re-pricing run yet"}), 404
+    run.pop('fingerprint', None)
+    run['active'] = repricing.is_running()
+    return jsonify(run)
+
+_app = None
+
+def __getattr__(name):
+    # server.app is built on first access, not at import: wsgi.py builds its own
+    # warmed app, and importing server for create_app() must not build a second
+    global _app
+    if name != 'app':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _state_lock:
+        if _app is None:
+            _app = create_app()
+    return _app
+
 if __name__ == '__main__':
+    app = create_app()
     print("Starting RFP Automation Server on port 5000...")
     # Initialize Database
     from database import initialize_db
     initialize_db()
+
+    # With the debug reloader only the child process serves; start the job workers there
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        get_job_queue()
     
     # Run on 0.0.0.0 to ensure it's accessible from localhost/127.0.0.1
     app.run(host='0.0.0.0', debug=True, port=5000)
@@ -0,0 +1,47 @@
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+sys.path.insert(0, os.path.join(PACKAGE_DIR, "benchmarks"))   # corpus, stub_server and the benchmark helpers
+
+import database  # noqa: E402
+import http_client  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """An empty working directory, so the page and attachment text caches start empty."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(http_client, "_cache", None)
+    return tmp_path
+
+
+@pytest.fixture
+def db_file(tmp_path, monkeypatch):
+    """Points the database module at an empty file in tmp_path."""
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "rfp.db"))
+    # The seed data paths are relative to the package directory
+    monkeypatch.setattr(database, "INVENTORY_FILE", os.path.join(PACKAGE_DIR, database.INVENTORY_FILE))
+    monkeypatch.setattr(database, "PRICING_FILE", os.path.join(PACKAGE_DIR, database.PRICING_FILE))
+    yield database.DB_FILE
+    database.close_pool()
+
+
+@pytest.fixture
+def db(db_file):
+    """A new database, migrated and seeded with the catalog in data/."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        database.initialize_db()
+    return db_file
+
+
+@pytest.fixture
+def stub_server():
+    with StubServer() as server:
+        yield server
@@ -0,0 +1,56 @@
+import gzip
+import json
+import os
+import sys
+
+import artifacts
+
+STEPS = {
+    "sales": {"rfp_metadata": {"title": "T"}},
+    "technical": {"tech_match": {"matched_skus": []}},
+    "pricing": {"pricing": {"total_cost": "0.00"}},
+    "master": {"final_response": {"final_document_text": "# Proposal\n"}},
+}
+
+
+def test_default_mode_writes_the_shared_directory_before_returning(workdir):
+    assert artifacts.ARTIFACT_MODE == os.environ.get("RFP_ARTIFACT_MODE", "shared")
+    sink = artifacts.create_sink("shared")
+
+    assert sink.submit(artifacts.new_run("input", STEPS))
+
+    directory = workdir / artifacts.OUTPUT_DIR
+    assert sorted(os.listdir(directory)) == sorted([name for _, name in artifacts.STEP_FILES] + ["final_proposal.md"])
+    assert json.loads((directory / "step1_sales.json").read_text()) == STEPS["sales"]
+    assert (directory / "final_proposal.md").read_text() == "# Proposal\n"
+
+
+def test_run_directories_keep_the_newest_runs(workdir):
+    store = artifacts.RunDirectoryStore(root=str(workdir / "runs"), keep=2)
+    runs = [dict(artifacts.new_run(f"input {i}", STEPS, run_id=i), timestamp=f"2026-01-0{i + 1}T00:00:00")
+            for i in range(3)]
+
+    store.write_batch(runs)
+
+    assert sorted(os.listdir(workdir / "runs")) == ["20260102-000000-1", "20260103-000000-2"]
+
+
+def test_gzip_log_reads_back_across_batches(workdir):
+    sink = artifacts.BackgroundSink(artifacts.JsonLinesStore(path=str(workdir / "log.jsonl"), compression="gzip"))
+    for i in range(3):
+        sink.submit(artifacts.new_run(f"input {i}", STEPS, run_id=i))
+        sink.flush(5)
+    sink.close(5)
+
+    with gzip.open(workdir / "log.jsonl.gz", "rt", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["run_id"] for line in lines] == ["0", "1", "2"]
+    assert lines[0]["master"] == STEPS["master"]
+
+
+def test_zstd_falls_back_to_gzip_without_zstandard(workdir, monkeypatch):
+    monkeypatch.setitem(sys.modules, "zstandard", None)   # import raises ImportError
+
+    store = artifacts.JsonLinesStore(path=str(workdir / "log.jsonl"), compression="zstd")
+
+    assert store.compression == "gzip" and store.path.endswith(".gz")
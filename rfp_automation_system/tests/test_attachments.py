@@ -0,0 +1,132 @@
+import contextlib
+import io
+import os
+import random
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import pytest
+
+import attachments
+import corpus
+import document_text
+from bench_attachments import DOCX, PDF
+from rfp_system import SalesAgent
+
+
+@pytest.fixture
+def tender(workdir, stub_server, monkeypatch):
+    """A tender page linking a PDF and a DOCX schedule, an oversized PDF, a corrupt DOCX and a missing file."""
+    monkeypatch.setattr(attachments, "MAX_BYTES", 1024 * 1024)
+    rng = random.Random(13)
+    # Padding without product names, so the first mention of each product is known
+    padding = [" ".join(rng.choice(corpus.FILLER) for _ in range(8)) for _ in range(200)]
+    stub_server.add("/docs/schedule-a.pdf", corpus.pdf_document(["Router required quantity 25 nos"] + padding), PDF)
+    stub_server.add("/docs/schedule-b.docx", corpus.docx_document(padding + ["Switch 12 ports, Router 99"]), DOCX)
+    stub_server.add("/docs/drawings.pdf", b"%PDF-1.4\n" + os.urandom(attachments.MAX_BYTES), PDF)
+    stub_server.add("/docs/broken.docx", os.urandom(4096), DOCX)
+    page = ("<html><head><title>Tender No: ATT-1</title></head><body>"
+            "<p>Department: Test Authority. Supply of Laptop 10 units. Bid closes 2026-03-01.</p>"
+            "<a href='/docs/schedule-a.pdf'>Schedule A</a> <a href='../../docs/schedule-b.docx#page=2'>Schedule B</a>"
+            "<a href='/docs/schedule-a.pdf'>Schedule A (again)</a> <a href='/docs/drawings.pdf'>Drawings</a>"
+            "<a href='/docs/broken.docx'>Annexure</a> <a href='/docs/missing.pdf'>Corrigendum</a>"
+            "<a href='/terms.html'>Terms</a></body></html>")
+    return stub_server.add("/tenders/att-1/", page.encode("utf-8"))
+
+
+def _process(url, stream):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return SalesAgent(stream=stream).process(url)
+
+
+def _without_cached(data):
+    return dict(data, documents=[dict(document, cached=None) for document in data["documents"]])
+
+
+def test_attachment_text_reaches_the_extraction(tender):
+    data = _process(tender, stream=False)
+
+    names = [document["name"] for document in data["documents"]]
+    assert names == ["schedule-a.pdf", "schedule-b.docx", "drawings.pdf", "broken.docx", "missing.pdf"]
+    quantities = {item["name"]: item["quantity"] for item in data["items"]}
+    assert (quantities["Laptop"], quantities["Router"], quantities["Switch"]) == (10, 25, 12)
+
+
+def test_failures_are_reported_per_file(tender):
+    data = _process(tender, stream=False)
+
+    failed = [document["name"] for document in data["documents"] if "error" in document]
+    assert failed == ["drawings.pdf", "broken.docx", "missing.pdf"]
+    assert all(document["characters"] > 0 for document in data["documents"][:2])
+
+
+def test_streaming_mode_and_the_text_cache_give_the_same_result(tender):
+    dom = _process(tender, stream=False)
+    streamed = _process(tender, stream=True)
+    again = _process(tender, stream=False)
+
+    assert [document["cached"] for document in dom["documents"][:2]] == [False, False]
+    assert [document["cached"] for document in again["documents"][:2]] == [True, True]
+    assert _without_cached(streamed) == _without_cached(dom)
+    assert again["items"] == dom["items"]
+
+
+def test_process_pool_matches_in_thread_extraction(workdir, stub_server):
+    rng = random.Random(7)
+    files = [
+        (stub_server.add("/bulk/0.pdf", corpus.pdf_document(corpus.schedule_lines(500, rng)), PDF), "pdf"),
+        (stub_server.add("/bulk/1.docx", corpus.docx_document(corpus.schedule_lines(500, rng)), DOCX), "docx"),
+    ]
+    urls = [url for url, _ in files]
+    expected = [document_text.extract_text(attachments._download(url), kind) for url, kind in files]
+
+    ingested = attachments.ingest(urls)
+    cached = attachments.ingest(urls)
+
+    assert [text for _, text in ingested] == expected
+    assert [text for _, text in cached] == expected
+    assert all(document["cached"] for document, _ in cached)
+
+
+def _gone(pids, seconds=10):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        alive = set()
+        for pid in pids:
+            try:
+                os.kill(pid, 0)
+                alive.add(pid)
+            except OSError:
+                pass
+        if not alive:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_pool_is_replaced_after_extract_tasks_per_pool(monkeypatch):
+    monkeypatch.setattr(attachments, "EXTRACT_TASKS_PER_POOL", 2)
+    first = attachments._extract_pool()
+    results = [first.submit(sum, [n, 1]) for n in range(2)]
+
+    second = attachments._extract_pool()
+
+    assert second is not first and second.submitted == 0
+    assert [future.result(timeout=60) for future in results] == [1, 2]   # retired, not killed
+    assert second.submit(sum, [1, 2]).result(timeout=60) == 3
+
+
+def test_hung_worker_is_killed_and_the_pool_replaced():
+    pool = attachments._extract_pool()
+    future = pool.submit(time.sleep, 60)
+    with pytest.raises(FutureTimeout):
+        future.result(timeout=2)
+    workers = pool.pids()
+    assert workers
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        attachments._discard_extract_pool(pool)
+
+    assert _gone(workers)
+    assert attachments._extract_pool() is not pool
+    assert attachments._extract_pool().submit(sum, [1, 2]).result(timeout=60) == 3
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+import database
+from bench_cold_start import import_once, traced_boot
+
+# Self-reported `python -X importtime` milliseconds; RFP_IMPORT_BUDGET_SCALE=2 on slow machines
+IMPORT_BUDGET_MS = {"cli": 120, "rfp_system": 150, "server": 500}
+BUDGET_SCALE = float(os.environ.get("RFP_IMPORT_BUDGET_SCALE", "1"))
+DDL = ("CREATE", "ALTER", "DROP")
+
+
+@pytest.mark.parametrize("module", IMPORT_BUDGET_MS)
+def test_import_is_within_budget(module, tmp_path):
+    best = min(import_once(module, tmp_path)[0] for _ in range(3))
+    assert best <= IMPORT_BUDGET_MS[module] * BUDGET_SCALE
+
+
+@pytest.mark.parametrize("module", IMPORT_BUDGET_MS)
+def test_import_has_no_side_effects(module, tmp_path):
+    _, heavy = import_once(module, tmp_path)
+    assert heavy == []
+    assert os.listdir(tmp_path) == []
+
+
+def test_new_database_is_migrated_to_the_latest_version(db_file):
+    traced_boot()
+    with database.db_connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(database.MIGRATIONS)
+        assert conn.execute("SELECT COUNT(*) FROM inventory").fetchone()[0] > 0
+
+
+def test_up_to_date_boot_runs_no_ddl(db_file):
+    traced_boot()
+    _, statements = traced_boot()
+
+    assert statements
+    assert [sql for sql in statements if sql.lstrip().upper().startswith(DDL)] == []
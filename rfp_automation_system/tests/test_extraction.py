@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from bench_extraction import BASE_KEYWORDS, legacy_extract, make_document, make_keywords
+from extraction import KeywordExtractor
+from rfp_system import KEYWORD_EXTRACTOR
+
+EDGE_CASES = [
+    "", "laptop", "12 laptops", "LAPTOP\n5", "Laptop" + " " * 25 + "9",
+    "1234567890123456789012345 Server", "Switches 4 Switch", "Router 7 router 9",
+    "Office 365 E3 x 40 seats", "99 cable and 3 cables", "server\nserver 12 server",
+]
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_edge_cases_match_the_original_scan(text):
+    extractor = KeywordExtractor(BASE_KEYWORDS + ["Switches"])
+    assert extractor.extract(text) == legacy_extract(text, extractor.keywords)
+
+
+@pytest.mark.parametrize("count", [7, 300])
+def test_documents_match_the_original_scan(count):
+    rng = random.Random(count)
+    keywords = make_keywords(count, rng)
+    extractor = KeywordExtractor(keywords)
+    for _ in range(5):
+        text = make_document(0.02, keywords, rng)
+        assert extractor.extract(text) == legacy_extract(text, keywords)
+
+
+def test_sales_agent_keywords_match_the_original_scan():
+    text = "Supply of 40 Laptop units, Server x 2 and 12 cable runs; Office 365 for 300 seats."
+    assert KEYWORD_EXTRACTOR.extract(text) == legacy_extract(text, KEYWORD_EXTRACTOR.keywords)
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+import database
+import jobs
+
+
+class BlockingOrchestrator:
+    """Records the jobs it is given and holds them until release() is called."""
+
+    def __init__(self):
+        self.ran = []
+        self.released = threading.Event()
+
+    def run(self, input_text, on_stage=None, request_id=None):
+        self.ran.append(request_id)
+        self.released.wait(10)
+        database.update_job(request_id, "done")
+
+    def release(self):
+        self.released.set()
+
+
+@pytest.fixture
+def orchestrator():
+    orchestrator = BlockingOrchestrator()
+    yield orchestrator
+    orchestrator.release()
+
+
+def _orphan_jobs(count, owner="gone-host/1"):
+    ids = [database.create_job(f"Tender {i}", owner) for i in range(count)]
+    with database.db_transaction() as conn:
+        conn.execute("UPDATE rfp_requests SET job_state = 'running', job_stage = 'sales', job_heartbeat = ?",
+                     (time.time() - database.JOB_LEASE_SECONDS - 1,))
+    return ids
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_resume_stays_within_max_queued(db, orchestrator):
+    ids = _orphan_jobs(5)
+    queue = jobs.JobQueue(orchestrator, max_workers=5, max_queued=3, owner="here/1")
+    try:
+        assert queue.resume_unfinished() == 3
+        with pytest.raises(jobs.QueueFullError):
+            queue.submit("One more tender")
+        _wait_for(lambda: len(orchestrator.ran) == 3)
+
+        orchestrator.release()
+        _wait_for(lambda: queue._in_flight == 0)
+        assert queue.resume_unfinished() == 2   # the rest, now that there is room
+        _wait_for(lambda: len(orchestrator.ran) == 5)
+    finally:
+        queue.shutdown()
+
+    assert sorted(orchestrator.ran) == ids
+
+
+def test_live_leases_are_not_claimed(db, orchestrator):
+    database.create_job("Tender running elsewhere", "other-host/7")
+    queue = jobs.JobQueue(orchestrator, owner="here/1")
+    try:
+        assert queue.resume_unfinished() == 0
+    finally:
+        queue.shutdown()
+
+
+def test_each_orphaned_job_is_claimed_by_one_worker(db):
+    ids = _orphan_jobs(6)
+    workers = [BlockingOrchestrator() for _ in range(2)]
+    queues = [jobs.JobQueue(worker, max_workers=6, owner=f"worker/{i}") for i, worker in enumerate(workers)]
+    try:
+        claimed = [queue.resume_unfinished() for queue in queues]
+        _wait_for(lambda: sum(len(worker.ran) for worker in workers) == 6)
+    finally:
+        for queue, worker in zip(queues, workers):
+            worker.release()
+            queue.shutdown()
+
+    assert claimed == [6, 0]
+    assert sorted(workers[0].ran + workers[1].ran) == ids
+
+
+def test_claimed_jobs_are_leased_to_the_new_owner(db, orchestrator):
+    job_id = _orphan_jobs(1)[0]
+    queue = jobs.JobQueue(orchestrator, owner="here/1")
+    try:
+        queue.resume_unfinished()
+        _wait_for(lambda: orchestrator.ran)
+        with database.db_connection() as conn:
+            row = conn.execute("SELECT job_owner, job_heartbeat FROM rfp_requests WHERE id = ?", (job_id,)).fetchone()
+        assert row["job_owner"] == "here/1"
+        assert time.time() - row["job_heartbeat"] < database.JOB_LEASE_SECONDS
+
+        assert database.renew_job_leases("here/1") == 1
+        assert database.renew_job_leases("gone-host/1") == 0
+    finally:
+        orchestrator.release()
+        queue.shutdown()
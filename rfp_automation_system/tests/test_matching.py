@@ -0,0 +1,56 @@
+import random
+
+import database
+import matching
+from bench_matching import linear_best_match, make_catalog, make_items
+from matching import InventoryIndex
+from rfp_system import Orchestrator, PricingAgent, TechnicalAgent
+
+ROUTER = {"sku": "RT-1", "name": "EdgeRouter X", "category": "Router", "base_cost": 9000.0}
+
+
+def _state(index):
+    return (index.version, index.skus, index._names, index._categories,
+            index._by_name, index._by_category, index._postings)
+
+
+def test_index_matches_the_linear_scan():
+    rng = random.Random(7)
+    catalog = make_catalog(2000, rng)
+    index = InventoryIndex(catalog)
+
+    for name in make_items(500, catalog, rng):
+        assert index.best_match(name) == linear_best_match(catalog, name), name
+
+
+def test_incremental_index_equals_a_full_rebuild():
+    rng = random.Random(8)
+    catalog = make_catalog(500, rng)
+    index = InventoryIndex(catalog[:100], version=0)
+    for version, sku in enumerate(catalog[100:], start=1):
+        previous = _state(index)
+        index = index.with_sku(sku, version)
+        assert len(previous[1]) == version + 99   # the old index is left as it was
+
+    assert _state(index) == _state(InventoryIndex(catalog, version=400))
+
+
+def test_add_product_keeps_the_shared_index_in_step(db):
+    for n in range(3):
+        assert database.add_product(dict(ROUTER, sku=f"RT-{n}", name=f"EdgeRouter {n}"))
+
+    catalog = database.get_catalog()
+    index = matching.get_index()
+    assert _state(index) == _state(InventoryIndex(catalog.inventory, catalog.version))
+
+
+def test_add_product_leaves_a_taken_snapshot_consistent(db):
+    catalog, index = Orchestrator()._snapshot()
+    assert database.add_product(ROUTER)
+
+    tech = TechnicalAgent().process({"items": [{"name": "Router 4", "quantity": 4}]}, index=index)
+    pricing = PricingAgent().process(tech, catalog=catalog)
+
+    assert "RT-1" not in catalog.by_sku and "RT-1" not in {sku["sku"] for sku in index.skus}
+    assert all(line["sku"] in catalog.by_sku for line in pricing["pricing"]["breakdown"])
+    assert matching.get_index().best_match("Router 4")[0]["sku"] == "RT-1"
@@ -0,0 +1,101 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+import database
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DB = os.path.join(PACKAGE_DIR, "rfp_database.db")   # the unversioned schema, as shipped
+
+
+@pytest.fixture
+def baseline_db(db_file):
+    shutil.copyfile(BASELINE_DB, db_file)
+    return db_file
+
+
+def _initialize():
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        database.initialize_db()
+    return out.getvalue()
+
+
+def _user_version():
+    with database.db_connection() as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _columns(table):
+    with database.db_connection() as conn:
+        return database._columns(conn.cursor(), table)
+
+
+def _baseline_rows():
+    with sqlite3.connect(f"file:{BASELINE_DB}?mode=ro", uri=True) as conn:
+        conn.row_factory = sqlite3.Row
+        requests = [dict(row) for row in conn.execute("SELECT * FROM rfp_requests ORDER BY id")]
+        inventory = {row["sku"]: dict(row) for row in conn.execute("SELECT * FROM inventory")}
+    return requests, inventory
+
+
+def test_baseline_database_is_migrated_to_the_current_schema(baseline_db):
+    requests, inventory = _baseline_rows()
+
+    _initialize()
+
+    assert _user_version() == len(database.MIGRATIONS)
+    assert {"owner", "heartbeat"} <= _columns("rfp_reprice_runs")
+    assert {"title", "job_state", "final_hash"} <= _columns("rfp_requests")
+    assert {row["sku"] for row in database.get_inventory()} == set(inventory)
+    for row in requests:
+        job = database.get_job(row["id"])
+        assert job["job_state"] == "done" and job["status"] == row["status"]
+        for column in database.PAYLOAD_COLUMNS:
+            assert job[column] == json.loads(row[column])
+    assert _initialize().count("migrated") == 0   # nothing left to apply
+
+
+def test_half_applied_migration_is_completed(baseline_db):
+    _initialize()
+    # What a crash between the two ALTER TABLEs of migration 3 left behind before
+    # migrations ran in a transaction
+    with database.db_connection() as conn:
+        conn.execute("ALTER TABLE rfp_reprice_runs DROP COLUMN heartbeat")
+        conn.execute("PRAGMA user_version = 2")
+
+    _initialize()
+
+    assert _user_version() == len(database.MIGRATIONS)
+    assert {"owner", "heartbeat"} <= _columns("rfp_reprice_runs")
+
+
+def test_failed_migration_is_rolled_back_with_its_version(baseline_db, monkeypatch):
+    _initialize()
+    with database.db_connection() as conn:
+        conn.execute("DROP TABLE catalog_meta")
+        conn.execute("PRAGMA user_version = 3")
+
+    def failing_migration(conn):
+        database._migration_4(conn)
+        raise sqlite3.OperationalError("disk I/O error")
+
+    migrations = database.MIGRATIONS
+    monkeypatch.setattr(database, "MIGRATIONS", migrations[:3] + (failing_migration,))
+    with pytest.raises(sqlite3.OperationalError):
+        _initialize()
+    assert _user_version() == 3
+    assert "catalog_meta" not in {row[0] for row in _tables()}
+
+    monkeypatch.setattr(database, "MIGRATIONS", migrations)
+    _initialize()
+    assert _user_version() == len(database.MIGRATIONS)
+
+
+def _tables():
+    with database.db_connection() as conn:
+        return conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
@@ -0,0 +1,129 @@
+import time
+from contextlib import closing
+
+import pytest
+import requests
+
+import http_client
+
+
+def _stream(url):
+    page = http_client.PageStream(url)
+    with closing(iter(page)) as chunks:
+        return page, b"".join(chunks)
+
+
+def test_fresh_page_is_served_without_a_request(workdir, stub_server):
+    url = stub_server.add("/tender/1", b"<html>one</html>", etag='"v1"')
+
+    first = http_client.fetch(url)
+    second = http_client.fetch(url)
+
+    assert not first.from_cache and second.from_cache
+    assert second.content == b"<html>one</html>"
+    assert stub_server.hits["/tender/1"] == 1
+
+
+def test_stale_page_is_revalidated_with_a_conditional_get(workdir, stub_server):
+    http_client._cache = http_client.PageCache(fresh_for=0)
+    url = stub_server.add("/tender/2", b"<html>two</html>", etag='"v2"')
+
+    http_client.fetch(url)
+    again = http_client.fetch(url)
+    page, body = _stream(url)
+
+    assert again.from_cache and again.content == b"<html>two</html>"
+    assert page.from_cache and body == b"<html>two</html>"
+    assert stub_server.hits["/tender/2"] == 3
+    assert stub_server.not_modified["/tender/2"] == 2
+
+
+def test_changed_page_replaces_the_cached_body(workdir, stub_server):
+    http_client._cache = http_client.PageCache(fresh_for=0)
+    url = stub_server.add("/tender/3", b"<html>old</html>", etag='"old"')
+    http_client.fetch(url)
+
+    stub_server.add("/tender/3", b"<html>new</html>", etag='"new"')
+    changed = http_client.fetch(url)
+
+    assert not changed.from_cache and changed.content == b"<html>new</html>"
+    assert http_client.get_cache().read(url) == b"<html>new</html>"
+
+
+def test_no_store_pages_are_not_cached(workdir, stub_server):
+    url = stub_server.add("/tender/4", b"<html>four</html>")
+
+    http_client.fetch(url)
+    page, _ = _stream(url)
+
+    assert not page.from_cache and not page.stored
+    assert stub_server.hits["/tender/4"] == 2
+    assert http_client.get_cache().lookup(url) is None
+
+
+def test_streamed_page_is_cached_unless_truncated(workdir, stub_server):
+    url = stub_server.add("/tender/5", b"x" * 1000, etag='"v5"')
+
+    page = http_client.PageStream(url, max_bytes=100)
+    with closing(iter(page)) as chunks:
+        assert len(b"".join(chunks)) == 100
+    assert page.truncated and http_client.get_cache().lookup(url) is None
+
+    page, body = _stream(url)
+    assert page.stored and body == b"x" * 1000
+    assert http_client.fetch(url).from_cache
+
+
+def test_max_age_sets_how_long_a_page_is_fresh(workdir, stub_server):
+    http_client._cache = http_client.PageCache(fresh_for=0)
+    url = stub_server.add("/tender/6", b"<html>six</html>", etag='"v6"', headers={"Cache-Control": "max-age=3600"})
+
+    http_client.fetch(url)
+    again = http_client.fetch(url)
+
+    assert again.from_cache and stub_server.hits["/tender/6"] == 1
+
+
+def test_no_cache_pages_are_revalidated_every_time(workdir, stub_server):
+    url = stub_server.add("/tender/7", b"<html>seven</html>", etag='"v7"', headers={"Cache-Control": "no-cache"})
+
+    http_client.fetch(url)
+    again = http_client.fetch(url)
+
+    assert again.from_cache and again.content == b"<html>seven</html>"
+    assert stub_server.not_modified["/tender/7"] == 1
+
+
+def test_revalidation_takes_the_freshness_of_the_304(workdir, stub_server):
+    url = stub_server.add("/tender/8", b"<html>eight</html>", etag='"v8"', headers={"Cache-Control": "max-age=0"})
+    http_client.fetch(url)
+
+    stub_server.add("/tender/8", b"<html>eight</html>", etag='"v8"', headers={"Cache-Control": "max-age=600"})
+    http_client.fetch(url)
+    http_client.fetch(url)
+
+    assert stub_server.hits["/tender/8"] == 2 and stub_server.not_modified["/tender/8"] == 1
+
+
+def test_freshness_from_headers():
+    assert http_client.freshness({}, 300) == 300
+    assert http_client.freshness({"Cache-Control": "public, max-age=120"}, 300) == 120
+    assert http_client.freshness({"Cache-Control": "max-age=120", "Age": "100"}, 300) == 20
+    assert http_client.freshness({"Cache-Control": "no-cache, max-age=120"}, 300) == 0
+    assert http_client.freshness({"Cache-Control": "max-age=soon"}, 300) == 0
+    assert http_client.freshness({"Date": "Sat, 17 Oct 2026 10:00:00 GMT",
+                                  "Expires": "Sat, 17 Oct 2026 10:02:00 GMT"}, 300) == 120
+    assert http_client.freshness({"Expires": "0"}, 300) == 0
+
+
+def test_retries_stay_inside_the_fetch_timeout(workdir, stub_server):
+    url = stub_server.add("/tender/9", b"busy", status=503)
+
+    start = time.monotonic()
+    with pytest.raises(requests.HTTPError):
+        http_client.fetch(url, timeout=1)
+    elapsed = time.monotonic() - start
+
+    # One 0.5 s backoff fits in the second, the next (1 s) would not
+    assert stub_server.hits["/tender/9"] == 2
+    assert elapsed < 1
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+import pricing_engine
+from bench_pricing import RULES, legacy_pricing, legacy_rows, make_catalog, make_rule_sets, make_tech_data
+from rfp_system import MasterAgent, PricingAgent
+
+
+@pytest.fixture(params=["numpy", "python"])
+def engine(request, monkeypatch):
+    """Runs a test with the NumPy engine and again with the pure-Python fallback."""
+    if request.param == "python":
+        monkeypatch.setattr(pricing_engine, "np", None)
+        monkeypatch.setattr(pricing_engine, "_numpy_checked", True)
+    elif pricing_engine._numpy() is None:
+        pytest.skip("NumPy is not installed")
+    return request.param
+
+
+def _bom(lines, seed):
+    rng = random.Random(seed)
+    catalog = make_catalog(500, rng)
+    return catalog, make_tech_data(lines, catalog, rng), rng
+
+
+@pytest.mark.parametrize("lines", [0, 1, 2000])
+def test_pricing_matches_the_original_loop(engine, lines):
+    catalog, tech_data, _ = _bom(lines, lines)
+    assert PricingAgent().process(tech_data, catalog) == legacy_pricing(tech_data, RULES, catalog.by_sku)
+
+
+def test_scenarios_match_pricing_each_rule_set(engine):
+    catalog, tech_data, rng = _bom(500, 3)
+    rule_sets = make_rule_sets(20, rng)
+
+    batched = PricingAgent().process_scenarios(tech_data, rule_sets, catalog)
+
+    assert batched == [legacy_pricing(tech_data, rules, catalog.by_sku) for rules in rule_sets]
+
+
+def test_master_rows_match_the_original_lookup(engine):
+    catalog, tech_data, _ = _bom(300, 4)
+    pricing = PricingAgent().process(tech_data, catalog)
+    sales_data = {"rfp_metadata": {"title": "T", "contract_id": "C", "authority": "A"}}
+
+    document = MasterAgent().process(sales_data, tech_data, pricing)["final_response"]["final_document_text"]
+
+    assert document.split("\n")[11:-2] == legacy_rows(tech_data, pricing)
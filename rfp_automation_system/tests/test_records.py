@@ -0,0 +1,57 @@
+import json
+import pickle
+
+import pytest
+
+import records
+from records import LineItem, PriceLine, RfpMetadata, SkuMatch
+
+MATCH = SkuMatch("Laptop", "NB-PRO-14", "ProBook 14 G9", 90, 3)
+MISS = SkuMatch("Widget")
+LINE = PriceLine("NB-PRO-14", 72500.0, 10875.0, 15007.5, 98382.5, 3, 295147.5)
+
+
+def _payload():
+    return {"items": [LineItem("Laptop", 3)], "rfp_metadata": RfpMetadata(contract_id="T-1"),
+            "tech_match": {"matched_skus": [MATCH, MISS]}, "pricing": {"breakdown": [LINE]}}
+
+
+def test_records_read_like_their_compat_dicts():
+    assert MATCH == {"item": "Laptop", "matched_sku": "NB-PRO-14", "sku_name": "ProBook 14 G9",
+                     "match_percent": "90%", "quantity": 3}
+    assert MISS == {"item": "Widget", "matched_sku": "Not available", "match_percent": "0%"}
+    assert LINE["final_unit_price"] == "98382.50" and dict(LINE) == LINE.compat()
+    assert RfpMetadata(contract_id="T-1")["bid_dates"] == {"start": "Not available", "end": "Not available"}
+
+
+def test_records_have_no_instance_dict():
+    for record in (MATCH, LINE, LineItem("Laptop", 3), RfpMetadata()):
+        assert not hasattr(record, "__dict__")
+        assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_dumps_writes_the_compat_view_by_default():
+    payload = _payload()
+    assert json.loads(records.dumps(payload)) == records.compat(payload)
+    assert json.loads(records.dumps(payload, indent=True, sort_keys=True)) == records.compat(payload)
+
+
+def test_typed_view_keeps_numbers():
+    typed = json.loads(records.dumps(_payload(), typed=True))
+
+    assert typed == records.typed(_payload())
+    assert typed["tech_match"]["matched_skus"][0]["match_percent"] == 90
+    assert typed["tech_match"]["matched_skus"][1]["sku"] is None
+    assert typed["pricing"]["breakdown"][0]["line_total"] == 295147.5
+    assert typed["items"] == [{"name": "Laptop", "quantity": 3}]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_both_encoders_agree(use_orjson, monkeypatch):
+    if use_orjson and records.orjson is None:
+        pytest.skip("orjson is not installed")
+    if not use_orjson:
+        monkeypatch.setattr(records, "orjson", None)
+    for typed in (False, True):
+        expected = records.typed(_payload()) if typed else records.compat(_payload())
+        assert json.loads(records.dumps(_payload(), typed=typed)) == expected
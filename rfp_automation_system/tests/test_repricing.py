@@ -0,0 +1,153 @@
+import contextlib
+import io
+import random
+
+import pytest
+
+import bench_reprice
+import database
+import http_client
+import repricing
+
+ROWS = 300
+CHUNK = 20
+SAVE_REPRICED = database.save_repriced
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def proposals(db_file, workdir, monkeypatch):
+    """ROWS stored proposals (every tenth Approved), then a tax change to re-price them for."""
+    monkeypatch.setattr(bench_reprice, "TEMPLATES", 25)
+
+    def no_network(url, *args, **kwargs):
+        raise AssertionError(f"re-pricing fetched {url}")
+
+    monkeypatch.setattr(http_client, "fetch", no_network)
+    bench_reprice.fill(ROWS, random.Random(5))
+    with contextlib.redirect_stdout(io.StringIO()):
+        database.update_pricing_rules({"tax_rate_percent": 28})
+    return db_file
+
+
+def _reprice(**kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return repricing.reprice_pending(CHUNK, 2, **kwargs)
+
+
+def _pending_ids():
+    return database.get_pending_ids(0, ROWS, ROWS)
+
+
+def _recording_saves(monkeypatch, fail_after=None):
+    # Records the ids each committed chunk updated; raises Interrupted instead of the chunk after fail_after
+    saved = []
+
+    def recording_save(run_id, owner, updates, last_id):
+        if fail_after is not None and len(saved) == fail_after:
+            raise Interrupted()
+        saved.append([update[0] for update in updates])
+        return SAVE_REPRICED(run_id, owner, updates, last_id)
+
+    monkeypatch.setattr(database, "save_repriced", recording_save)
+    return saved
+
+
+def test_interrupted_run_resumes_from_its_checkpoint(proposals, monkeypatch):
+    first = _recording_saves(monkeypatch, fail_after=3)
+    with pytest.raises(Interrupted):
+        _reprice()
+    interrupted = database.get_reprice_run()
+    pending = _pending_ids()
+
+    assert interrupted["state"] == "failed"
+    assert interrupted["last_id"] == pending[3 * CHUNK - 1]
+    assert interrupted["repriced"] == 3 * CHUNK
+
+    second = _recording_saves(monkeypatch)
+    run = _reprice()
+    resumed = [request_id for chunk in second for request_id in chunk]
+
+    assert run["id"] == interrupted["id"] and run["state"] == "done"
+    assert run["repriced"] == run["total"] == len(pending)
+    assert min(resumed) > interrupted["last_id"]   # committed chunks are not re-priced again
+    assert sorted(request_id for chunk in first + second for request_id in chunk) == pending
+
+    sampled, stale, approved_changed = bench_reprice.check()
+    assert sampled and not stale and not approved_changed
+
+
+def test_catalog_change_supersedes_an_interrupted_run(proposals, monkeypatch):
+    _recording_saves(monkeypatch, fail_after=2)
+    with pytest.raises(Interrupted):
+        _reprice()
+    interrupted = database.get_reprice_run()
+    with contextlib.redirect_stdout(io.StringIO()):
+        database.update_pricing_rules({"tax_rate_percent": 12})
+
+    _recording_saves(monkeypatch)
+    run = _reprice()
+
+    assert database.get_reprice_run(interrupted["id"])["state"] == "superseded"
+    assert run["id"] != interrupted["id"] and run["repriced"] == len(_pending_ids())
+    assert not bench_reprice.check()[1]
+
+
+def test_finished_run_deletes_replaced_payloads(proposals):
+    with database.db_connection() as conn:
+        replaced = {row[0] for row in conn.execute(
+            "SELECT pricing_hash FROM rfp_requests WHERE status = 'Pending' UNION "
+            "SELECT final_hash FROM rfp_requests WHERE status = 'Pending'")}
+
+    _reprice()
+
+    with database.db_connection() as conn:
+        stored = {row[0] for row in conn.execute("SELECT hash FROM rfp_payloads")}
+        referenced = {row[0] for row in conn.execute(
+            "SELECT pricing_hash FROM rfp_requests UNION SELECT final_hash FROM rfp_requests")}
+    assert replaced - referenced and not (replaced - referenced) & stored
+    assert replaced & referenced <= stored   # still used by Approved proposals
+    with database.db_transaction() as conn:
+        assert database._collect_payload_garbage(conn) == 0
+
+
+def test_purged_result_cache_entries_release_their_payloads(db, monkeypatch):
+    monkeypatch.setattr(database, "PAYLOAD_GC_AFTER_DROPS", 1)
+    payload = database._encode_payload({"only": "referenced by the cache entry"})
+    with database.db_transaction() as conn:
+        database._store_payloads(conn, [payload])
+        conn.execute('''
+            INSERT INTO rfp_result_cache (key, fingerprint, final_hash, created, accessed)
+            VALUES (x'01', x'02', ?, 0, 0)
+        ''', (payload[0],))
+
+    assert database.purge_result_cache() == 1
+    with database.db_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM rfp_payloads WHERE hash = ?", (payload[0],)).fetchone()[0] == 0
+
+
+@pytest.mark.parametrize("flag, started", [("false", False), ("0", False), (False, False), ("true", True), (True, True)])
+def test_pricing_rules_endpoint_parses_the_reprice_flag(db, monkeypatch, flag, started):
+    import server
+
+    runs = []
+    monkeypatch.setattr(repricing, "start_background", lambda **kwargs: runs.append(kwargs) or True)
+    client = server.create_app().test_client()
+
+    response = client.post("/api/admin/pricing-rules", json={"tax_rate_percent": 20, "reprice": flag})
+
+    assert response.status_code == 200
+    assert bool(runs) == started == ("reprice_started" in response.get_json())
+
+
+def test_pricing_rules_endpoint_rejects_a_non_boolean_reprice_flag(db):
+    import server
+
+    client = server.create_app().test_client()
+    response = client.post("/api/admin/pricing-rules", json={"tax_rate_percent": 20, "reprice": "sometimes"})
+
+    assert response.status_code == 400
+    assert database.get_pricing_rules()["tax_rate_percent"] != 20
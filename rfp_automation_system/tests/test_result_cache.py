@@ -0,0 +1,82 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+import database
+from rfp_system import Orchestrator
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TENDER = "Tender No: RC-1. Supply of 10 Laptop units and 2 Server racks, Office 365 for 40 seats."
+
+
+@pytest.fixture
+def orchestrator(db, workdir):
+    return Orchestrator()
+
+
+def _run(orchestrator, text=TENDER, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return orchestrator.run(text, **kwargs)
+
+
+def _total(result):
+    return result["workflow"]["pricing"]["pricing"]["total_cost"]
+
+
+def _stored_entries():
+    with database.db_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM rfp_result_cache").fetchone()[0]
+
+
+def test_repeated_input_is_served_from_the_cache(orchestrator):
+    first = _run(orchestrator)
+    again = _run(orchestrator)
+
+    assert not first.get("cached") and again["cached"]
+    assert _total(again) == _total(first)
+    assert _stored_entries() == 1
+
+
+def test_pricing_rule_change_invalidates_cached_results(orchestrator):
+    before = _run(orchestrator)
+    database.update_pricing_rules({"tax_rate_percent": 28.0})
+
+    after = _run(orchestrator)
+
+    assert not after.get("cached")
+    assert _total(after) != _total(before)
+    assert _total(after) == _total(_run(orchestrator, use_cache=False))
+    assert _stored_entries() == 1   # the entry built against the old rules is purged
+
+
+def test_catalog_change_invalidates_cached_results(orchestrator):
+    _run(orchestrator)
+    database.add_product({"sku": "RT-1", "name": "EdgeRouter X", "category": "Router", "base_cost": 9000.0})
+
+    assert not _run(orchestrator).get("cached")
+    assert _run(orchestrator)["cached"]
+
+
+def test_write_from_another_connection_invalidates_after_a_version_bump(orchestrator):
+    _run(orchestrator)
+    with database.db_connection() as conn:
+        conn.execute("UPDATE inventory SET base_cost = base_cost * 2")
+        conn.commit()
+    database.bump_catalog_version()
+
+    assert not _run(orchestrator).get("cached")
+
+
+def test_rule_change_in_another_process_invalidates_cached_results(orchestrator, monkeypatch):
+    _run(orchestrator)
+    script = ("import sys, database; database.DB_FILE = sys.argv[1]; "
+              "database.update_pricing_rules({'tax_rate_percent': 5.0})")
+    subprocess.run([sys.executable, "-c", script, database.DB_FILE], env=dict(os.environ, PYTHONPATH=PACKAGE_DIR),
+                   check=True, capture_output=True)
+    monkeypatch.setattr(database, "CATALOG_CHECK_SECONDS", 0)
+
+    assert not _run(orchestrator).get("cached")
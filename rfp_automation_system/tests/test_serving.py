@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import threading
+
+import metrics
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code, workdir):
+    env = dict(os.environ, PYTHONPATH=PACKAGE_DIR, PYTHONDONTWRITEBYTECODE="1")
+    done = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env, capture_output=True, text=True, check=True)
+    return done.stdout.strip().splitlines()[-1]
+
+
+def test_wsgi_builds_and_warms_one_app(tmp_path):
+    code = (
+        "import flask, server\n"
+        "built, warmed = [], []\n"
+        "init = flask.Flask.__init__\n"
+        "flask.Flask.__init__ = lambda self, *a, **k: built.append(1) or init(self, *a, **k)\n"
+        "server.warmup = lambda: warmed.append(1)\n"
+        "import wsgi\n"
+        "at_import = (len(built), len(warmed))\n"
+        "lazy = server.app is server.app is not wsgi.app\n"
+        "print(at_import, lazy, len(built))\n"
+    )
+    # server.app still works (e.g. `flask --app server run`), built once on first access
+    assert _run(code, tmp_path) == "(1, 1) True 2"
+
+
+def test_reset_drops_the_counts_a_forked_worker_inherited():
+    metrics.inc("rfp_runs_total")
+    ended = threading.Thread(target=metrics.inc, args=("rfp_runs_total",))
+    ended.start()
+    ended.join()
+    running = threading.Event()
+    stop = threading.Event()
+
+    def record_and_wait():
+        metrics.inc("rfp_runs_total")
+        running.set()
+        stop.wait()
+
+    alive = threading.Thread(target=record_and_wait)
+    alive.start()
+    running.wait()
+
+    metrics.reset()
+    stop.set()
+    alive.join()   # its shard, created before the reset, is retired now
+
+    assert metrics.snapshot() == ({}, {})
+    metrics.inc("rfp_runs_total", 2)
+    assert metrics.snapshot()[1] == {("rfp_runs_total", None): 2}
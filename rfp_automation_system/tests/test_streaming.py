@@ -0,0 +1,60 @@
+import contextlib
+import io
+import random
+
+import html_stream
+from bench_streaming import make_page, measure
+from records import RfpMetadata
+from rfp_system import KEYWORD_EXTRACTOR, SalesAgent
+
+PAGE_MB = 0.5
+STREAM_PEAK_MB = 8   # streaming holds a window of text, not the page
+
+
+def test_streaming_matches_dom_with_a_fraction_of_the_memory(workdir, stub_server):
+    url = stub_server.add("/tender/large", make_page(PAGE_MB, random.Random(5)))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        full, _, full_peak = measure(SalesAgent(stream=False), url)
+        streamed, _, stream_peak = measure(SalesAgent(stream=True), url)
+
+    assert streamed == full
+    assert stream_peak < STREAM_PEAK_MB
+    assert stream_peak * 4 < full_peak
+
+
+def test_streaming_truncates_at_max_bytes(workdir, stub_server):
+    url = stub_server.add("/tender/capped", make_page(PAGE_MB, random.Random(6)))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = SalesAgent(stream=True, max_bytes=64 * 1024).process(url)
+
+    assert data["rfp_metadata"].contract_id == "GEM/2026/B/123456"
+    assert data["truncated"] is True
+
+
+def test_heuristics_agree_across_window_boundaries():
+    # Tiny windows push every heuristic across window boundaries
+    rng = random.Random(5)
+    words = ["Tender No: T-1/A", "Authority: Public Works", "2026-03-04", "12", "Laptop", "Server 7",
+             "9 Router", "filler", "text.", "Dept"]
+    for _ in range(200):
+        segments = [rng.choice(words) for _ in range(rng.randint(1, 120))]
+        text = " ".join(segments)
+        analyzer = html_stream.StreamingTextAnalyzer(KEYWORD_EXTRACTOR, window=64, overlap=48)
+        for segment in segments:
+            analyzer.feed(segment)
+        analyzer.close()
+
+        metadata = RfpMetadata(contract_id=None, authority=None, bid_start=None, bid_end=None)
+        streamed = {"rfp_metadata": metadata}
+        analyzer.apply(streamed, KEYWORD_EXTRACTOR)
+        dates = html_stream.DATE_PATTERN.findall(text)
+        id_match = html_stream.CONTRACT_ID_PATTERN.search(text)
+        auth_match = html_stream.AUTHORITY_PATTERN.search(text)
+
+        assert metadata.contract_id == (id_match.group(2) if id_match else None), text
+        assert metadata.authority == (auth_match.group(2).strip() if auth_match else None), text
+        assert metadata["bid_dates"] == {"start": dates[0] if dates else None,
+                                         "end": dates[-1] if len(dates) > 1 else None}, text
+        assert streamed["items"] == KEYWORD_EXTRACTOR.extract(text), text
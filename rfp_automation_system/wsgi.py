@@ -0,0 +1,11 @@
+"""WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+    waitress-serve --threads 8 --port 5000 wsgi:app
+
+Importing this module runs server.warmup() (schema, catalog, matching index),
+so with gunicorn's preload_app that work happens once, before the fork.
+"""
+from server import create_app
+
+app = create_app(warm=True)